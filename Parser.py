@@ -1,5 +1,15 @@
 from fractions import Fraction
+from functools import lru_cache
 import re
+from sparse import CSCMatrix, RowBuffer
+
+
+# tokens of the input language: relation, number, variable name or symbol
+TOKEN_REGEX = re.compile(r'\s*(?:(<=|>=|==)|(\d+(?:\.\d*)?|\.\d+)|([a-zA-ZÇç_][a-zA-ZÇç_0-9]*)|([-+*/()]))')
+
+FLIP = {'<=': '>=', '>=': '<=', '==': '=='}
+
+ONE = Fraction(1)
 
 
 class Parser():
@@ -7,404 +17,316 @@ class Parser():
 
     Attributes:
         var_count : int
-            number of variables in the LP. 
+            number of variables in the LP.
         is_max : bool
             check if it's a maximization LP.
         variables : dict[str, Variable]
             variables information. See Variable definition for more.
-        slack : list[int]
-            column index in coefficient matrix.
+        var_names : list[str]
+            name of the variable of each column.
         optimal_value : int
             initial value of objective function.
         objective : list[int]
             coefficients of the objective function.
-        A : list[list[int]]
-            coefficient matrix of the constraints.
-        s : list[list[int]]
-            coefficient matrix of the slack variables.
+        buffer : RowBuffer
+            rows of the coefficient matrix of the constraints, while parsing.
+        A : CSCMatrix
+            coefficient matrix of the constraints, with the free variables split.
+        slack_rows : list[int]
+            row of each slack variable. Each slack column has a single nonzero.
+        slack_signs : list[int]
+            coefficient of each slack variable in its row.
         b : list[int]
             right-hand side values of the constraints.
+        free : dict[str, None]
+            variables without a lower bound, in order of appearance.
+        native_bounds : bool
+            keep the bounds of single variable constraints in lower and upper,
+            instead of adding rows for them and splitting the free variables.
+        lower, upper : list[Fraction]
+            bounds of each variable with native_bounds, None when there is none.
+        integer : dict[str, None]
+            variables declared integer by an INT line, in order of declaration.
     """
-    def __init__(self):
+    def __init__(self, native_bounds: bool = False):
         self.var_count = 0
         self.is_max = True
         self.variables = {}
+        self.var_names = []
         self.objective = []
-        self.optimal_value = Fraction(0) 
-        self.A = []
+        self.optimal_value = Fraction(0)
+        self.buffer = RowBuffer()
+        self.A = None
         self.b = []
-        self.s = []
-        self.free = []
+        self.slack_rows = []
+        self.slack_signs = []
+        self.free = {}
+        self.native_bounds = native_bounds
+        self.lower = []
+        self.upper = []
+        self.integer = {}
 
 
     def parse_input(self, file_name):
         """Parses input data to create simplex input."""
 
         with open(file_name, 'r') as file:
-            for line in file:
-                if line.isspace(): # skip empty lines
-                    continue
-                equation =  line.split()
-                match equation[0]:
-                    case "MIN":
-                        # get objective function when it's minimization
-                        self.is_max = False
-                        equation = self.__transform_max_case(equation[1:])
-                        self.objective = self.get_objective_function(equation)
-                    case 'MAX':
-                        # get objective function when it's maximization
-                        self.is_max = True
-                        self.objective = self.get_objective_function(equation[1:])
-                    case _:
-                        # get constraint and add it to coefficient matrix and constraint vector
-                        self.get_constraint(equation)
-        
-        if self.free:
-            # handle any free variable
-            for var in self.free:
-                self.handle_free_var(var)
-        self.free.clear()
-
-
-    def get_objective_function(self, equation: list[str]):
-        """Builds objective function from expression."""
-        objective = [Fraction(0) for i in range(self.var_count)] # objective function
+            # get constraint and add it to coefficient matrix and constraint vector
+            for a, b, relation in self.read_constraints(file):
+                self.add_constraint(a, b, relation)
 
-        # get the coefficients and variables of the equation
-        i = 0
-        while i < len(equation):
-            if equation[i] in ['+', '-']:
-                i += 1
-                continue
+        while len(self.objective) < self.var_count:
+            self.objective.append(Fraction(0))
 
-            expression, j = self.__get_expression(equation[i:])
+        self.A = self.buffer.to_csc(self.var_count)
+        self.buffer = RowBuffer()
 
-            # divide the expression into coefficient and variable
-            coeff, var = self.__parse_expression(expression)
+        if self.free and not self.native_bounds:
+            # handle any free variable
+            self.handle_free_vars(list(self.free))
+        self.free.clear()
 
-            # treat cases of subtraction
-            if i > 0 and equation[i - 1] == '-':
-                coeff = -coeff
 
-            # the expression if it's a literal
-            if not var:
-                self.optimal_value += coeff
-                i += j
+    def read_constraints(self, lines):
+        """Yields the constraints of the input one at a time. The objective function is read on the way."""
+        for line in lines:
+            tokens = TOKEN_REGEX.findall(line)
+            if not tokens: # skip empty lines
                 continue
-            # add new variable to the dictionary
-            elif not var in self.variables:
-                self.__add_variable(var)
-                # add new variable to the objective function
-                objective.append(0)
-
-            # add coefficient to objective function
-            objective[self.variables[var].index] += coeff
-            i += j
-
-        return objective
-    
-
-    def get_constraint(self, equation: list[str]):
-        """Get constraint from equation.""" 
-        if '>=' in equation:
-            self.handle_greater_equal(equation)
-        elif '<=' in equation:
-            self.handle_less_equal(equation)
-        else:
-            self.handle_equality(equation)
-        return
-
 
-    def handle_greater_equal(self, equation: list[str]): # x1 + x2 >= 1
-        """Put a lower bound inequality in the standard form and add it to the matrix."""
-        idx = equation.index('>=')
-
-        # get right hand side of constraint
-        constraint = self.__get_constraint(equation[idx + 1:])
-        if constraint < 0: # handle negative right-side of equation. Ex: x >= -3
-            new_equation = self.__transform_max_case(equation[:idx])
-            new_equation.append('<=')
-            new_equation.extend(equation[idx + 2:])
-            self.handle_less_equal(new_equation)
-            return
+            match tokens[0][2]:
+                case 'MIN':
+                    # get objective function when it's minimization
+                    self.is_max = False
+                    a, b, _ = self.parse_expression(tokens[1:])
+                    self.set_objective_function(a, b, -1)
+                case 'MAX':
+                    # get objective function when it's maximization
+                    self.is_max = True
+                    a, b, _ = self.parse_expression(tokens[1:])
+                    self.set_objective_function(a, b, 1)
+                case 'INT':
+                    # integrality declaration. Ex: INT x, y
+                    self.declare_integer([name for _, _, name, _ in tokens[1:] if name])
+                case _:
+                    yield self.parse_expression(tokens)
+
+
+    def parse_expression(self, tokens: list[tuple[str, str, str, str]]):
+        """Reads the terms of an expression in a single pass.
+
+        The terms on the right side of a relation are moved to the left side, and
+        the literals are moved to the right side. Returns [coefficients, constant, relation],
+        where the coefficients are indexed by column.
+        """
+        a = {}
+        b = Fraction(0)
+        relation = None
+        side = 1 # -1 after the relation
+
+        # state of the current term. The coefficient stays None while it is one
+        sign, coeff, var, op = side, None, None, '*'
+        started = False
+
+        for rel, number, name, symbol in tokens:
+            if number:
+                value = to_fraction(number)
+                if coeff is None:
+                    coeff = 1 / value if op == '/' else value
+                else:
+                    coeff = coeff / value if op == '/' else coeff * value
+                op = None
+                started = True
+            elif name:
+                var = name
+                op = None
+                started = True
+            elif symbol in ('*', '/'):
+                op = symbol
+            elif symbol in ('+', '-'):
+                if op is None:
+                    # binary operator, close the current term
+                    b = self.__add_term(a, b, sign, coeff, var)
+                    sign, coeff, var, op = (-side if symbol == '-' else side), None, None, '*'
+                    started = False
+                elif symbol == '-':
+                    # unary minus
+                    sign = -sign
+            elif rel:
+                if started:
+                    b = self.__add_term(a, b, sign, coeff, var)
+                relation = rel
+                side = -1
+                sign, coeff, var, op = side, None, None, '*'
+                started = False
+            # parenthesis are ignored
+
+        if started:
+            b = self.__add_term(a, b, sign, coeff, var)
+        return [a, b, relation]
+
+
+    def __add_term(self, a: dict[int, Fraction], b: Fraction, sign: int, coeff: Fraction, var: str):
+        """Adds a term to the coefficients, or its literal to the constant."""
+        if coeff is None:
+            coeff = ONE
+        if sign < 0:
+            coeff = -coeff
+        # the expression is a literal
+        if var is None:
+            return b - coeff
+        # add new variable to the dictionary
+        if not var in self.variables:
+            self.__add_variable(var)
+        index = self.variables[var].index
+        if index in a:
+            a[index] += coeff
         else:
-            b = Fraction(constraint)
-
-        # get coefficients and any literal on left hand side of constraint
-        a, b_aux = self.parse_constraint(equation[:idx])
-        b += b_aux # Ex: x1 + x2 + 3 >= 1
-
-        # handle a bounding constraint. Ex: x >= l
-        if len(equation[:idx]) < 2:
-            # get coefficient and variable name
-            coeff, var = self.__parse_expression(equation[0])
-            # get right hand side of constraint
-            constraint = Fraction(b, coeff) # Ex: 2*x >= 2 -> x >= 1
-            # variable is bounded
-            if constraint >= 0:
-                self.free.remove(var)
-                if constraint == 0: # x >= 0
-                    return
+            a[index] = coeff
+        return b
 
-        # add slack variable
-        for row in self.s:
-            row.append(0) 
-        if not self.s:
-            self.s.append([-1])
-        else:
-            new_row = [0 for i in range(len(self.s[0]) - 1)]
-            new_row.append(-1)
-            self.s.append(new_row)
 
-        # add new values to coefficient matrix
-        self.__add_row(a)
-        # add new constraint to constraint list
-        self.b.append(b)
-
-        # self.__add_constraint_with_slack_var(-1, a, b)
-
-
-    def handle_less_equal(self, equation: list[str]): # x1 + x2 <= 1
-        """Put an upper bound inequality in the standard form and add it to the matrix."""
-        idx = equation.index('<=')
-
-        # get right hand side of constraint
-        constraint = self.__get_constraint(equation[idx + 1:])
+    def set_objective_function(self, a: dict[int, Fraction], b: Fraction, sign: int):
+        """Builds objective function from its coefficients. Minimization is stored as maximization of -f."""
+        while len(self.objective) < self.var_count:
+            self.objective.append(Fraction(0))
+        for index, coeff in a.items():
+            self.objective[index] += sign * coeff
+        self.optimal_value -= sign * b
 
-        # handle - x <= 0 
-        if equation[0] == '-' and len(equation[:idx]) == 2:
-            if str(constraint) == '0':
-                new_equation = equation[1]
-                new_equation.extend(['>=', str(constraint)])
-                self.handle_greater_equal(new_equation)
-                return
 
-        if constraint < 0:
-            new_equation = self.__transform_max_case(equation[:idx])
-            new_equation.append('>=')
-            new_equation.extend(equation[idx + 2:])
-            self.handle_greater_equal(new_equation)
+    def add_constraint(self, a: dict[int, Fraction], b: Fraction, relation: str):
+        """Put a constraint in the standard form and add it to the matrix."""
+        if self.native_bounds and len(a) == 1 and relation in FLIP and next(iter(a.values())) != 0:
+            self.add_bound(a, b, relation)
             return
-        else:
-            b = Fraction(constraint)
-
-        # get coefficients and any literal on left hand side of constraint
-        a, b_aux = self.parse_constraint(equation[:idx])
-        b += b_aux # Ex: x1 + x2 + 3 <= 1
 
-        # add slack variable
-        for row in self.s:
-            row.append(0) 
-        if not self.s:
-            self.s.append([1])
-        else:
-            new_row = [0 for i in range(len(self.s[0]) - 1)]
-            new_row.append(1)
-            self.s.append(new_row)
+        # handle negative right-side of equation. Ex: x >= -3
+        if b < 0:
+            a = {index: -coeff for index, coeff in a.items()}
+            b = -b
+            relation = FLIP[relation]
+
+        match relation:
+            case '>=':
+                # handle a bounding constraint. Ex: x >= l
+                if len(a) == 1:
+                    coeff = next(iter(a.values()))
+                    var = self.__variable_name(next(iter(a)))
+                    # variable is bounded
+                    if coeff > 0:
+                        self.free.pop(var, None)
+                        if b == 0: # x >= 0
+                            return
+                self.__add_slack(-1)
+            case '<=':
+                # handle - x <= 0
+                if len(a) == 1 and b == 0 and next(iter(a.values())) < 0:
+                    self.free.pop(self.__variable_name(next(iter(a))), None)
+                    return
+                self.__add_slack(1)
+            case '==':
+                pass
+            case _:
+                raise ValueError('Constraint without relation')
 
         # add new values to coefficient matrix
         self.__add_row(a)
         # add new constraint to constraint list
         self.b.append(b)
 
-        # self.__add_constraint_with_slack_var(1, a, b)
-
-
-    def handle_equality(self, equation: list[str]): # x1 + x2 == 1
-        """Handles a equality constraint and put it in standard form."""
-        idx = equation.index('==')
 
-        # check if right hand side of constraint is negative
-        constraint = self.__get_constraint(equation[idx + 1:])
-        if constraint < 0:
-            new_equation = self.__transform_max_case(equation[:idx])
-            new_equation.append('==')
-            new_equation.extend(equation[idx + 2:])
-            equation = new_equation
-            b = -constraint
-        else:
-            b = constraint
+    def add_bound(self, a: dict[int, Fraction], b: Fraction, relation: str):
+        """Tightens the bounds of the variable of a single variable constraint a x (relation) b."""
+        (index, coeff), = a.items()
+        if coeff < 0:
+            relation = FLIP[relation]
+        value = b / coeff
+        if relation in ('>=', '=='):
+            lower = self.lower[index]
+            self.lower[index] = value if lower is None else max(lower, value)
+        if relation in ('<=', '=='):
+            upper = self.upper[index]
+            self.upper[index] = value if upper is None else min(upper, value)
+
+
+    def declare_integer(self, names: list[str]):
+        """Marks the variables as integer. A variable may be declared before it appears."""
+        for var in names:
+            if not var in self.variables:
+                self.__add_variable(var)
+            self.integer[var] = None
 
-        idx = equation.index('==')
 
-        # get right side of the inequation
-        # get coefficients and any literal on left hand side of constraint
-        a, b_aux = self.parse_constraint(equation[:idx])
-        b += b_aux # Ex: x1 + x2 + 3 <= 1
+    def integer_columns(self):
+        """Returns [index, sindex] of the integer variables. A split free variable is integer when var' - var" is."""
+        return [[self.variables[var].index, self.variables[var].sindex] for var in self.integer]
 
-        # add slack variable
-        # for row in self.s:
-        #     row.append(0) 
-        if not self.s:
-            self.s.append([0])
-        else:
-            new_col = [0 for i in range(len(self.s[0]) - 1)]
-            new_col.append(0)
-            self.s.append(new_col)
 
-        # add new values to coefficient matrix
-        self.__add_row(a)
-        # add new constraint to constraint list
-        self.b.append(b)
-
-
-    def handle_free_var(self, var):
+    def handle_free_vars(self, free: list[str]):
         """Separates free variables onto two bound variables."""
-        # create new variable
-        self.variables[var].sindex = self.var_count
-        self.var_count += 1
+        # create new variables
+        columns = []
+        for var in free:
+            self.variables[var].sindex = self.var_count
+            columns.append(self.variables[var].index)
+            self.var_count += 1
 
-        # create column for new variable
-        col = [-a[self.variables[var].index] for a in self.A]
-        # add column to matrix
-        for (a, c) in zip(self.A, col):
-            a.append(c)
-        
-        # add variable to the objective function
-        val = -self.objective[self.variables[var].index]
-        self.objective.append(val)
-
-
-    def parse_constraint(self, equation: list[str]):
-        """Helps parsing constraint equation."""
-        a = [Fraction(0) for i in range(self.var_count)] # coefficients
-        b = 0 # constraint
-
-        i = 0
-        while i < len(equation):
-            if equation[i] in ['+', '-']:
-                i += 1
-                continue
+            # add variable to the objective function
+            self.objective.append(-self.objective[self.variables[var].index])
 
-            expression, j = self.__get_expression(equation[i:])
+        # create the columns of the new variables at once
+        self.A = self.A.hstack(-self.A.take(columns))
 
-            # divide the expression into coefficient and variable
-            coeff, var = self.__parse_expression(expression)
 
-            # treat cases of subtraction
-            if i > 0 and equation[i - 1] == '-':
-                coeff = -coeff
-
-            # coeff is a free number, so subtract it from constraint
-            if not var:
-                b -= coeff
-                i += j
-                continue
-            # add new variable to the dictionary
-            elif not var in self.variables:
-                self.__add_variable(var)
-                a.append(0)
-
-            # add coefficient to objective function
-            a[self.variables[var].index] += coeff
-            i += j
-        
-        return [a, b]
+    def matrix(self):
+        """Returns the sparse coefficient matrix of the constraints followed by the slack columns."""
+        m = len(self.b)
+        return self.A.hstack(CSCMatrix.diagonal(self.slack_rows, [Fraction(s) for s in self.slack_signs], m))
 
 
-    def __parse_expression(self, expression: str): # 2*x1
-        """Divides an expression into coefficient and variable."""
-        # get name of var
-        var_regex = re.compile('([*/]?-?)([a-zA-ZÇç_]+[a-zA-ZÇç_0-9]*)([*/]?)')
-        var = var_regex.search(expression)
-        if var:
-            var = var.group(2)
+    def __add_slack(self, sign: int):
+        """Adds a slack variable to the next row."""
+        self.slack_rows.append(len(self.b))
+        self.slack_signs.append(sign)
 
-        # substitute var name with '1' in expression
-        f = lambda match : match.group(1) + '1' + match.group(3)
-        expression = var_regex.sub(f, expression)
 
-        # get coefficient value
-        coeff = self.__calculate_coeff(expression)
-        return [coeff, var]
-
-
-    def __add_row(self, row: list[int]):
+    def __add_row(self, row: dict[int, Fraction]):
         """Adds new row to coefficient matrix."""
-        if self.A:
-            while len(self.A[0]) < len(row):
-                for a in self.A:
-                    a.append(Fraction(0))
-        self.A.append(row)
-
-        while len(self.objective) < len(row):
-            self.objective.append(Fraction(0))
+        row = {col: coeff for col, coeff in row.items() if coeff != 0}
+        self.buffer.append(list(row), list(row.values()))
 
 
     def __add_variable(self, var: str):
         """Adds new variable to dictionary. Initially, also add it as a free variable."""
         self.variables[var] = Variable(self.var_count)
+        self.var_names.append(var)
         self.var_count += 1
-        self.free.append(var)
-
-    
-    def __get_constraint(self, equation: list[str]):
-        sign = 0
-        if (equation[0] == '-'):
-            equation = equation[1:]
-            sign = 1
-        constraint, j = self.__get_expression(equation)
-        constraint = self.__calculate_coeff(constraint)
-        if sign:
-            constraint = -constraint
-        return constraint
-    
-
-    def __get_expression(self, equation: list[str]):
-        """Joins multiple symbols into an expression."""
-        # join the symbols from the expression
-        expression = ''
-        j = 0
-        for i in range(len(equation)):
-            if equation[i] in ['+', '-']:
-                break
-            expression = expression + equation[i]
-            j += 1
-
-        return [expression, j]
-
-
-    def __transform_max_case(self, equation: list[str]):
-        """Multiplies equation by minus one."""
-        new_equation = []
-        if equation[0] != '-': 
-            new_equation.append('-')
-        if equation[0] == '+' or equation[0] == '-':
-            equation = equation[1:]
-        new_equation.append(equation[0])
-        for word in equation[1:]:
-            if word == '-':
-                new_equation.append('+')
-            elif word == '+':
-                new_equation.append('-')
-            else:
-                new_equation.append(word)
-        return new_equation
-
-    def __calculate_coeff(self, expression: str):
-        """Calculates coefficient value."""
-        expression = expression.replace('(', '')
-        expression = expression.replace(')', '')
-        symbols = re.split('([*/])', expression)
-        coeff = Fraction(symbols[0])
-        for i in range(1, len(symbols), 2):
-            if symbols[i] == '*':
-                coeff *= Fraction(symbols[i + 1])
-            else:
-                coeff /= Fraction(symbols[i + 1])
-        return coeff
+        self.free[var] = None
+        self.lower.append(None)
+        self.upper.append(None)
+
+
+    def __variable_name(self, index: int):
+        return self.var_names[index]
+
+
+@lru_cache(maxsize=None)
+def to_fraction(number: str):
+    """Converts a number of the input to a Fraction. Coefficients repeat a lot, so they are cached."""
+    return Fraction(number)
 
 
 class Variable():
     """Variable of a LP.
-    
+
     Attributes:
 
     index  : int
         index of variable in the coefficient matrix.
     sindex : int
         index of substitution variable in the coefficient matrix (var = var' + var").
-    """ 
+    """
     def __init__(self, _idx1: int, _idx2: int = -1):
         self.index = _idx1
         self.sindex = _idx2
@@ -0,0 +1,146 @@
+import numpy as np
+from fractions import Fraction
+import simplex
+from main import add_artificial_vars
+
+"""
+    Batch solving of LPs sharing the constraint matrix:
+
+        max c x  s.t.  A x = b,  x >= 0
+
+    for many right-hand sides b or many objectives c.
+
+    The base LP (A, b, c) is solved once. Its final basis B gives B^-1 in the
+    identity block of the Tableau, so every other instance is first checked
+    against that basis with a single matrix product. Instances the basis does
+    not solve are warm-started from the last Tableau (objectives) or from the
+    final basis, repaired by dual simplex pivots (right-hand sides).
+"""
+
+
+def solve_batch(A, b, c, rhs = None, costs = None, backend = 'exact'):
+    """Solves the LP once for every row of rhs (as b) or of costs (as c).
+
+    Returns [statuses, objectives, certificates], with one entry per instance.
+    """
+    if (rhs is None) == (costs is None):
+        raise ValueError('Give either rhs or costs')
+
+    A = np.asarray(A)
+    base = solve(A, b, c, backend)
+
+    if rhs is not None:
+        return solve_rhs_batch(A, c, np.asarray(rhs), backend, *base)
+    return solve_cost_batch(A, np.asarray(costs), *base)
+
+
+def solve_rhs_batch(A, c, rhs, backend, status, tableau, certificate, basic_vars, sign):
+    """Solves the instances that only differ in b."""
+    m, n = A.shape
+    k = rhs.shape[0]
+    statuses = np.full(k, None, dtype=object)
+    objectives = np.zeros(k, dtype=object)
+    certificates = np.full(k, None, dtype=object)
+    tol = simplex.tolerance(tableau)
+
+    if status != 'Infeasible':
+        # basic values of every instance with the final basis: B^-1 b
+        values = tableau[1:, :m].dot(convert(rhs * sign, tableau).T)
+
+        # auxiliar variables left in the base must stay at zero level
+        artificial = basic_vars >= m + n
+        feasible = np.all(values[~artificial] > -tol, axis=0) & np.all(abs(values[artificial]) <= tol, axis=0)
+
+        # same basis: same dual certificate, or the same unbounded ray
+        statuses[feasible] = status
+        if status == 'Optimal':
+            objectives[feasible] = certificate.dot(convert(rhs[feasible], tableau).T)
+        for i in np.flatnonzero(feasible):
+            certificates[i] = certificate
+
+    # warm start the remaining instances from the final basis
+    for i in np.flatnonzero(statuses == None):
+        statuses[i], new_tableau, certificates[i], _, _ = solve(A, rhs[i], c, backend, basic_vars)
+        objectives[i] = new_tableau[0, -1]
+
+    return [statuses, objectives, certificates]
+
+
+def solve_cost_batch(A, costs, status, tableau, certificate, basic_vars, sign):
+    """Solves the instances that only differ in c."""
+    m, n = A.shape
+    k = costs.shape[0]
+    statuses = np.full(k, None, dtype=object)
+    objectives = np.zeros(k, dtype=object)
+    certificates = np.full(k, None, dtype=object)
+
+    # the feasible region does not depend on c
+    if status == 'Infeasible':
+        statuses[:] = 'Infeasible'
+        for i in range(k):
+            certificates[i] = certificate
+        return [statuses, objectives, certificates]
+
+    tol = simplex.tolerance(tableau)
+    costs = convert(costs, tableau)
+
+    # reduced costs of every instance with the final basis
+    basic_costs = basic_costs_of(costs, basic_vars, m, n)
+    reduced = basic_costs.dot(tableau[1:, m: -1]) - costs
+    optimal = np.all(reduced > -tol, axis=1)
+
+    statuses[optimal] = 'Optimal'
+    objectives[optimal] = basic_costs[optimal].dot(tableau[1:, -1])
+    duals = basic_costs[optimal].dot(tableau[1:, :m]) * sign
+    for i, y in zip(np.flatnonzero(optimal), duals):
+        certificates[i] = y
+
+    # warm start the remaining instances from the last Tableau
+    for i in np.flatnonzero(~optimal):
+        tableau = tableau.copy()
+        basic_vars = basic_vars.copy()
+        tableau[0, :] = 0
+        tableau[0, m: -1] = -costs[i]
+        tableau[0, :] += basic_costs_of(costs[i: i + 1], basic_vars, m, n)[0].dot(tableau[1:, :])
+        tableau, statuses[i], certificates[i], basic_vars = simplex.simplex(tableau, m, basic_vars, c = 0, tol = tol)
+        objectives[i] = tableau[0, -1]
+        if statuses[i] == 'Optimal':
+            certificates[i] = certificates[i] * sign
+
+    return [statuses, objectives, certificates]
+
+
+def solve(A, b, c, backend, initial_basis = None, pricing = None, stats = None, limits = None):
+    """Solves a single instance with simplex.main.
+
+    Returns [status, tableau, certificate, basic_vars, sign], where sign tells
+    which rows were negated to make the right-hand side non-negative.
+    """
+    # simplex.main expects a non-negative right-hand side
+    sign = np.where(np.asarray(b) < 0, -1, 1)
+    A = A * sign[:, np.newaxis]
+    artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+    status, tableau, certificate, basic_vars, m = simplex.main(A, b * sign, c, basic_vars, artificial_vars, artificial_costs, backend, initial_basis,
+                                                               pricing, stats = stats, limits = limits)
+
+    # the dual certificates refer to the rows of A. A limit leaves none
+    if status != 'Unbound' and certificate is not None:
+        certificate = certificate * sign
+    return [status, tableau, certificate, basic_vars, sign]
+
+
+def basic_costs_of(costs, basic_vars, m, n):
+    """Cost of each basic variable, for every row of costs. Auxiliar variables cost zero."""
+    basic_costs = np.zeros((costs.shape[0], len(basic_vars)), dtype=costs.dtype)
+    original = basic_vars < m + n
+    basic_costs[:, original] = costs[:, basic_vars[original] - m]
+    if costs.dtype == object:
+        basic_costs[:, ~original] = Fraction(0)
+    return basic_costs
+
+
+def convert(values, tableau):
+    """Converts values to the numeric representation of the Tableau."""
+    if tableau.dtype == object:
+        return np.vectorize(Fraction, otypes=[object])(values)
+    return np.asarray(values, dtype=np.float64)
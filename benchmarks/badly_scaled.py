@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import simplex
+import pricing
+from main import add_artificial_vars
+from scaling import METHODS, Scaling
+
+"""
+    Spread of the nonzeros of A, Simplex iterations and error of the objective
+    value of the float64 backend, without and with each scaling method, on
+    random LPs whose rows and columns are badly scaled (1e-4 to 1e6). The error
+    is relative to the exact backend on the LP with the geometric scaling: the
+    fixed tolerance of the exact backend misses the smallest entries of the
+    unscaled LP too.
+
+    Usage: python benchmarks/badly_scaled.py [m n]
+"""
+
+
+def generate(m, n, seed = 0):
+    """Returns A, b, c of max c x s.t. A x <= b, x >= 0 in standard form, with badly scaled rows and columns."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(1, 10, (m, n)) * (rng.random((m, n)) < 0.3)
+    A[rng.integers(0, m, n), np.arange(n)] = rng.integers(1, 10, n)
+    b = A.sum(axis=1) * 10
+    c = rng.integers(1, 10, n)
+
+    rows = 10.0 ** rng.integers(-2, 4, m)
+    cols = 10.0 ** rng.integers(-2, 3, n)
+    A = np.hstack((A * rows[:, np.newaxis] * cols, np.eye(m)))
+    c = np.concatenate((c * cols, np.zeros(m)))
+    return A, b * rows, c
+
+
+def spread(A):
+    """Ratio of the largest to the smallest nonzero of A."""
+    values = np.abs(A[A != 0].astype(np.float64))
+    return values.max() / values.min()
+
+
+def run(m, n):
+    A, b, c = generate(m, n)
+    artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+    result = simplex.main(*Scaling(A).scale(A, b, c), basic_vars.copy(), artificial_vars, artificial_costs, 'exact')
+    exact = float(simplex.get_solution(result[1], result[3], result[4])[0])
+
+    rows = []
+    for method in [None] + METHODS:
+        scaled = (A, b, c) if method is None else Scaling(A, method).scale(A, b, c)
+        rule = pricing.make_pricing('dantzig')
+        start = time.perf_counter()
+        status, tableau, _, basis, k = simplex.main(*scaled, basic_vars.copy(), artificial_vars, artificial_costs,
+                                                    'float64', pricing=rule)
+        seconds = time.perf_counter() - start
+        objective = float(simplex.get_solution(tableau, basis, k)[0])
+        rows.append([method or 'none', spread(scaled[0]), status, rule.iterations,
+                     abs(objective - exact) / max(1.0, abs(exact)), seconds])
+    print(tabulate(rows, headers=['scaling', 'spread', 'status', 'iterations', 'relative error', 'simplex (s)'],
+                   floatfmt=('', '.3g', '', '', '.3g', '.3f')))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (30, 60)
+    run(m, n)
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import simplex
+import pricing
+from main import add_artificial_vars, crash_basis
+
+"""
+    Setup time of the starting base, auxiliar variables left in it and Simplex
+    iterations, without and with the crash basis, on random LPs whose rows are
+    mostly equalities and >= constraints.
+
+    Usage: python benchmarks/crash_basis.py [m n [backend]]
+"""
+
+
+def generate(m, n, seed = 0):
+    """Returns A, b, c of a feasible LP in standard form, with slacks for a quarter of the rows."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(0, 10, (m, n)) * (rng.random((m, n)) < 0.2)
+    # a few columns with a single nonzero give the crash an easy start
+    singles = rng.choice(n, m // 2, replace=False)
+    A[:, singles] = 0
+    A[rng.integers(0, m, len(singles)), singles] = rng.integers(1, 5, len(singles))
+    b = A.dot(rng.integers(0, 5, n))
+    slacks = np.eye(m, dtype=int)[:, np.arange(m) % 4 == 0]
+    A = np.hstack((A, slacks)).astype(object)
+    c = np.concatenate((rng.integers(-5, 10, n), np.zeros(slacks.shape[1], dtype=int)))
+    return A, b.astype(object), c
+
+
+def run(m, n, backend):
+    A, b, c = generate(m, n)
+    rows = []
+    for crash in (False, True):
+        start = time.perf_counter()
+        artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+        if crash:
+            artificial_vars, artificial_costs, basic_vars = crash_basis(A, b, basic_vars)
+        setup = time.perf_counter() - start
+        rule = pricing.make_pricing('dantzig')
+        start = time.perf_counter()
+        simplex.main(A, b, c, basic_vars, artificial_vars, artificial_costs, backend, pricing=rule)
+        rows.append(['crash' if crash else 'slacks', setup, len(artificial_costs), rule.iterations,
+                     time.perf_counter() - start])
+    print(tabulate(rows, headers=['base', 'setup (s)', 'auxiliar', 'iterations', 'simplex (s)'], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (80, 240)
+    run(m, n, sys.argv[3] if len(sys.argv) > 3 else 'float64')
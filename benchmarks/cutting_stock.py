@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from column_generation import ColumnGeneration
+
+"""
+    Column generation on the LP relaxation of cutting stock (Gilmore-Gomory):
+    cut rolls of width W into pieces of widths w_i, at least d_i of each,
+    using as few rolls as possible. Every cutting pattern is a column, and the
+    pricing oracle finds the best one with an integer knapsack. Reports the
+    rounds, the patterns generated against all the maximal patterns and the
+    number of rolls of the LP.
+
+    Usage: python benchmarks/cutting_stock.py [items [backend]]
+"""
+
+
+def generate(items, seed = 0):
+    """Returns the roll width W, the piece widths w and the demands d."""
+    rng = np.random.default_rng(seed)
+    W = 100
+    widths = rng.choice(np.arange(10, 60), items, replace=False)
+    demands = rng.integers(5, 50, items)
+    return W, widths, demands
+
+
+def knapsack(values, widths, W):
+    """Returns the pattern a >= 0 (integer) of largest value with widths . a <= W."""
+    best = [0] * (W + 1)
+    choice = [-1] * (W + 1)
+    for capacity in range(1, W + 1):
+        best[capacity] = best[capacity - 1]
+        for i, width in enumerate(widths):
+            if width <= capacity and best[capacity - width] + values[i] > best[capacity]:
+                best[capacity] = best[capacity - width] + values[i]
+                choice[capacity] = i
+    pattern = np.zeros(len(widths), dtype=int)
+    capacity = W
+    while capacity > 0:
+        if choice[capacity] == -1:
+            capacity -= 1
+        else:
+            pattern[choice[capacity]] += 1
+            capacity -= widths[choice[capacity]]
+    return pattern, best[W]
+
+
+def count_patterns(widths, W):
+    """Number of maximal patterns: no other piece fits in the waste."""
+    def count(i, capacity):
+        if i == len(widths):
+            return int(capacity < min(widths))
+        return sum(count(i + 1, capacity - k * widths[i]) for k in range(capacity // widths[i] + 1))
+    return count(0, W)
+
+
+def run(items, backend):
+    W, widths, demands = generate(items)
+    m = items
+    # max -sum x  s.t.  A x - s = d: the first patterns cut a single width, s are the surplus
+    patterns = np.diag(W // widths)
+    A = np.hstack((patterns, -np.eye(m, dtype=int)))
+    c = np.concatenate((-np.ones(m, dtype=int), np.zeros(m, dtype=int)))
+
+    def oracle(y):
+        # a pattern prices out when -1 - y a < 0, i.e. its value -y a is above 1
+        pattern, value = knapsack([-float(v) for v in y], widths, W)
+        if value <= 1 + 10**-9:
+            return [np.zeros((m, 0), dtype=int), []]
+        return [pattern, [-1]]
+
+    start = time.perf_counter()
+    master = ColumnGeneration(A, demands, c, backend, pricing='dantzig')
+    status, objective, solution, duals, basic_vars = master.solve(oracle)
+    elapsed = time.perf_counter() - start
+
+    generated = master.columns - A.shape[1]
+    rows = [[items, status, -float(objective), master.rounds, generated, count_patterns(widths, W),
+             master.tableau.shape, elapsed]]
+    print(tabulate(rows, headers=['items', 'status', 'rolls (LP)', 'rounds', 'generated', 'all patterns',
+                                  'tableau', 'seconds'], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10, sys.argv[2] if len(sys.argv) > 2 else 'float64')
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from fractions import Fraction
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import simplex
+from main import add_artificial_vars
+
+"""
+    Time of the exact backends of the tableau method: Fraction entries,
+    fraction-free integer pivots and float pivots certified exactly, on random
+    LPs of growing size.
+
+    Usage: python benchmarks/exact_backends.py [m ...]
+"""
+
+BACKENDS = ['exact', 'integer', 'hybrid']
+
+
+def generate(m, seed = 0):
+    """Returns A, b, c of max c x s.t. A x <= b, x >= 0 with m rows, 3m/2 variables and fractional data."""
+    rng = np.random.default_rng(seed)
+    n = m + m // 2
+    fraction = np.frompyfunc(lambda p, q: Fraction(int(p), int(q)), 2, 1)
+    A = fraction(rng.integers(0, 10, (m, n)), rng.integers(1, 4, (m, n)))
+    A[rng.random((m, n)) < 0.5] = Fraction(0)
+    A = np.hstack((A, np.eye(m, dtype=int).astype(object)))
+    b = fraction(rng.integers(10, 100, m), 1)
+    c = np.concatenate((fraction(rng.integers(1, 10, n), rng.integers(1, 3, n)), np.zeros(m, dtype=int)))
+    return A, b, c
+
+
+def run(sizes):
+    rows = []
+    for m in sizes:
+        A, b, c = generate(m)
+        row = [m]
+        objectives = []
+        for backend in BACKENDS:
+            artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+            start = time.perf_counter()
+            status, tableau, certificate, basic_vars, _ = simplex.main(A, b, c, basic_vars, artificial_vars,
+                                                                       artificial_costs, backend)
+            row.append(time.perf_counter() - start)
+            objectives.append(tableau[0, -1])
+        if len(set(objectives)) > 1:
+            raise AssertionError('The backends disagree on m = ' + str(m))
+        rows.append(row)
+    print(tabulate(rows, headers=['m'] + [backend + ' (s)' for backend in BACKENDS], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    run([int(size) for size in sys.argv[1:]] or [10, 20, 40, 80])
@@ -0,0 +1,142 @@
+import numpy as np
+
+"""
+    Reproducible LP families in the input format of Parser.parse_input.
+
+    Every generator writes the LP of a given size and seed to an open file and
+    returns its expected status ('Optimal', 'Infeasible' or 'Unbound').
+"""
+
+
+def write_row(file, coefficients, relation, rhs, names = None):
+    """Writes sum coefficients[j] * x_j (relation) rhs, skipping the zero coefficients."""
+    terms = []
+    for j, value in enumerate(coefficients):
+        if value:
+            name = names[j] if names is not None else f'x{j}'
+            sign = '-' if value < 0 else '+'
+            terms.append(f'{sign} {abs(value)}*{name}')
+    expression = ' '.join(terms).lstrip('+ ') if terms else '0'
+    file.write(f'{expression} {relation} {rhs}\n')
+
+
+def write_objective(file, sense, coefficients, names = None):
+    file.write(sense + ' ')
+    write_row(file, coefficients, '', '', names)
+
+
+def write_nonnegative(file, names):
+    for name in names:
+        file.write(f'{name} >= 0\n')
+
+
+def random_dense(file, size, seed = 0):
+    """max c x s.t. A x <= b, x >= 0 with a dense non-negative A, size rows and 3 size / 2 columns."""
+    rng = np.random.default_rng(seed)
+    m, n = size, size + size // 2
+    A = rng.integers(1, 20, (m, n))
+    write_objective(file, 'MAX', rng.integers(1, 10, n))
+    for i in range(m):
+        write_row(file, A[i], '<=', rng.integers(50, 200))
+    write_nonnegative(file, [f'x{j}' for j in range(n)])
+    return 'Optimal'
+
+
+def transportation(file, size, seed = 0):
+    """min cost of shipping from size sources to 2 size destinations, with enough supply."""
+    rng = np.random.default_rng(seed)
+    sources, destinations = size, 2 * size
+    demand = rng.integers(5, 30, destinations)
+    supply = rng.integers(10, 40, sources)
+    # make the total supply cover the total demand
+    supply[0] += max(0, demand.sum() - supply.sum())
+    names = [f'x{i}_{j}' for i in range(sources) for j in range(destinations)]
+    write_objective(file, 'MIN', rng.integers(1, 20, sources * destinations), names)
+    for i in range(sources):
+        row = np.zeros(sources * destinations, dtype=int)
+        row[i * destinations: (i + 1) * destinations] = 1
+        write_row(file, row, '<=', supply[i], names)
+    for j in range(destinations):
+        row = np.zeros(sources * destinations, dtype=int)
+        row[j::destinations] = 1
+        write_row(file, row, '>=', demand[j], names)
+    write_nonnegative(file, names)
+    return 'Optimal'
+
+
+def assignment(file, size, seed = 0):
+    """min cost assignment of size workers to size tasks."""
+    rng = np.random.default_rng(seed)
+    names = [f'x{i}_{j}' for i in range(size) for j in range(size)]
+    write_objective(file, 'MIN', rng.integers(1, 50, size * size), names)
+    for i in range(size):
+        row = np.zeros(size * size, dtype=int)
+        row[i * size: (i + 1) * size] = 1
+        write_row(file, row, '==', 1, names)
+    for j in range(size):
+        row = np.zeros(size * size, dtype=int)
+        row[j::size] = 1
+        write_row(file, row, '==', 1, names)
+    write_nonnegative(file, names)
+    return 'Optimal'
+
+
+def klee_minty(file, size, seed = 0):
+    """The Klee-Minty cube with size variables, where Dantzig's rule visits all 2^size vertices."""
+    n = size
+    write_objective(file, 'MAX', [2 ** (n - 1 - j) for j in range(n)])
+    for i in range(n):
+        # rows are doubled, otherwise the last variable is an identity column and starts optimal
+        row = [2 ** (i - j + 2) for j in range(i)] + [2] + [0] * (n - i - 1)
+        write_row(file, row, '<=', 2 * 5 ** (i + 1))
+    write_nonnegative(file, [f'x{j}' for j in range(n)])
+    return 'Optimal'
+
+
+def degenerate(file, size, seed = 0):
+    """max c x over a cone cut by a single row: most constraints are tight at zero."""
+    rng = np.random.default_rng(seed)
+    m, n = 2 * size, size
+    write_objective(file, 'MAX', rng.integers(1, 10, n))
+    for i in range(m - 1):
+        write_row(file, rng.integers(-5, 6, n), '<=', 0)
+    write_row(file, np.ones(n, dtype=int), '<=', 10 * n)
+    write_nonnegative(file, [f'x{j}' for j in range(n)])
+    return 'Optimal'
+
+
+def infeasible(file, size, seed = 0):
+    """A random LP with two contradicting rows on the sum of the variables."""
+    rng = np.random.default_rng(seed)
+    m, n = size, size + size // 2
+    write_objective(file, 'MAX', rng.integers(1, 10, n))
+    for i in range(m - 2):
+        write_row(file, rng.integers(0, 10, n), '<=', rng.integers(50, 200))
+    write_row(file, np.ones(n, dtype=int), '>=', 10)
+    write_row(file, np.ones(n, dtype=int), '<=', 9)
+    write_nonnegative(file, [f'x{j}' for j in range(n)])
+    return 'Infeasible'
+
+
+def unbounded(file, size, seed = 0):
+    """A random LP where the last variable grows freely and improves the objective."""
+    rng = np.random.default_rng(seed)
+    m, n = size, size + size // 2
+    A = rng.integers(0, 10, (m, n))
+    A[:, -1] = -rng.integers(0, 3, m)
+    write_objective(file, 'MAX', rng.integers(1, 10, n))
+    for i in range(m):
+        write_row(file, A[i], '<=', rng.integers(50, 200))
+    write_nonnegative(file, [f'x{j}' for j in range(n)])
+    return 'Unbound'
+
+
+FAMILIES = {
+    'dense': random_dense,
+    'transportation': transportation,
+    'assignment': assignment,
+    'klee-minty': klee_minty,
+    'degenerate': degenerate,
+    'infeasible': infeasible,
+    'unbounded': unbounded,
+}
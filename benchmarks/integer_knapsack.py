@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main
+from branch_and_bound import BranchAndBound
+from families import write_objective, write_row
+
+"""
+    Branch and bound on random multidimensional knapsacks with bounded integer
+    variables: nodes, gap and time of each node selection and number of
+    workers, to size the runs. The root LP and every node use the backend.
+
+    Usage: python benchmarks/integer_knapsack.py [n [rows [backend [max_nodes]]]]
+"""
+
+
+def generate(file, n, rows, seed = 0):
+    """Writes max c x s.t. A x <= b, 0 <= x <= 3, x integer, with rows knapsack constraints."""
+    rng = np.random.default_rng(seed)
+    names = [f'x{j}' for j in range(n)]
+    A = rng.integers(5, 40, (rows, n))
+    write_objective(file, 'MAX', A.sum(axis=0) + rng.integers(-10, 10, n), names)
+    for i in range(rows):
+        write_row(file, A[i], '<=', A[i].sum() // 2)
+    for name in names:
+        file.write(f'{name} >= 0\n{name} <= 3\n')
+    file.write('INT ' + ', '.join(names) + '\n')
+
+
+def run(n, rows, backend, max_nodes):
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        generate(file, n, rows)
+    results = []
+    try:
+        for selection in ('best-bound', 'depth-first'):
+            for workers in (1, max(2, os.cpu_count())):
+                brancher = solve(file.name, backend, selection, workers, max_nodes)
+                results.append([selection, workers, brancher.status, float(brancher.incumbent or 0), brancher.nodes,
+                                brancher.pruned, brancher.depth, brancher.gap(), brancher.elapsed])
+    finally:
+        os.remove(file.name)
+    print(tabulate(results, headers=['selection', 'workers', 'status', 'objective', 'nodes', 'pruned', 'depth', 'gap',
+                                     'seconds'], floatfmt='.3f'))
+
+
+def solve(input_filename, backend, selection, workers, max_nodes):
+    """Solves the LP of input_filename with branch and bound. Returns the BranchAndBound of the search."""
+    parser = main.read(input_filename)
+    A = parser.matrix().toarray()
+    b = np.array(parser.b)
+    c = np.array(list(parser.objective) + [0] * len(parser.slack_rows))
+    artificial_vars, artificial_costs, basic_vars = main.add_artificial_vars(A)
+    brancher = BranchAndBound(A, b, c, parser.integer_columns(), backend, 'dantzig', selection, workers, max_nodes)
+    brancher.solve(basic_vars, artificial_vars, artificial_costs)
+    return brancher
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    run(int(args[0]) if len(args) > 0 else 12, int(args[1]) if len(args) > 1 else 3,
+        args[2] if len(args) > 2 else 'float64', int(args[3]) if len(args) > 3 else 5000)
@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main
+from Parser import Parser
+
+"""
+    Rows and time of the tableau method on box-constrained LPs, with the bounds
+    as rows (and the free variables split) or as native bounds.
+
+    Usage: python benchmarks/native_bounds.py [m n [backend]]
+"""
+
+
+def generate(file, m, n, seed = 0):
+    """Writes a random feasible LP with m constraints, n boxed variables and a few free ones."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(-3, 10, (m, n))
+    x = rng.integers(0, 5, n)
+    file.write('MAX ' + ' + '.join(f'{rng.integers(1, 10)}*x{j}' for j in range(n)) + '\n')
+    for i in range(m):
+        terms = ' + '.join(f'{A[i, j]}*x{j}' for j in range(n) if A[i, j])
+        file.write(f'{terms or "0"} <= {A[i].dot(x) + rng.integers(0, 10)}\n')
+    for j in range(n):
+        if j % 10:
+            file.write(f'x{j} >= 0\nx{j} <= {x[j] + rng.integers(1, 5)}\n')
+
+
+def run(m, n, backend):
+    rows = []
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        generate(file, m, n)
+    try:
+        for native_bounds in (False, True):
+            parser = Parser(native_bounds)
+            parser.parse_input(file.name)
+            start = time.perf_counter()
+            main.main(file.name, os.devnull, backend, native_bounds=native_bounds)
+            elapsed = time.perf_counter() - start
+            rows.append(['native' if native_bounds else 'rows', len(parser.b), parser.var_count, elapsed])
+    finally:
+        os.remove(file.name)
+    print(tabulate(rows, headers=['bounds', 'm', 'variables', 'seconds'], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (40, 60)
+    run(m, n, sys.argv[3] if len(sys.argv) > 3 else 'float64')
@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from Parser import Parser
+import model
+
+"""
+    Parse throughput of Parser.parse_input, in terms per second, and load time
+    of the same LP compiled by model.py, with Fractions and with float64 values.
+
+    Usage: python benchmarks/parse_throughput.py [terms ...]
+"""
+
+TERMS_PER_ROW = 10
+
+
+def generate(file, terms, seed = 0):
+    """Writes a random LP with about `terms` terms. Returns the number of terms written."""
+    rng = random.Random(seed)
+    n = max(TERMS_PER_ROW, terms // 100)
+    written = 0
+
+    objective = ['MAX'] + [' + '.join(str(rng.randint(1, 9)) + '*x' + str(j) for j in range(n))]
+    file.write(' '.join(objective) + '\n')
+    written += n
+
+    while written < terms:
+        row = []
+        for j in rng.sample(range(n), TERMS_PER_ROW):
+            term = rng.choice(['', '2*', '3/4*', '(1/3)*', '5*']) + 'x' + str(j)
+            row.append(term if not row else rng.choice(['+', '-']) + ' ' + term)
+        file.write(' '.join(row) + ' ' + rng.choice(['<=', '>=', '==']) + ' ' + str(rng.randint(1, 100)) + '\n')
+        written += TERMS_PER_ROW
+    return written
+
+
+def main(sizes):
+    print(f'{"terms":>10} {"seconds":>10} {"terms/s":>12} {"load (s)":>10} {"float (s)":>10}')
+    for size in sizes:
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+            terms = generate(file, size)
+        compiled = file.name[:-len('.txt')] + model.EXTENSION
+        try:
+            start = time.perf_counter()
+            parser = Parser()
+            parser.parse_input(file.name)
+            elapsed = time.perf_counter() - start
+            model.save(parser, compiled)
+            loads = []
+            for exact in (True, False):
+                start = time.perf_counter()
+                model.load(compiled, exact)
+                loads.append(time.perf_counter() - start)
+        finally:
+            os.remove(file.name)
+            if os.path.exists(compiled):
+                os.remove(compiled)
+        print(f'{terms:>10} {elapsed:>10.3f} {terms / elapsed:>12.0f} {loads[0]:>10.3f} {loads[1]:>10.3f}')
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10**4, 10**5, 10**6])
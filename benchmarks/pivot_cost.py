@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import simplex
+import pricing
+
+"""
+    Wall-clock cost of a Simplex iteration (ratio test and pivot) of the tableau
+    method, for every backend.
+
+    Usage: python benchmarks/pivot_cost.py [m n]
+"""
+
+
+def build(m, n, backend, seed = 0):
+    """Returns the Phase 2 Tableau of max c x s.t. A x <= b, x >= 0, with the slacks in the base."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(0, 10, (m, n)) * (rng.random((m, n)) < 0.3)
+    b = rng.integers(1, 100, m)
+    c = rng.integers(1, 10, n)
+    tableau = np.hstack((np.vstack((np.zeros(m), np.eye(m))),
+                         np.vstack((-c, A)),
+                         np.vstack((np.zeros(m), np.eye(m))),
+                         np.concatenate(([0], b))[np.newaxis].T))
+    return simplex.to_backend(tableau, backend), m + n + np.arange(m)
+
+
+def run(m, n):
+    rows = []
+    for backend in simplex.BACKENDS:
+        tableau, basic_vars = build(m, n, backend)
+        rule = pricing.make_pricing('dantzig')
+        start = time.perf_counter()
+        simplex.simplex(tableau, m, basic_vars, c = 0, tol = simplex.tolerance(tableau), pricing = rule)
+        elapsed = time.perf_counter() - start
+        rows.append([backend, rule.iterations, elapsed, 1000 * elapsed / max(rule.iterations, 1)])
+    print(tabulate(rows, headers=['backend', 'iterations', 'seconds', 'ms/iteration'], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (100, 150)
+    run(m, n)
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main
+import pricing
+
+"""
+    Simplex iterations and time of every pricing rule, on random LPs.
+
+    Usage: python benchmarks/pricing_iterations.py [m n [backend]]
+"""
+
+
+def generate(file, m, n, seed = 0):
+    """Writes a random feasible LP with m constraints and n variables."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(0, 10, (m, n))
+    x = rng.integers(0, 5, n)
+    file.write('MAX ' + ' + '.join(f'{rng.integers(1, 10)}*x{j}' for j in range(n)) + '\n')
+    for i in range(m):
+        terms = ' + '.join(f'{A[i, j]}*x{j}' for j in range(n) if A[i, j])
+        relation = '<=' if i % 4 else '>='
+        file.write(f'{terms or "0"} {relation} {A[i].dot(x)}\n')
+    for j in range(n):
+        file.write(f'x{j} >= 0\n')
+
+
+def run(m, n, backend, seeds = 3):
+    rows = []
+    for name in pricing.RULES:
+        iterations = elapsed = 0
+        for seed in range(seeds):
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+                generate(file, m, n, seed)
+            rule = pricing.make_pricing(name)
+            try:
+                start = time.perf_counter()
+                main.main(file.name, os.devnull, backend, pricing_rule=rule)
+                elapsed += time.perf_counter() - start
+            finally:
+                os.remove(file.name)
+            iterations += rule.iterations
+        rows.append([name, iterations / seeds, elapsed / seeds])
+    print(tabulate(rows, headers=['pricing', 'iterations', 'seconds'], floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (60, 90)
+    run(m, n, sys.argv[3] if len(sys.argv) > 3 else 'float64')
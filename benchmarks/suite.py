@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import main
+import pricing
+import simplex
+from stats import Stats
+from families import FAMILIES
+
+"""
+    Benchmark suite: solves every LP family of families.py at several sizes
+    and reports the time of the parse, the setup, Phase 1 and Phase 2, and the
+    iterations. The results can be saved to JSON and compared with the results
+    of another commit.
+
+    Usage: python benchmarks/suite.py [--families NAME ...] [--sizes N ...]
+               [--backend B] [--method M] [--pricing P] [--repeat R]
+               [--output results.json] [--compare baseline.json]
+"""
+
+STAGES = ['parse', 'setup', 'phase 1', 'phase 2', 'total']
+
+
+def run(families, sizes, repeat = 1, **options):
+    """Returns one result per family and size, with the best time of each stage over the repeats."""
+    results = []
+    for family in families:
+        for size in sizes:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+                expected = FAMILIES[family](file, size)
+            try:
+                runs = []
+                for _ in range(repeat):
+                    stats = Stats()
+                    main.solve(file.name, stats = stats, **options)
+                    runs.append(stats.to_dict())
+            finally:
+                os.remove(file.name)
+            times = {stage: min(run['times'].get(stage, 0) for run in runs) for stage in STAGES}
+            results.append({'family': family, 'size': size, 'status': runs[0]['status'], 'expected': expected,
+                            'iterations': runs[0]['iterations'], 'rows': runs[0]['rows'],
+                            'columns': runs[0]['columns'], 'times': times})
+    return results
+
+
+def table(results, baseline = None):
+    """Returns the results as a table. With a baseline, adds the ratio of the total times."""
+    previous = {(result['family'], result['size']): result for result in baseline or []}
+    rows = []
+    for result in results:
+        status = result['status'] if result['status'] == result['expected'] else result['status'] + ' (!)'
+        row = [result['family'], result['size'], status, result['iterations']]
+        row += [result['times'][stage] for stage in STAGES]
+        if baseline is not None:
+            old = previous.get((result['family'], result['size']))
+            row.append(result['times']['total'] / old['times']['total'] if old else None)
+            row.append(result['iterations'] - old['iterations'] if old else None)
+        rows.append(row)
+    headers = ['family', 'size', 'status', 'iterations'] + [stage + ' (s)' for stage in STAGES]
+    if baseline is not None:
+        headers += ['total / baseline', 'iterations - baseline']
+    return tabulate(rows, headers=headers, floatfmt='.4f')
+
+
+def commit():
+    """Returns the current commit of the repository, or None outside of git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description = 'Times the solver on generated LP families.')
+    arg_parser.add_argument('--families', nargs = '+', choices = list(FAMILIES), default = list(FAMILIES))
+    arg_parser.add_argument('--sizes', nargs = '+', type = int, default = [4, 8, 12])
+    arg_parser.add_argument('--backend', choices = simplex.BACKENDS, default = 'exact')
+    arg_parser.add_argument('--method', choices = main.METHODS, default = 'tableau')
+    arg_parser.add_argument('--pricing', choices = list(pricing.RULES), default = 'bland')
+    arg_parser.add_argument('--repeat', type = int, default = 1, help = 'solves of each LP, the best time is kept')
+    arg_parser.add_argument('--output', help = 'file where the results are saved, as JSON')
+    arg_parser.add_argument('--compare', help = 'results of a previous run, to compare with')
+    args = arg_parser.parse_args()
+
+    results = run(args.families, args.sizes, args.repeat, backend = args.backend, method = args.method,
+                  pricing_rule = args.pricing)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)['results']
+    print(table(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'commit': commit(), 'backend': args.backend, 'method': args.method, 'pricing': args.pricing,
+                       'results': results}, file, indent=2)
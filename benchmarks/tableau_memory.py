@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import simplex
+from main import add_artificial_vars
+
+"""
+    Peak memory and time of simplex.main, from the Tableau setup to the end of
+    Phase 2, relative to the size of a single float64 Phase 1 Tableau. The exact
+    backends also hold the growing Fractions, so they are best run on small LPs.
+
+    Usage: python benchmarks/tableau_memory.py [m n [backend ...]]
+"""
+
+
+def generate(m, n, seed = 0):
+    """Returns A, b, c of a feasible LP in standard form whose rows all need an auxiliar variable."""
+    rng = np.random.default_rng(seed)
+    A = rng.integers(1, 10, (m, n)) * (rng.random((m, n)) < 0.5)
+    b = A.dot(rng.integers(1, 5, n))
+    c = rng.integers(-5, 10, n)
+    return A, b, c
+
+
+def run(m, n, backends):
+    A, b, c = generate(m, n)
+    artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+    # the Phase 1 Tableau: two cost rows over [I | A | w | b]
+    shape = (m + 2, m + n + artificial_vars.shape[1] + 1)
+    size = np.zeros(shape).nbytes
+    print(f'Phase 1 Tableau: {shape[0]} x {shape[1]}, {size / 2**20:.2f} MiB in float64')
+
+    rows = []
+    for backend in backends:
+        tracemalloc.start()
+        start = time.perf_counter()
+        status = simplex.main(A, b, c, basic_vars.copy(), artificial_vars, artificial_costs, backend, pricing='dantzig')[0]
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rows.append([backend, status, peak / 2**20, peak / size, elapsed])
+    print(tabulate(rows, headers=['backend', 'status', 'peak (MiB)', 'peak / float64 tableau', 'seconds'],
+                   floatfmt='.2f'))
+
+
+if __name__ == '__main__':
+    m, n = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (200, 400)
+    run(m, n, sys.argv[3:] or ['float64'])
@@ -0,0 +1,185 @@
+from fractions import Fraction
+import numpy as np
+from simplex import divide
+
+"""
+    Native bounds l <= x <= u of the variables, for the bounded-variable Simplex.
+
+    Every variable is written as x = offset + sign * x', where x' >= 0 and
+    x' <= U when the variable has both bounds. A variable with a lower bound is
+    shifted to it, a variable with only an upper bound is complemented from it,
+    and a free variable keeps a single column. The Simplex keeps the nonbasic
+    x' at zero: when one reaches its upper bound U, its column is complemented
+    (x' = U - x''), so the right-hand side still holds the basic values.
+
+    An infeasibility certificate refers to the system in x' before any
+    complement: A' x' = b' with A' = A diag(sign) and b' = b - A offset, and the
+    rows x' + s = U of the variables with both bounds, where x', s >= 0 (a free
+    x' has no sign). It is [y, z], with y over the rows of A and z over its
+    columns (zero without an upper bound), such that y A' + z >= 0 (= 0 on the
+    free columns), z >= 0 and y b' + z U < 0.
+"""
+
+
+class Bounds():
+    """Bounds of the columns of A and the substitution x = offset + sign * x'.
+
+    Attributes:
+        upper : ndarray
+            upper bound U of every x', np.inf when there is none.
+        free : ndarray
+            true for the variables without bounds.
+        sign, offset : ndarray
+            current substitution of every variable.
+        constant : Fraction
+            objective value of the initial offsets.
+        row_sign : ndarray
+            -1 for the rows negated to keep the right-hand side non-negative.
+        A : ndarray
+            A' of the transformed LP, with the rows negated by row_sign.
+        conflicts : list[int]
+            columns whose lower bound is greater than the upper bound.
+    """
+    def __init__(self, lower, upper):
+        n = len(lower)
+        self.upper = np.full(n, np.inf, dtype=object)
+        self.free = np.zeros(n, dtype=bool)
+        self.sign = np.ones(n, dtype=int)
+        self.offset = np.array([Fraction(0)] * n, dtype=object)
+        self.constant = Fraction(0)
+        self.row_sign = None
+        self.A = None
+        self.conflicts = []
+
+        for j, (l, u) in enumerate(zip(lower, upper)):
+            if l is not None:
+                # x = l + x', 0 <= x' <= u - l
+                self.offset[j] = l
+                if u is not None:
+                    self.upper[j] = u - l
+                    if u < l:
+                        self.conflicts.append(j)
+            elif u is not None:
+                # x = u - x', x' >= 0
+                self.offset[j] = u
+                self.sign[j] = -1
+            else:
+                self.free[j] = True
+
+
+    def transform(self, A, b, c):
+        """Writes the LP in terms of x'. Returns [A, b, c] with b >= 0."""
+        b = np.asarray(b) - np.asarray(A).dot(self.offset)
+        self.constant = np.asarray(c).dot(self.offset)
+        A = A * self.sign
+        c = np.asarray(c) * self.sign
+
+        # the Simplex expects a non-negative right-hand side
+        self.row_sign = np.where(b < 0, -1, 1)
+        self.A = A * self.row_sign[:, np.newaxis]
+        return [self.A, b * self.row_sign, c]
+
+
+    def upper_of(self, columns, dtype = object):
+        """Upper bounds of the given columns. The auxiliar columns past the last one have none."""
+        columns = np.asarray(columns)
+        upper = np.full(len(columns), np.inf, dtype=object)
+        inside = (columns >= 0) & (columns < len(self.upper))
+        upper[inside] = self.upper[columns[inside]]
+        return upper if dtype == object else upper.astype(dtype)
+
+
+    def free_of(self, columns):
+        """True for the given columns that are free variables."""
+        columns = np.asarray(columns)
+        free = np.zeros(len(columns), dtype=bool)
+        inside = (columns >= 0) & (columns < len(self.free))
+        free[inside] = self.free[columns[inside]]
+        return free
+
+
+    def complement(self, tableau, column, m):
+        """Substitutes x' = U - x'' (or x' = -x'' for a free variable) in a nonbasic column."""
+        j = column - m
+        upper = self.upper[j]
+        if upper != np.inf:
+            if tableau.dtype != object:
+                upper = float(upper)
+            tableau[:, -1] -= tableau[:, column] * upper
+            self.offset[j] += self.sign[j] * self.upper[j]
+        tableau[:, column] = -tableau[:, column]
+        self.sign[j] = -self.sign[j]
+
+
+    def complement_free(self, tableau, m, c, basic_vars, tol):
+        """Complements the nonbasic free columns with a positive reduced cost, so they can enter the base."""
+        costs = tableau[c, m: m + len(self.free)]
+        candidates = self.free & (costs > tol).astype(bool)
+        candidates[basic_vars[basic_vars < m + len(self.free)] - m] = False
+        for j in np.flatnonzero(candidates):
+            self.complement(tableau, m + j, m)
+
+
+    def choose_pivot_row(self, tableau, pivot_column, c, basic_vars, m, tol, bland = False):
+        """Bounded ratio test. Returns [pivot row, kind], where kind tells which bound stops the step:
+
+        'lower' when a basic variable goes down to zero, 'upper' when it goes up
+        to its upper bound, and 'flip' when the entering variable reaches its own
+        upper bound first, without a pivot. The pivot row is None when nothing
+        stops the step. With bland, ties go to the smallest basic variable.
+        """
+        dtype = object if tableau.dtype == object else np.float64
+        column = tableau[c + 1:, pivot_column]
+        rhs = tableau[c + 1:, -1]
+        upper = self.upper_of(basic_vars - m, dtype)
+        bounded = ~self.free_of(basic_vars - m)
+
+        ratios = np.full(len(column), np.inf, dtype=dtype)
+        down = bounded & (column > tol).astype(bool)
+        up = bounded & (column < -tol).astype(bool) & (upper != np.inf).astype(bool)
+        ratios[down] = divide(rhs[down], column[down])
+        ratios[up] = divide(upper[up] - rhs[up], -column[up])
+
+        entering = self.upper_of([pivot_column - m], dtype)[0]
+        row = np.argmin(ratios) if len(ratios) else None
+        if bland and row is not None and ratios[row] != np.inf:
+            # exact ratios tie exactly, float ratios within the tolerance
+            slack = 0 if dtype == object else tol
+            ties = np.flatnonzero((ratios <= ratios[row] + slack).astype(bool))
+            row = ties[np.argmin(basic_vars[ties])]
+        if row is None or entering <= ratios[row]:
+            if entering == np.inf:
+                return [None, 'lower']
+            return [None, 'flip']
+        return [row + 1 + c, 'upper' if up[row] else 'lower']
+
+
+    def solution(self, values):
+        """Maps the values of x' to x."""
+        return [offset + sign * value for offset, sign, value in zip(self.offset, self.sign, values)]
+
+
+    def certificate(self, status, certificate):
+        """Maps a certificate of the transformed LP to the original one: rays by column, duals by row.
+
+        An infeasibility certificate gets the multipliers z of the upper bounds.
+        """
+        if status == 'Unbound':
+            return np.asarray(certificate) * self.sign
+        y = np.asarray(certificate) * self.row_sign
+        if status != 'Infeasible':
+            return y
+        # the bound rows cover the negative entries of y A' on the columns with an upper bound
+        reduced = np.asarray(certificate).dot(self.A)
+        z = np.zeros(len(self.upper), dtype=reduced.dtype)
+        bounded = (self.upper != np.inf).astype(bool)
+        z[bounded] = np.maximum(-reduced[bounded], 0)
+        return np.concatenate((y, z))
+
+
+    def conflict_certificate(self, m):
+        """Certificate [y, z] of a lower bound above the upper bound: its row x' + s = U has U < 0."""
+        y = np.array([Fraction(0)] * m, dtype=object)
+        z = np.array([Fraction(0)] * len(self.upper), dtype=object)
+        z[self.conflicts[0]] = Fraction(1)
+        return np.concatenate((y, z))
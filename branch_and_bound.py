@@ -0,0 +1,429 @@
+import heapq
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+import numpy as np
+import simplex
+from stats import stage
+
+"""
+    Branch and bound for LPs with integer variables:
+
+        max c x  s.t.  A x = b,  x >= 0,  x_j - x_s integer for the integer variables [j, s]
+
+    where x_s is the negative part of a free variable split by the Parser, and
+    is left out (s = -1) for the others. Branching on x_j - x_s instead of on
+    both parts keeps the tree finite when the free variable is bounded.
+
+    Every node is the LP relaxation with tighter bounds on some integer
+    variables, and is solved from the Phase 2 Tableau of its parent: the bound
+    is added as a row with simplex.add_constraint, or replaces the right-hand
+    side of the bound row of the same variable with simplex.change_rhs, and
+    the dual simplex restores feasibility from the parent basis.
+
+    The bound rows of the input (a x plus a slack) are found at the root and
+    rounded to integers, so the branches tighten them in place instead of
+    adding rows. The nodes are chosen by best bound (the largest LP value of
+    the parent) or depth first. With several workers, a batch of nodes is
+    solved at once in a process pool.
+"""
+
+SELECTIONS = ['best-bound', 'depth-first']
+
+STATUSES = ['NodeLimit']
+
+# distance to the nearest integer under which a float64 value is integer
+integrality = 10**-6
+
+# nodes whose bound is within this fraction of the incumbent are pruned
+relative_gap = 0
+
+
+class Node():
+    """Open node of the search: the solved Tableau of its parent and the bound added to it.
+
+    Attributes:
+        tableau, basic_vars, m
+            Phase 2 Tableau of the parent, as returned by simplex.main. Shared by its children.
+        rhs : ndarray
+            right-hand side of the rows of the Tableau, as given to simplex.change_rhs.
+        rows : dict[tuple[int, str], list]
+            [row, a] of the bound row a x + slack = a * bound of each integer variable x,
+            by its column and relation ('<=' or '>=').
+        lower, upper : dict[int, Fraction]
+            bounds of the integer variables, by column. None when there is none.
+        bound : Fraction
+            objective value of the parent LP, no solution of the node is above it.
+        depth : int
+            branches from the root.
+        branch : tuple[int, int, str, int]
+            column, split column, relation and value of the bound of the node. None at the root.
+    """
+    def __init__(self, tableau, basic_vars, m, rhs, rows, lower, upper, bound = None, depth = 0, branch = None):
+        self.tableau = tableau
+        self.basic_vars = basic_vars
+        self.m = m
+        self.rhs = rhs
+        self.rows = rows
+        self.lower = lower
+        self.upper = upper
+        self.bound = bound
+        self.depth = depth
+        self.branch = branch
+
+
+    def child(self, column, split, relation, value, bound):
+        """Returns the node of x (relation) value, or None when it conflicts with the other bound of x."""
+        lower, upper = dict(self.lower), dict(self.upper)
+        if relation == '<=':
+            if lower[column] is not None and value < lower[column]:
+                return None
+            upper[column] = value
+        else:
+            if upper[column] is not None and value > upper[column]:
+                return None
+            lower[column] = value
+        return Node(self.tableau, self.basic_vars, self.m, self.rhs, dict(self.rows), lower, upper, bound, self.depth + 1,
+                    (column, split, relation, value))
+
+
+class BranchAndBound():
+    """Search tree of a LP with integer variables.
+
+    Attributes:
+        A, b, c : ndarray
+            the LP in standard form, with a dense A as in the tableau method.
+        integer : list[list[int]]
+            [column, split column] of every integer variable, with -1 when it was not split.
+        backend, pricing
+            passed to simplex.main for the root. See simplex.py and pricing.py.
+        selection : str
+            'best-bound' solves the open node with the largest bound first,
+            'depth-first' the deepest one, which finds an incumbent sooner.
+        workers : int
+            processes that solve the nodes. 1 solves them in this process.
+        max_nodes : int
+            nodes allowed, the root included, or None for no limit.
+        stats, limits
+            passed to the root. The time limit of the limits also bounds the search.
+        harris : bool
+            use the Harris two-pass ratio test in the root and the nodes.
+        status : str
+            status of the search.
+        incumbent : Fraction
+            objective value of the best integer solution found, None while there is none.
+        solution : list
+            values of the columns of A in the incumbent.
+        bound : Fraction
+            largest objective value an integer solution may still have.
+        nodes : int
+            nodes solved, the root included.
+        pruned : int
+            nodes discarded by their bound, by a conflict of bounds or as infeasible.
+        depth : int
+            largest depth of a solved node.
+        elapsed : float
+            seconds of the search.
+    """
+    def __init__(self, A, b, c, integer, backend = 'exact', pricing = None, selection = 'best-bound', workers = 1,
+                 max_nodes = None, stats = None, limits = None, harris = False):
+        if selection not in SELECTIONS:
+            raise ValueError('Unknown node selection: ' + str(selection))
+        self.A = A
+        self.b = np.asarray(b).copy()
+        self.c = np.asarray(c)
+        self.integer = [[int(column), int(split)] for column, split in integer]
+        self.backend = backend
+        self.pricing = pricing
+        self.selection = selection
+        self.workers = workers
+        self.max_nodes = max_nodes
+        self.stats = stats
+        self.limits = limits
+        self.harris = harris
+        self.status = None
+        self.incumbent = None
+        self.solution = []
+        self.bound = None
+        self.nodes = 0
+        self.pruned = 0
+        self.depth = 0
+        self.elapsed = 0.0
+        self.__queue = []
+        self.__count = 0
+        self.__exact = True
+
+
+    def solve(self, basic_vars, artificial_vars, artificial_costs):
+        """Solves the root with simplex.main from the given starting basis, then searches the tree.
+
+        Returns [status, objective, solution, certificate, basic_vars], as main.solve.
+        When the root LP is not optimal, its results are returned. The basis is the
+        one of the root LP.
+        """
+        start = time.perf_counter()
+        n = self.A.shape[1]
+        tol = 0 if self.b.dtype == object else integrality
+
+        # round the bound rows of the integer variables before the root
+        rows, lower, upper = bound_rows(self.A, self.b, self.c, self.integer)
+        for column, relation in rows:
+            row, a = rows[column, relation]
+            if relation == '<=':
+                upper[column] = floor(upper[column], tol)
+                self.b[row] = a * upper[column]
+            else:
+                lower[column] = ceil(lower[column], tol)
+                self.b[row] = a * lower[column]
+        for column, _ in self.integer:
+            if lower[column] is not None:
+                lower[column] = ceil(lower[column], tol)
+            if upper[column] is not None:
+                upper[column] = floor(upper[column], tol)
+                if lower[column] is not None and lower[column] > upper[column]:
+                    # no integer value between the bounds
+                    self.status = 'Infeasible'
+                    self.elapsed = time.perf_counter() - start
+                    return ['Infeasible', 0, [], None, basic_vars]
+
+        status, tableau, certificate, root_basis, m = simplex.main(self.A, self.b, self.c, basic_vars, artificial_vars,
+                                                                   artificial_costs, self.backend, pricing = self.pricing,
+                                                                   stats = self.stats, limits = self.limits,
+                                                                   harris = self.harris)
+        self.nodes = 1
+        if status != 'Optimal':
+            self.status = status
+            self.elapsed = time.perf_counter() - start
+            objective, solution = simplex.get_solution(tableau, root_basis, m)
+            if certificate is None:
+                # a limit stopped the root LP, there is no incumbent to write
+                solution = None
+            return [status, objective, solution, certificate, root_basis]
+
+        self.__exact = tableau.dtype == object
+        with stage(self.stats, 'branch and bound'):
+            root = Node(tableau, root_basis, m, self.b, rows, lower, upper)
+            self.__branch(root, n)
+
+            pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else nullcontext()
+            with pool as executor:
+                while self.__queue:
+                    self.status = self.__check(start)
+                    if self.status is not None:
+                        break
+                    batch = []
+                    while self.__queue and len(batch) < self.workers:
+                        node = heapq.heappop(self.__queue)[-1]
+                        # the incumbent may have improved since the node was queued
+                        if self.__prunable(node.bound):
+                            self.pruned += 1
+                        else:
+                            batch.append(node)
+                    # the nodes pivot with the same ratio test as the root
+                    solver = executor.map if self.workers > 1 else map
+                    results = solver(solve_node, batch, repeat(self.harris))
+                    for status, node in results:
+                        self.nodes += 1
+                        self.depth = max(self.depth, node.depth)
+                        if status == 'Optimal':
+                            self.__branch(node, n)
+                        else:
+                            self.pruned += 1
+
+        if self.status is None:
+            self.status = 'Optimal' if self.incumbent is not None else 'Infeasible'
+        bounds = [entry[-1].bound for entry in self.__queue]
+        if self.incumbent is not None:
+            bounds.append(self.incumbent)
+        self.bound = max(bounds) if bounds else None
+        self.elapsed = time.perf_counter() - start
+
+        # a limit keeps the incumbent, when there is one, as the solution
+        if self.incumbent is None:
+            return [self.status, 0, None, None, root_basis]
+        return [self.status, self.incumbent, self.solution, None, root_basis]
+
+
+    def gap(self, offset = 0):
+        """Relative distance between the bound and the incumbent, with the constant offset in the objective.
+
+        Infinite while there is no incumbent.
+        """
+        if self.incumbent is None or self.bound is None:
+            return math.inf
+        return float(self.bound - self.incumbent) / max(abs(float(self.incumbent + offset)), 1e-10)
+
+
+    def report(self, offset = 0, is_max = True):
+        """Returns the nodes, incumbent, bound, gap and time of the search.
+
+        The objective values are written as in the input: with the constant offset,
+        and negated for a minimization.
+        """
+        def value(objective):
+            if objective is None:
+                return '-'
+            objective = objective + offset
+            return str(float(objective if is_max else -objective))
+
+        lines = [f'Branch and bound: {self.nodes} nodes, {self.pruned} pruned, depth {self.depth}, '
+                 f'{self.selection} on {self.workers} workers',
+                 f'    status: {self.status}',
+                 f'    incumbent: {value(self.incumbent)}',
+                 f'    bound: {value(self.bound)}',
+                 f'    gap: {self.gap(offset):.6g}',
+                 f'    time: {self.elapsed:.3f} s']
+        return '\n'.join(lines)
+
+
+    def __branch(self, node, n):
+        """Reads the LP solution of a solved node: updates the incumbent, or queues the two children."""
+        objective, values = simplex.get_solution(node.tableau, node.basic_vars, node.m)
+        if self.__prunable(objective):
+            self.pruned += 1
+            return
+
+        # branch on the most fractional integer variable
+        tol = 0 if self.__exact else integrality
+        fractions = [variable_value(values, column, split) for column, split in self.integer]
+        k = max(range(len(fractions)), key=lambda k: abs(fractions[k] - round(fractions[k])))
+        column, split = self.integer[k]
+        value = fractions[k]
+        if abs(value - round(value)) <= tol:
+            self.incumbent = objective
+            self.solution = values[:n]
+            if not self.__exact:
+                # the float64 integer columns are only within the tolerance of an integer
+                for column, split in self.integer:
+                    for j in [column, split] if split != -1 else [column]:
+                        self.solution[j] = float(round(self.solution[j]))
+                self.incumbent = float(np.dot(self.c, self.solution))
+            return
+
+        for relation, bound in (('<=', math.floor(value)), ('>=', math.ceil(value))):
+            child = node.child(column, split, relation, bound, objective)
+            if child is None:
+                self.pruned += 1
+                continue
+            self.__count += 1
+            key = -child.bound if self.selection == 'best-bound' else -child.depth
+            # ties go to the latest node, which keeps the depth-first search on one path
+            heapq.heappush(self.__queue, (key, -self.__count, child))
+
+
+    def __prunable(self, bound):
+        """A node can be discarded when its bound doesn't beat the incumbent."""
+        if self.incumbent is None:
+            return False
+        tol = relative_gap * abs(self.incumbent)
+        if not self.__exact:
+            tol += simplex.float_epsilon * max(1.0, abs(float(self.incumbent)))
+        return bound <= self.incumbent + tol
+
+
+    def __check(self, start):
+        """Returns the status of the limit reached by the search, or None."""
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            return 'NodeLimit'
+        limits = self.limits
+        if limits is not None and limits.time_limit is not None and time.perf_counter() - limits.start >= limits.time_limit:
+            limits.status = 'TimeLimit'
+            return 'TimeLimit'
+        return None
+
+
+def solve_node(node, harris = False):
+    """Adds the bound of the node to the Tableau of its parent and re-optimizes it. Runs in the workers.
+
+    With harris, the ratio test is the Harris two-pass test.
+
+    Returns [status, node], where the node holds its own Tableau.
+    """
+    column, split, relation, value = node.branch
+    if (column, relation) in node.rows:
+        # tighten the bound row of the variable
+        row, a = node.rows[column, relation]
+        node.rhs = node.rhs.copy()
+        node.rhs[row] = a * value
+        status, node.tableau, _, node.basic_vars, node.m = simplex.change_rhs(node.tableau, node.basic_vars.copy(),
+                                                                              node.m, node.rhs, harris)
+    else:
+        sign = 1 if relation == '<=' else -1
+        a = np.zeros(max(column, split) + 1, dtype=int)
+        a[column] = 1
+        if split != -1:
+            a[split] = -1
+        node.rows[column, relation] = [node.m, sign]
+        node.rhs = np.append(node.rhs, sign * value)
+        status, node.tableau, _, node.basic_vars, node.m = simplex.add_constraint(node.tableau, node.basic_vars, node.m,
+                                                                                  a, value, relation, harris)
+    return [status, node]
+
+
+def bound_rows(A, b, c, integer):
+    """Finds the rows a x + slack = b that bound an integer variable x = x_j - x_s, where the slack is a
+    column with no cost and no other nonzero.
+
+    Returns [rows, lower, upper]: the [row, a] of the tightest bound row of every
+    integer variable and relation, and the bounds of the integer variables, by
+    column. A row without a slack fixes x, but is left out of the rows.
+    """
+    nonzero = (A != 0).astype(bool)
+    slack = (nonzero.sum(axis=0) == 1) & (c == 0).astype(bool)
+    variables = {}
+    for column, split in integer:
+        slack[[column, split] if split != -1 else column] = False
+        variables[column] = split
+
+    rows = {}
+    lower = {column: 0 if split == -1 else None for column, split in integer}
+    upper = {column: None for column, _ in integer}
+    for i in range(A.shape[0]):
+        entries = np.flatnonzero(nonzero[i])
+        columns = entries[~slack[entries]]
+        column = int(columns[0]) if len(columns) else -1
+        if column not in variables:
+            continue
+        split = variables[column]
+        if split == -1:
+            if len(columns) != 1:
+                continue
+        elif len(columns) != 2 or columns[1] != split or A[i, split] != -A[i, column]:
+            continue
+        if len(entries) > len(columns) + 1:
+            continue
+        a = A[i, column]
+        relation = '=='
+        if len(entries) > len(columns):
+            s = entries[slack[entries]][0]
+            relation = '<=' if A[i, s] > 0 else '>='
+            if a < 0:
+                relation = '>=' if relation == '<=' else '<='
+        value = b[i] / a
+
+        if relation != '<=' and (lower[column] is None or value > lower[column]):
+            lower[column] = value
+            if relation == '>=':
+                rows[column, '>='] = [i, a]
+        if relation != '>=' and (upper[column] is None or value < upper[column]):
+            upper[column] = value
+            if relation == '<=':
+                rows[column, '<='] = [i, a]
+    return [rows, lower, upper]
+
+
+def variable_value(values, column, split):
+    """Value of the integer variable x_column - x_split."""
+    return values[column] if split == -1 else values[column] - values[split]
+
+
+def floor(value, tol):
+    """Largest integer at most value, or the nearest one when value is within tol of it."""
+    return math.floor(value + tol)
+
+
+def ceil(value, tol):
+    """Smallest integer at least value, or the nearest one when value is within tol of it."""
+    return math.ceil(value - tol)
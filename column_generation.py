@@ -0,0 +1,131 @@
+from fractions import Fraction
+import numpy as np
+import simplex
+import batch
+from pricing import make_pricing
+from stats import stage
+
+"""
+    Column generation on top of the tableau Simplex, for LPs with too many
+    columns to write down:
+
+        max c x  s.t.  A x = b,  x >= 0
+
+    The restricted master problem holds the columns of A known so far, and
+    must be feasible with them. After every solve, a pricing oracle is called
+    with the duals y and returns new columns a with their costs, as
+    [columns, costs] where columns is m x k. The columns with c_j - y a_j > 0
+    price out: they are appended to the Phase 2 Tableau, which is re-optimized
+    from its current basis by primal Simplex pivots. The loop ends when no
+    column returned by the oracle prices out.
+"""
+
+
+class ColumnGeneration():
+    """Restricted master problem and the columns generated for it.
+
+    Attributes:
+        m : int
+            number of rows of A.
+        columns : int
+            columns of A in the master problem, the generated ones included.
+        tableau : ndarray
+            Phase 2 Tableau of the master problem, a view of buffer.
+        buffer : ndarray
+            memory of the Tableau, with room for more columns. Its capacity
+            doubles when it is full, so the Tableau is only copied a logarithmic
+            number of times. None until the first columns are added.
+        basic_vars : ndarray
+            basic variable of each row of the Tableau.
+        sign : ndarray
+            -1 for the rows negated to make b non-negative, 1 otherwise.
+        status : str
+            status of the last solve of the master problem.
+        certificate : ndarray
+            certificate of the last solve, as in main, with the duals of the rows of A.
+        rounds : int
+            calls of the oracle that added columns.
+        pricing : Pricing
+            rule that chooses the entering column. See pricing.py.
+        stats, limits
+            passed down to the Simplex. See stats.py and limits.py.
+    """
+    def __init__(self, A, b, c, backend = 'exact', pricing = None, stats = None, limits = None):
+        A = np.asarray(A)
+        b = np.asarray(b)
+        self.m, self.columns = A.shape
+        self.pricing = make_pricing(pricing)
+        self.stats = stats
+        self.limits = limits
+        self.rounds = 0
+        self.buffer = None
+
+        self.status, self.tableau, self.certificate, self.basic_vars, self.sign = batch.solve(
+            A, b, np.asarray(c), backend, pricing = self.pricing, stats = stats, limits = limits)
+
+
+    def duals(self):
+        """Returns the duals y of the rows of A at the current basis."""
+        return self.tableau[0, :self.m] * self.sign
+
+
+    def add_columns(self, columns, costs):
+        """Appends the columns (m x k) that price out and re-optimizes the master problem.
+
+        Returns the number of columns added.
+        """
+        m = self.m
+        columns = np.asarray(columns).reshape(m, -1) * self.sign[:, np.newaxis]
+        priced = simplex.price_columns(self.tableau, m, columns, costs)
+        priced = priced[:, (priced[0] < -simplex.tolerance(self.tableau)).astype(bool)]
+        k = priced.shape[1]
+        if not k:
+            return 0
+
+        width = self.tableau.shape[1]
+        if self.buffer is None or width + k > self.buffer.shape[1]:
+            # grow the capacity geometrically, so the copies stay amortized
+            shape = (self.tableau.shape[0], max(width + k, 2 * width))
+            buffer = np.zeros(shape) if self.tableau.dtype != object else np.full(shape, Fraction(0), dtype=object)
+            buffer[:, :width] = self.tableau
+            self.buffer = buffer
+
+        # b moves past the new columns
+        self.buffer[:, width + k - 1] = self.buffer[:, width - 1]
+        self.buffer[:, width - 1: width - 1 + k] = priced
+        self.tableau = self.buffer[:, :width + k]
+
+        # auxiliar variables left in the base have no column, keep them past the last one
+        self.basic_vars = np.where(self.basic_vars >= m + self.columns, self.basic_vars + k, self.basic_vars)
+        self.columns += k
+        self.rounds += 1
+
+        # the basis is still primal feasible, only primal pivots are needed
+        with stage(self.stats, 'reoptimize'):
+            self.status, self.tableau, certificate, self.basic_vars, _ = simplex.reoptimize(
+                self.tableau, m, self.basic_vars, simplex.tolerance(self.tableau), pricing = self.pricing,
+                stats = self.stats, limits = self.limits)
+        if certificate is not None and self.status != 'Unbound':
+            # the duals refer to the rows of A
+            certificate = certificate * self.sign
+        self.certificate = certificate
+        return k
+
+
+    def solve(self, oracle, max_rounds = None):
+        """Calls oracle(y) and adds the columns it returns until none prices out.
+
+        Stops early when the master problem is not optimal, or after max_rounds rounds.
+        Returns [status, objective, solution, certificate, basic_vars], as main.solve.
+        """
+        while self.status == 'Optimal' and (max_rounds is None or self.rounds < max_rounds):
+            columns, costs = oracle(self.duals())
+            if not len(costs) or not self.add_columns(columns, costs):
+                break
+        return self.result()
+
+
+    def result(self):
+        """Returns [status, objective, solution, certificate, basic_vars] of the master problem."""
+        objective, solution = simplex.get_solution(self.tableau, self.basic_vars, self.m)
+        return [self.status, objective, solution, self.certificate, self.basic_vars]
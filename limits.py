@@ -0,0 +1,49 @@
+import time
+
+"""
+    Iteration and time budget of a solve. A Limits object is passed down to
+    the Simplex, like the stats, and checked before every pivot of every phase.
+    When a limit is reached, the Simplex stops with the status 'IterationLimit'
+    or 'TimeLimit' and no certificate.
+"""
+
+STATUSES = ['IterationLimit', 'TimeLimit']
+
+
+class Limits():
+    """Pivots and seconds allowed to a solve, shared by all of its phases.
+
+    Attributes:
+        max_iterations : int
+            pivots allowed, or None for no limit.
+        time_limit : float
+            seconds allowed since the limits were created, or None for no limit.
+        iterations : int
+            pivots made so far.
+        start : float
+            time the limits were created, from time.perf_counter.
+        status : str
+            'IterationLimit' or 'TimeLimit' once a limit is reached, otherwise None.
+    """
+    def __init__(self, max_iterations = None, time_limit = None):
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit
+        self.iterations = 0
+        self.start = time.perf_counter()
+        self.status = None
+
+
+    def check(self):
+        """Called before a pivot. Returns the status of the limit reached, or None and counts the pivot."""
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            self.status = 'IterationLimit'
+        elif self.time_limit is not None and time.perf_counter() - self.start >= self.time_limit:
+            self.status = 'TimeLimit'
+        else:
+            self.iterations += 1
+        return self.status
+
+
+def check(limits):
+    """limits.check(), or None when there are no limits."""
+    return None if limits is None else limits.check()
@@ -1,72 +1,304 @@
-from sys import argv
+import argparse
+import json
+import time
 import numpy as np
 from fractions import Fraction
 from Parser import Parser
+from bounds import Bounds
+import model
+from presolve import Presolve
+from branch_and_bound import BranchAndBound
+import branch_and_bound
+from scaling import Scaling
+import scaling
+from stats import Stats, stage
+from limits import Limits
+from sparse import CSCMatrix
 import simplex
+import revised_simplex
+import pricing
 
-def main(input_filename, output_filename):
-    parser = Parser()
-    
+METHODS = ['tableau', 'revised']
+
+def main(input_filename, output_filename, backend = 'exact', method = 'tableau', initial_basis = None, pricing_rule = None,
+         presolve = False, native_bounds = False, crash = False, stats = None, limits = None, scale = None,
+         selection = 'best-bound', workers = 1, max_nodes = None, reports = None, harris = False):
+    """Solves the LP of input_filename and writes the results to output_filename. Returns the final basis."""
+    status, objective, solution, certificate, basic_vars = solve(input_filename, backend, method, initial_basis, pricing_rule,
+                                                                 presolve, native_bounds, crash, stats, limits, scale,
+                                                                 selection, workers, max_nodes, reports, harris)
+    handle_status(status, objective, solution, certificate, output_filename)
+    return basic_vars
+
+
+def solve(input_filename, backend = 'exact', method = 'tableau', initial_basis = None, pricing_rule = None,
+          presolve = False, native_bounds = False, crash = False, stats = None, limits = None, scale = None,
+          selection = 'best-bound', workers = 1, max_nodes = None, reports = None, harris = False):
+    """Parses and solves the LP of input_filename. Returns [status, objective, solution, certificate, basic_vars].
+
+    The stats, when given, are filled with the time of each stage and the pivots of each phase. See stats.py.
+    The limits, when given, stop the Simplex with the status 'IterationLimit' or 'TimeLimit'. See limits.py.
+    With a scale method, the rows and columns of A are scaled before the Simplex. See scaling.py.
+    The scale 'auto' picks the geometric scaling for float arithmetic and none otherwise.
+    When the LP declares integer variables, it is solved by branch and bound with the node
+    selection, workers and node limit given. See branch_and_bound.py.
+    The reports, when given a list, get the text reports of the presolve and the branch and bound.
+    With harris, the tableau method uses the Harris two-pass ratio test. See simplex.choose_pivot_row.
+    """
+    start = time.perf_counter()
+    # a compiled LP is read in floats when no engine needs Fractions
+    exact = presolve or native_bounds or (backend != 'float64' and method == 'tableau')
+    with stage(stats, 'parse'):
+        parser = read(input_filename, native_bounds, exact)
+    result = solve_parser(parser, backend, method, initial_basis, pricing_rule, presolve, crash, stats, limits, scale,
+                          selection, workers, max_nodes, reports, harris)
+    if stats is not None:
+        stats.times['total'] = time.perf_counter() - start
+    return result
+
+
+def read(input_filename, native_bounds = False, exact = True):
+    """Parses the LP of input_filename, or loads it when it is compiled. Returns the Parser."""
+    if input_filename.endswith(model.EXTENSION):
+        parser = model.load(input_filename, exact)
+        if parser.native_bounds != native_bounds:
+            raise ValueError('The compiled LP was not built with the same bounds option')
+        return parser
+
+    parser = Parser(native_bounds)
     # read and parse input
     parser.parse_input(input_filename)
+    return parser
+
 
-    if parser.s:
-        for i in range(len(parser.s[0])):
-            parser.objective.append(0)
+def solve_parser(parser, backend = 'exact', method = 'tableau', initial_basis = None, pricing_rule = None,
+                 presolve = False, crash = False, stats = None, limits = None, scale = None, selection = 'best-bound',
+                 workers = 1, max_nodes = None, reports = None, harris = False):
+    """Solves the LP read by parser, which is left unchanged. Returns the same as solve."""
+    native_bounds = parser.native_bounds
+    integer = parser.integer_columns()
+    if scale == 'auto':
+        # float arithmetic is scaled, unless an option that can't be scaled is on
+        floating = backend == 'float64' or method == 'revised'
+        scale = 'geometric' if floating and not (native_bounds or presolve or integer) else None
+    if native_bounds and (method != 'tableau' or presolve or scale):
+        raise ValueError('Native bounds need the tableau method, without presolve or scaling')
+    if method == 'revised' and (backend != 'float64' or pricing_rule not in (None, 'bland') or initial_basis is not None
+                                or harris):
+        raise ValueError('The revised method needs the float64 backend and Bland pricing, without a starting basis or the Harris test')
+    if integer and (method != 'tableau' or presolve or scale or native_bounds or initial_basis is not None):
+        raise ValueError('Integer variables need the tableau method, without presolve, scaling, native bounds or a starting basis')
 
     # create Simplex inputs
-    A = np.hstack((parser.A, parser.s))
-    artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
-    b = np.array(parser.b)
-    c = np.array(parser.objective)
+    with stage(stats, 'setup'):
+        A = parser.matrix()
+        b = np.array(parser.b)
+        c = np.array(list(parser.objective) + [0] * len(parser.slack_rows))
 
-    # perform the Simplex Method
-    status, tableau, certificate, basic_vars, m = simplex.main(A, b, c, basic_vars, artificial_vars, artificial_costs)
+        # write the bounded variables in terms of x' >= 0. The slacks are non-negative
+        bounds = None
+        if native_bounds:
+            slacks = len(parser.slack_rows)
+            bounds = Bounds(parser.lower + [Fraction(0)] * slacks, parser.upper + [None] * slacks)
+
+    # reduce the LP before the Simplex
+    presolver = None
+    if presolve:
+        with stage(stats, 'presolve'):
+            presolver = Presolve(A, b, c)
+            A, b, c = presolver.presolve()
+        if reports is not None:
+            reports.append(presolver.report())
+
+    if presolver is not None and presolver.status is not None:
+        # the presolve already solved the LP
+        status, objective, certificate = presolver.status, Fraction(0), presolver.certificate
+        solution = [Fraction(0)] * len(presolver.kept_cols)
+        basic_vars = np.zeros(0, dtype=int)
+    elif bounds is not None and bounds.conflicts:
+        # a lower bound above the upper bound
+        status, objective, certificate = 'Infeasible', Fraction(0), bounds.conflict_certificate(len(b))
+        solution = []
+        basic_vars = np.zeros(0, dtype=int)
+    else:
+        with stage(stats, 'setup'):
+            if method == 'tableau':
+                # the Tableau is dense anyway
+                A = A.toarray()
+            excluded = None
+            if bounds is not None:
+                A, b, c = bounds.transform(A, b, c)
+                # a basic variable could start above its upper bound
+                excluded = (bounds.upper != np.inf).astype(bool)
+            artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A, excluded)
+            if crash:
+                artificial_vars, artificial_costs, basic_vars = crash_basis(A, b, basic_vars, excluded)
+
+        # scale A once the starting basis is chosen, its columns keep a single nonzero
+        scaler = None
+        if scale is not None:
+            with stage(stats, 'scale'):
+                scaler = Scaling(A, scale)
+                A, b, c = scaler.scale(A, b, c)
+
+        # perform the Simplex Method
+        if integer:
+            brancher = BranchAndBound(A, b, c, integer, backend, pricing_rule, selection, workers, max_nodes, stats, limits,
+                                      harris)
+            status, objective, solution, certificate, basic_vars = brancher.solve(basic_vars, artificial_vars, artificial_costs)
+            if reports is not None:
+                reports.append(brancher.report(parser.optimal_value, parser.is_max))
+        elif method == 'revised':
+            status, objective, solution, certificate, basic_vars = revised_simplex.main(A, b, c, basic_vars, artificial_vars, artificial_costs,
+                                                                                        stats, limits)
+        else:
+            status, tableau, certificate, basic_vars, m = simplex.main(A, b, c, basic_vars, artificial_vars, artificial_costs, backend, initial_basis, pricing_rule,
+                                                                       bounds, stats, limits, harris)
+            objective, solution = simplex.get_solution(tableau, basic_vars, m, bounds)
+            if certificate is None:
+                # a limit stopped the Simplex, its basis may not even be feasible
+                solution = None
+            if bounds is not None and certificate is not None:
+                certificate = bounds.certificate(status, certificate)
+        if scaler is not None:
+            # only an optimal solution is written, the others may hold auxiliar columns
+            if status == 'Optimal':
+                solution = scaler.solution(solution)
+            certificate = scaler.certificate(status, certificate)
+
+    # restore the removed rows and columns
+    if presolver is not None:
+        with stage(stats, 'presolve'):
+            objective, solution, certificate = presolver.postsolve(status, objective, solution, certificate)
 
     # handle the results of the Simplex Method
-    tableau[0, -1] += parser.optimal_value
+    objective += parser.optimal_value
     if not parser.is_max:
-        tableau[0, -1] = -tableau[0, -1]
-    handle_status(status, tableau, certificate, basic_vars, output_filename, m)
+        objective = -objective
+    if stats is not None:
+        stats.status = status
+    return [status, objective, solution, certificate, basic_vars]
+
 
+def add_artificial_vars(A, excluded = None):
+    """Finds an identity column for each row, adding an auxiliar variable where there is none.
+
+    The excluded columns (e.g. with an upper bound) never start in the base.
+    """
+    if isinstance(A, CSCMatrix):
+        return add_sparse_artificial_vars(A, excluded)
 
-def add_artificial_vars(A):
     y, x = A.shape
-    I = np.eye(y)
-    basic_vars = np.zeros(y, dtype=int)
-    artificial_vars = np.zeros((y, y), dtype=int)
-    artificial_costs = np.zeros(y, dtype=int)
-    a_count = 0
-
-    for i in range(y):
-        var = check_column(A, I[:, i])
-        # add new auxiliar variable
-        if var == -1:
-            artificial_vars[:, a_count] = I[:, i]
-            artificial_costs[a_count] = 1
-            var = x
-            x += 1
-            a_count += 1
-        # add variable to the base
-        basic_vars[i] = var
-    
-    artificial_vars = np.delete(artificial_vars, np.s_[a_count:], axis=1)
-    artificial_costs = np.delete(artificial_costs, np.s_[a_count:])
+    # columns with a single nonzero equal to one, found in a single pass
+    nonzero = (A != 0).astype(bool)
+    singletons = np.flatnonzero(nonzero.sum(axis=0) == 1)
+    # an A without rows (every constraint became a bound) has no singletons to look up
+    rows = nonzero[:, singletons].argmax(axis=0) if len(singletons) else np.zeros(0, dtype=int)
+    ones = (A[rows, singletons] == 1).astype(bool)
+    singletons, rows = singletons[ones], rows[ones]
+    if excluded is not None:
+        singletons, rows = singletons[~excluded[singletons]], rows[~excluded[singletons]]
+
+    # assign in reverse so the first column of each row is kept
+    basic_vars = np.full(y, -1)
+    basic_vars[rows[::-1]] = singletons[::-1]
+
+    # add new auxiliar variables to the rows without an identity column
+    missing = np.flatnonzero(basic_vars == -1)
+    basic_vars[missing] = x + np.arange(len(missing))
+    artificial_vars = np.eye(y, dtype=int)[:, missing]
+    artificial_costs = np.ones(len(missing), dtype=int)
+
+    return artificial_vars, artificial_costs, basic_vars
+
+
+def add_sparse_artificial_vars(A, excluded = None):
+    """Same as add_artificial_vars, finding the identity columns from the sparse structure."""
+    m, n = A.shape
+    basic_vars = np.full(m, -1)
+
+    # columns with a single nonzero equal to one
+    singletons = np.flatnonzero(np.diff(A.indptr) == 1)
+    singletons = singletons[A.data[A.indptr[singletons]] == 1]
+    if excluded is not None:
+        singletons = singletons[~excluded[singletons]]
+    # assign in reverse so the first column of each row is kept
+    basic_vars[A.indices[A.indptr[singletons]][::-1]] = singletons[::-1]
+
+    # add new auxiliar variables to the rows without an identity column
+    missing = np.flatnonzero(basic_vars == -1)
+    basic_vars[missing] = n + np.arange(len(missing))
+    artificial_vars = CSCMatrix.diagonal(missing, np.ones(len(missing)), m, np.float64)
+    artificial_costs = np.ones(len(missing), dtype=int)
 
     return artificial_vars, artificial_costs, basic_vars
 
 
-def check_column(A, col):
-    for i in range(A.shape[1]):
-        if np.array_equal(A[:, i], col):
-            return i
-    return -1
+def crash_basis(A, b, basic_vars, excluded = None):
+    """Replaces auxiliar variables of the starting base by columns of A, to shrink Phase 1.
+
+    A column enters the row of an auxiliar variable when it has no nonzero in
+    the rows already taken by the crash, so the crash columns form a triangular
+    basis, and when its ratio test picks that row, so the base stays feasible.
+    The sparsest columns are tried first. Returns the same as add_artificial_vars.
+    """
+    m, n = A.shape
+    basic_vars = basic_vars.copy()
+    residual = np.array(b, dtype=object if np.asarray(b).dtype == object else np.float64)
+    taken = np.zeros(m, dtype=bool)
+    candidates = np.ones(n, dtype=bool)
+    candidates[basic_vars[basic_vars < n]] = False
+    if excluded is not None:
+        candidates &= ~excluded
 
+    if isinstance(A, CSCMatrix):
+        counts = np.diff(A.indptr)
+        column = lambda j: (A.indices[A.indptr[j]: A.indptr[j + 1]], A.data[A.indptr[j]: A.indptr[j + 1]])
+    else:
+        counts = (A != 0).astype(bool).sum(axis=0)
+        column = lambda j: (np.flatnonzero((A[:, j] != 0).astype(bool)), A[:, j][(A[:, j] != 0).astype(bool)])
 
-def handle_status(status, tableau, certificate, basic_vars, output_filename, m):
-    """Handle the results of the Simplex Method."""
+    for j in sorted(np.flatnonzero(candidates & (counts > 0)), key=lambda j: counts[j]):
+        if not np.any(basic_vars >= n):
+            break
+        rows, values = column(j)
+        if np.any(taken[rows]):
+            continue
+        # the rows where the column grows limit its value
+        positive = (values > 0).astype(bool)
+        if not np.any(positive):
+            continue
+        ratios = residual[rows[positive]] / values[positive]
+        step = ratios.min()
+        pivots = rows[positive][(ratios == step).astype(bool) & (basic_vars[rows[positive]] >= n)]
+        if not len(pivots):
+            continue
+        row = pivots[0]
+        residual[rows] -= values * step
+        residual[row] = 0
+        taken[row] = True
+        basic_vars[row] = j
+
+    # renumber the auxiliar variables left
+    missing = np.flatnonzero(basic_vars >= n)
+    basic_vars[missing] = n + np.arange(len(missing))
+    if isinstance(A, CSCMatrix):
+        artificial_vars = CSCMatrix.diagonal(missing, np.ones(len(missing)), m, np.float64)
+    else:
+        artificial_vars = np.eye(m, dtype=int)[:, missing]
+    artificial_costs = np.ones(len(missing), dtype=int)
+
+    return artificial_vars, artificial_costs, basic_vars
+
+
+def handle_status(status, objective, solution, certificate, output_filename):
+    """Handle the results of the Simplex Method. A limit leaves no certificate.
+
+    The solution is written when it is optimal, or when branch and bound stopped at
+    a limit with an incumbent. Otherwise it is None.
+    """
     new_certificate = []
-    for value in certificate:
+    for value in certificate if certificate is not None else []:
         new_certificate.append(fraction_to_string(value))
 
     with open(output_filename, 'w') as f:
@@ -77,16 +309,21 @@ def handle_status(status, tableau, certificate, basic_vars, output_filename, m):
                 f.write('inviavel\n')
             case 'Unbound':
                 f.write('ilimitado\n')
+            case 'IterationLimit':
+                f.write('limite de iteracoes\n')
+            case 'TimeLimit':
+                f.write('limite de tempo\n')
+            case 'NodeLimit':
+                f.write('limite de nos\n')
             case 'Optimal':
                 f.write('otimo\n')
-                f.write('Objetivo: ' + fraction_to_string(tableau[0, -1]) + '\n')
-                f.write('Solucao:\n')
-                for i in range(m, tableau.shape[1] - 1):
-                    if i in basic_vars:
-                        f.write(fraction_to_string(tableau[np.where(basic_vars == i)[0][0] + 1, -1]) + ' ')
-                    else:
-                        f.write(fraction_to_string(Fraction(0)) + ' ')
-                f.write('\n')
+
+        if status not in ('Infeasible', 'Unbound') and solution is not None:
+            f.write('Objetivo: ' + fraction_to_string(objective) + '\n')
+            f.write('Solucao:\n')
+            for value in solution:
+                f.write(fraction_to_string(value) + ' ')
+            f.write('\n')
 
         f.write('Certificado:' + '\n')
         for value in new_certificate:
@@ -98,4 +335,52 @@ def fraction_to_string(fraction: Fraction):
     return str(ratio[0] / ratio[1])
 
 
-main(argv[1], argv[2])
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description = 'Two-Phase Simplex solver.')
+    arg_parser.add_argument('input', help = 'file with the LP to be solved')
+    arg_parser.add_argument('output', help = 'file where the results are written')
+    arg_parser.add_argument('--backend', choices = simplex.BACKENDS, default = 'exact',
+                            help = 'numeric representation of the tableau')
+    arg_parser.add_argument('--method', choices = METHODS, default = 'tableau',
+                            help = 'full tableau or revised simplex with a factorized basis')
+    arg_parser.add_argument('--pricing', choices = list(pricing.RULES), default = 'bland',
+                            help = 'rule that chooses the entering column of the tableau method')
+    arg_parser.add_argument('--harris', action = 'store_true',
+                            help = 'use the Harris two-pass ratio test in the tableau method')
+    arg_parser.add_argument('--presolve', action = 'store_true',
+                            help = 'reduce the LP before the Simplex and print a report. The basis files then refer to the reduced LP')
+    arg_parser.add_argument('--bounds', action = 'store_true',
+                            help = 'keep the single variable constraints as bounds of the tableau method, instead of rows. '
+                                   'An infeasibility certificate then ends with the multipliers of the upper bounds (see bounds.py)')
+    arg_parser.add_argument('--crash', action = 'store_true',
+                            help = 'start Phase 1 from a triangular basis with fewer auxiliar variables')
+    arg_parser.add_argument('--scale', choices = scaling.METHODS + ['auto', 'none'], default = 'auto',
+                            help = 'scale the rows and columns of A before the Simplex. auto scales the float64 and revised runs')
+    arg_parser.add_argument('--max-iterations', type = int, help = 'pivots allowed to the Simplex, in all of its phases')
+    arg_parser.add_argument('--time-limit', type = float, help = 'seconds allowed to the solve')
+    arg_parser.add_argument('--node-selection', choices = branch_and_bound.SELECTIONS, default = 'best-bound',
+                            help = 'order in which branch and bound solves the nodes of a LP with integer variables')
+    arg_parser.add_argument('--workers', type = int, default = 1, help = 'processes that solve the branch and bound nodes')
+    arg_parser.add_argument('--max-nodes', type = int, help = 'nodes allowed to branch and bound, the root included')
+    arg_parser.add_argument('--stats', help = 'file where the time of each stage and the pivots of each phase are written, as JSON')
+    arg_parser.add_argument('--basis', help = 'file with a starting basis, skips Phase 1 when it is feasible')
+    arg_parser.add_argument('--save-basis', help = 'file where the final basis is written')
+    args = arg_parser.parse_args()
+
+    initial_basis = np.loadtxt(args.basis, dtype=int, ndmin=1) if args.basis else None
+    stats = Stats() if args.stats else None
+    scale = None if args.scale == 'none' else args.scale
+    reports = []
+    limits = None
+    if args.max_iterations is not None or args.time_limit is not None:
+        limits = Limits(args.max_iterations, args.time_limit)
+    basic_vars = main(args.input, args.output, args.backend, args.method, initial_basis, args.pricing, args.presolve,
+                      args.bounds, args.crash, stats, limits, scale, args.node_selection, args.workers, args.max_nodes, reports,
+                      args.harris)
+    for report in reports:
+        print(report)
+    if args.save_basis:
+        np.savetxt(args.save_basis, basic_vars, fmt='%d')
+    if args.stats:
+        with open(args.stats, 'w') as file:
+            json.dump(stats.to_dict(), file, indent=2)
@@ -0,0 +1,183 @@
+import argparse
+import json
+from fractions import Fraction
+import numpy as np
+from Parser import Parser, Variable
+from sparse import CSCMatrix
+
+"""
+    Compiled models: the standard form built by the Parser, saved to a binary
+    file so solving the same LP again skips the tokenizing.
+
+    The file is a JSON header followed by raw little-endian arrays, each one
+    aligned to 8 bytes:
+
+        MAGIC | header length (uint64) | header | arrays
+
+    The header has the scalars of the Parser and, for every array, its dtype,
+    shape and offset in the file, so the arrays are memory-mapped in place.
+    Every Fraction is stored as an int64 numerator and denominator. A bound
+    without a value has denominator zero.
+
+    Usage: python model.py input.txt output.lpb [--bounds]
+"""
+
+MAGIC = b'LPBIN001'
+
+EXTENSION = '.lpb'
+
+ALIGNMENT = 8
+
+
+def save(parser, file_name):
+    """Writes the parsed LP of parser to file_name."""
+    arrays = {
+        'indptr': np.asarray(parser.A.indptr, dtype=np.int64),
+        'indices': np.asarray(parser.A.indices, dtype=np.int64),
+        'slack_rows': np.asarray(parser.slack_rows, dtype=np.int64),
+        'slack_signs': np.asarray(parser.slack_signs, dtype=np.int64),
+        'sindex': np.array([parser.variables[name].sindex for name in parser.var_names], dtype=np.int64),
+        'names': np.frombuffer('\n'.join(parser.var_names).encode(), dtype=np.uint8),
+        'integer': np.array([parser.variables[name].index for name in parser.integer], dtype=np.int64),
+    }
+    for name, values in (('data', parser.A.data), ('b', parser.b), ('c', parser.objective)):
+        arrays[name + '_num'], arrays[name + '_den'] = split(values)
+    if parser.native_bounds:
+        for name in ('lower', 'upper'):
+            arrays[name + '_num'], arrays[name + '_den'] = split(getattr(parser, name))
+
+    optimal_value = Fraction(parser.optimal_value)
+    header = {
+        'shape': list(parser.A.shape),
+        'var_count': parser.var_count,
+        'is_max': parser.is_max,
+        'native_bounds': parser.native_bounds,
+        'optimal_value': [optimal_value.numerator, optimal_value.denominator],
+        'arrays': {},
+    }
+    # the offsets are relative to the first array, which starts after the header
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += align(array.nbytes)
+    encoded = json.dumps(header).encode()
+    start = align(len(MAGIC) + 8 + len(encoded))
+
+    with open(file_name, 'wb') as file:
+        file.write(MAGIC)
+        file.write(np.uint64(len(encoded)).tobytes())
+        file.write(encoded)
+        file.write(bytes(start - file.tell()))
+        for name, array in arrays.items():
+            file.write(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<')).tobytes())
+            file.write(bytes(align(array.nbytes) - array.nbytes))
+
+
+def load(file_name, exact = True):
+    """Reads a compiled LP into a Parser, as if it had parsed the input.
+
+    The arrays are memory-mapped. With exact the coefficients are Fractions,
+    otherwise they are float64 arrays computed directly from the mapped ones,
+    which is enough for the float64 backend and the revised method.
+    """
+    arrays, header = read(file_name)
+    parser = Parser(header['native_bounds'])
+    parser.var_count = header['var_count']
+    parser.is_max = header['is_max']
+    parser.optimal_value = Fraction(*header['optimal_value'])
+
+    names = bytes(arrays['names']).decode()
+    parser.var_names = names.split('\n') if names else []
+    parser.variables = {name: Variable(index, int(sindex))
+                        for index, (name, sindex) in enumerate(zip(parser.var_names, arrays['sindex']))}
+
+    # files compiled before the integrality declarations have no integer variables
+    if 'integer' in arrays:
+        parser.integer = {parser.var_names[index]: None for index in arrays['integer'].tolist()}
+
+    join = to_fractions if exact else to_floats
+    data = join(arrays['data_num'], arrays['data_den'])
+    parser.A = CSCMatrix(np.asarray(data, dtype=object if exact else np.float64), arrays['indices'], arrays['indptr'],
+                         tuple(header['shape']))
+    parser.b = list(join(arrays['b_num'], arrays['b_den']))
+    parser.objective = list(join(arrays['c_num'], arrays['c_den']))
+    parser.slack_rows = arrays['slack_rows']
+    # the signs become Fractions in Parser.matrix, so they must be Python integers
+    parser.slack_signs = arrays['slack_signs'].tolist()
+    if parser.native_bounds:
+        parser.lower = to_bounds(arrays['lower_num'], arrays['lower_den'])
+        parser.upper = to_bounds(arrays['upper_num'], arrays['upper_den'])
+    return parser
+
+
+def read(file_name):
+    """Returns [arrays, header] of a compiled LP, with the arrays memory-mapped."""
+    with open(file_name, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('Not a compiled LP: ' + str(file_name))
+        length = int(np.frombuffer(file.read(8), dtype='<u8')[0])
+        header = json.loads(file.read(length).decode())
+    start = align(len(MAGIC) + 8 + length)
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        shape = tuple(info['shape'])
+        if not np.prod(shape):
+            # an empty array can't be mapped
+            arrays[name] = np.zeros(shape, dtype=info['dtype'])
+            continue
+        arrays[name] = np.memmap(file_name, dtype=info['dtype'], mode='r', offset=start + info['offset'], shape=shape)
+    return [arrays, header]
+
+
+def split(values):
+    """Returns the int64 numerators and denominators of the values. A None gets denominator zero."""
+    fractions = [Fraction(0) if value is None else Fraction(value) for value in values]
+    try:
+        numerators = np.array([value.numerator for value in fractions], dtype=np.int64)
+        denominators = np.array([0 if value is None else fraction.denominator
+                                 for value, fraction in zip(values, fractions)], dtype=np.int64)
+    except OverflowError:
+        raise ValueError('Coefficient too large for a compiled LP')
+    return [numerators, denominators]
+
+
+def to_fractions(numerators, denominators):
+    """Fractions of the pairs. Coefficients repeat a lot, so each distinct pair is built once."""
+    if not len(numerators):
+        return np.zeros(0, dtype=object)
+    # sort the pairs and number the distinct ones
+    order = np.lexsort((denominators, numerators))
+    numerators, denominators = numerators[order], denominators[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (numerators[1:] != numerators[:-1]) | (denominators[1:] != denominators[:-1])
+    values = np.array([Fraction(p, q) for p, q in zip(numerators[first].tolist(), denominators[first].tolist())],
+                      dtype=object)
+    fractions = np.empty(len(order), dtype=object)
+    fractions[order] = values[np.cumsum(first) - 1]
+    return fractions
+
+
+def to_floats(numerators, denominators):
+    return numerators / denominators
+
+
+def to_bounds(numerators, denominators):
+    return [None if q == 0 else Fraction(p, q) for p, q in zip(numerators.tolist(), denominators.tolist())]
+
+
+def align(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description = 'Compiles a LP to the binary format read by main.py.')
+    arg_parser.add_argument('input', help = 'file with the LP')
+    arg_parser.add_argument('output', help = 'compiled file, ' + EXTENSION + ' by convention')
+    arg_parser.add_argument('--bounds', action = 'store_true',
+                            help = 'keep the single variable constraints as bounds, as main.py --bounds')
+    args = arg_parser.parse_args()
+
+    parser = Parser(args.bounds)
+    parser.parse_input(args.input)
+    save(parser, args.output)
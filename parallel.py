@@ -0,0 +1,113 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tabulate import tabulate
+import branch_and_bound
+import main
+import pricing
+import scaling
+import simplex
+
+"""
+    Solves many LP files in parallel, each one parsed and solved by a worker
+    of a process pool, so the Python and NumPy startup is paid once per worker.
+
+    The inputs are the .txt and compiled (.lpb) files of a directory, or the
+    files listed in a manifest, one per line. Every result is written to
+    OUTPUT_DIR/<name>.out in the format of main.py, and a summary of the status
+    and time of every instance is printed.
+
+    Usage: python parallel.py INPUT OUTPUT_DIR [--workers N] [solver options]
+"""
+
+EXTENSIONS = ('.txt', main.model.EXTENSION)
+
+
+def list_inputs(source):
+    """Returns the LP files of a directory, or the files listed in a manifest (relative to it)."""
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source) if name.endswith(EXTENSIONS))
+    base = os.path.dirname(source)
+    with open(source, 'r') as file:
+        lines = [line.strip() for line in file]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+
+def output_name(input_filename, output_dir):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(input_filename))[0] + '.out')
+
+
+def solve_file(input_filename, output_filename, options):
+    """Solves a single LP in a worker. Returns [status, objective, seconds]."""
+    start = time.perf_counter()
+    try:
+        status, objective, solution, certificate, _ = main.solve(input_filename, **options)
+        main.handle_status(status, objective, solution, certificate, output_filename)
+    except Exception as error:
+        # a broken instance doesn't stop the others
+        return ['Error: ' + str(error), None, time.perf_counter() - start]
+    return [status, float(objective) if status == 'Optimal' else None, time.perf_counter() - start]
+
+
+def solve_files(inputs, output_dir, workers = None, **options):
+    """Solves every input in a process pool of `workers` processes (one per core by default).
+
+    The options are passed to main.solve. Returns the rows of the summary,
+    [input, status, objective, seconds], in the order of the inputs.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(solve_file, name, output_name(name, output_dir), options): name for name in inputs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return [[name] + results[name] for name in inputs]
+
+
+def summary(rows, elapsed, workers):
+    """Returns the table of the instances, followed by their totals."""
+    table = tabulate(rows, headers=['input', 'status', 'objective', 'seconds'], floatfmt='.3f')
+    total = sum(row[3] for row in rows)
+    counts = {}
+    for row in rows:
+        status = row[1].split(':')[0]
+        counts[status] = counts.get(status, 0) + 1
+    lines = [table, '',
+             f'{len(rows)} instances on {workers} workers: ' + ', '.join(f'{count} {status}' for status, count in counts.items()),
+             f'wall time {elapsed:.3f} s, solve time {total:.3f} s, speedup {total / max(elapsed, 1e-9):.2f}']
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description = 'Solves many LP files with a process pool.')
+    arg_parser.add_argument('input', help = 'directory with the LP files, or a manifest listing them')
+    arg_parser.add_argument('output', help = 'directory where the results are written')
+    arg_parser.add_argument('--workers', type = int, default = os.cpu_count(),
+                            help = 'number of worker processes')
+    arg_parser.add_argument('--backend', choices = simplex.BACKENDS, default = 'exact',
+                            help = 'numeric representation of the tableau')
+    arg_parser.add_argument('--method', choices = main.METHODS, default = 'tableau',
+                            help = 'full tableau or revised simplex with a factorized basis')
+    arg_parser.add_argument('--pricing', choices = list(pricing.RULES), default = 'bland',
+                            help = 'rule that chooses the entering column of the tableau method')
+    arg_parser.add_argument('--harris', action = 'store_true',
+                            help = 'use the Harris two-pass ratio test in the tableau method')
+    arg_parser.add_argument('--presolve', action = 'store_true', help = 'reduce every LP before the Simplex')
+    arg_parser.add_argument('--bounds', action = 'store_true',
+                            help = 'keep the single variable constraints as bounds of the tableau method, instead of rows')
+    arg_parser.add_argument('--crash', action = 'store_true',
+                            help = 'start Phase 1 from a triangular basis with fewer auxiliar variables')
+    arg_parser.add_argument('--scale', choices = scaling.METHODS + ['auto', 'none'], default = 'auto',
+                            help = 'scale the rows and columns of A before the Simplex. auto scales the float64 and revised runs')
+    arg_parser.add_argument('--node-selection', choices = branch_and_bound.SELECTIONS, default = 'best-bound',
+                            help = 'order in which branch and bound solves the nodes of a LP with integer variables')
+    arg_parser.add_argument('--max-nodes', type = int, help = 'nodes allowed to branch and bound, the root included')
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    rows = solve_files(list_inputs(args.input), args.output, args.workers, backend = args.backend,
+                       method = args.method, pricing_rule = args.pricing, harris = args.harris, presolve = args.presolve,
+                       native_bounds = args.bounds, crash = args.crash, scale = None if args.scale == 'none' else args.scale,
+                       selection = args.node_selection, max_nodes = args.max_nodes)
+    print(summary(rows, time.perf_counter() - start, args.workers))
@@ -0,0 +1,120 @@
+import argparse
+import multiprocessing
+import time
+from fractions import Fraction
+import main
+
+"""
+    Portfolio solving: several configurations of the Simplex race on the same
+    parsed LP, each one in its own process. The first configuration to finish
+    gives the result and the others are terminated. With a check, the result is
+    only returned once a second configuration agrees with it.
+
+    A configuration is "backend:pricing[:method][:harris]", e.g. "float64:steepest"
+    or "float64:dantzig:tableau:harris" for the Harris two-pass ratio test.
+
+    Usage: python portfolio.py input output [--configs CONFIG ...] [--check]
+"""
+
+PORTFOLIO = ['exact:bland', 'float64:dantzig', 'float64:steepest']
+
+# relative tolerance of the cross-check of two objective values
+check_tolerance = 10**-6
+
+
+def parse_config(config):
+    """Returns the keyword arguments of main.solve_parser of a "backend:pricing[:method][:harris]" configuration."""
+    parts = config.split(':')
+    harris = parts[-1] == 'harris'
+    if harris:
+        parts = parts[:-1]
+    if not 2 <= len(parts) <= 3:
+        raise ValueError('Configuration must be backend:pricing[:method][:harris]: ' + config)
+    options = {'backend': parts[0], 'pricing_rule': parts[1]}
+    if len(parts) == 3:
+        options['method'] = parts[2]
+    if harris:
+        options['harris'] = True
+    return options
+
+
+def run(queue, index, parser, options):
+    """Solves the LP with a configuration and puts [index, result or error, seconds] in the queue."""
+    start = time.perf_counter()
+    try:
+        result = main.solve_parser(parser, **options)
+    except Exception as error:
+        queue.put([index, error, time.perf_counter() - start])
+        return
+    queue.put([index, result, time.perf_counter() - start])
+
+
+def solve(parser, configs = PORTFOLIO, check = False):
+    """Races the configurations on the LP read by parser.
+
+    Returns [result, config, seconds] of the first configuration that finishes,
+    where result is the same as main.solve. With check, a second configuration
+    must agree on the status and the objective value, otherwise ValueError is raised.
+    """
+    options = [parse_config(config) for config in configs]
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run, args=(queue, index, parser, option), daemon=True)
+                 for index, option in enumerate(options)]
+    for process in processes:
+        process.start()
+
+    try:
+        finished = []
+        errors = []
+        needed = 2 if check and len(configs) > 1 else 1
+        while len(finished) < needed and len(finished) + len(errors) < len(configs):
+            index, result, seconds = queue.get()
+            if isinstance(result, Exception):
+                errors.append(f'{configs[index]}: {result}')
+            else:
+                finished.append([result, configs[index], seconds])
+    finally:
+        # the slower configurations are no longer needed
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if not finished:
+        raise ValueError('Every configuration failed: ' + '; '.join(errors))
+    if len(finished) > 1 and not agree(finished[0][0], finished[1][0]):
+        raise ValueError(f'{finished[0][1]} and {finished[1][1]} disagree: '
+                         f'{describe(finished[0][0])} and {describe(finished[1][0])}')
+    return finished[0]
+
+
+def agree(first, second):
+    """Checks if two results have the same status and, when optimal, the same objective value."""
+    if first[0] != second[0]:
+        return False
+    if first[0] != 'Optimal':
+        return True
+    a, b = Fraction(first[1]), Fraction(second[1])
+    return abs(a - b) <= check_tolerance * max(1, abs(a), abs(b))
+
+
+def describe(result):
+    return result[0] + (' ' + str(float(result[1])) if result[0] == 'Optimal' else '')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description = 'Races several Simplex configurations on a LP.')
+    arg_parser.add_argument('input', help = 'file with the LP to be solved')
+    arg_parser.add_argument('output', help = 'file where the results are written')
+    arg_parser.add_argument('--configs', nargs = '+', default = PORTFOLIO,
+                            help = 'configurations backend:pricing[:method][:harris] that race')
+    arg_parser.add_argument('--check', action = 'store_true',
+                            help = 'wait for a second configuration and check that both agree')
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    parser = main.read(args.input)
+    result, config, seconds = solve(parser, args.configs, args.check)
+    status, objective, solution, certificate, _ = result
+    main.handle_status(status, objective, solution, certificate, args.output)
+    print(f'{config} finished first: {status} in {seconds:.3f} s ({time.perf_counter() - start:.3f} s in total)')
@@ -0,0 +1,318 @@
+from fractions import Fraction
+import numpy as np
+from sparse import CSCMatrix
+
+"""
+    Presolve of the LP in the standard form given to the Simplex:
+
+        max c x  s.t.  A x = b,  x >= 0
+
+    Removes empty, singleton, forcing and duplicate rows, and empty and
+    dominated columns, until none is left. Every reduction is pushed to a
+    postsolve stack, which maps the solution and the certificate of the reduced
+    LP back to the original variables and constraints.
+"""
+
+REDUCTIONS = ['empty rows', 'singleton rows', 'forcing rows', 'duplicate rows',
+              'empty columns', 'dominated columns', 'fixed columns']
+
+
+class Presolve():
+    """Reduces a LP before the Simplex, and restores the results after it.
+
+    Attributes:
+        A : CSCMatrix
+            original coefficient matrix.
+        b, c : list
+            original right-hand side and costs.
+        rows, cols : list[dict[int, Fraction]]
+            nonzeros of every row (by column) and column (by row) of the
+            reduced LP. Removed rows and columns are None.
+        rhs : list
+            right-hand side of the reduced LP.
+        offset : Fraction
+            objective value of the fixed variables.
+        values : dict[int, Fraction]
+            value of every fixed variable.
+        stack : list[tuple]
+            postsolve stack. ('row', i, columns) removes row i, whose nonzeros
+            were in the given fixed columns; ('fix', j) fixes column j.
+        removed : dict[str, int]
+            number of reductions of each kind.
+        status : str
+            'Infeasible' or the result of an empty LP when the presolve solves
+            the LP, otherwise None.
+        certificate : list
+            certificate of the LP solved by the presolve, in its kept rows or columns.
+        kept_rows, kept_cols : list[int]
+            rows and columns of the original LP left in the reduced one.
+        signs : list[int]
+            -1 for the kept rows negated in the reduced LP, 1 otherwise.
+    """
+    def __init__(self, A, b, c):
+        self.A = A
+        self.b = list(b)
+        self.c = list(c)
+        m, n = A.shape
+        self.rows = [{} for i in range(m)]
+        self.cols = [{} for j in range(n)]
+        for j in range(n):
+            for k in range(A.indptr[j], A.indptr[j + 1]):
+                self.rows[A.indices[k]][j] = A.data[k]
+                self.cols[j][A.indices[k]] = A.data[k]
+        self.rhs = list(b)
+        self.offset = Fraction(0)
+        self.values = {}
+        self.stack = []
+        self.removed = {reduction: 0 for reduction in REDUCTIONS}
+        self.status = None
+        self.certificate = None
+        self.kept_rows = []
+        self.kept_cols = []
+        self.signs = []
+
+
+    def presolve(self):
+        """Applies the reductions until none is left. Returns [A, b, c] of the reduced LP."""
+        changed = True
+        while changed and self.status is None:
+            changed = self.__reduce_rows()
+            if self.status is None:
+                changed |= self.__reduce_empty_columns()
+                changed |= self.__reduce_duplicate_rows()
+            if self.status is None:
+                changed |= self.__reduce_dominated_columns()
+
+        self.kept_rows = [i for i, row in enumerate(self.rows) if row is not None]
+        self.kept_cols = [j for j, col in enumerate(self.cols) if col is not None]
+
+        if self.status is None and not self.kept_rows:
+            self.__solve_empty()
+        A, b, c = self.reduced()
+        if self.status == 'Infeasible':
+            # the certificate refers to the rows before they are negated
+            self.certificate = [sign * value for sign, value in zip(self.signs, self.certificate)]
+        return [A, b, c]
+
+
+    def reduced(self):
+        """Returns [A, b, c] of the reduced LP, in the kept rows and columns.
+
+        The rows whose right-hand side became negative are negated, as the Simplex expects b >= 0.
+        """
+        self.signs = [-1 if self.rhs[i] < 0 else 1 for i in self.kept_rows]
+        row_index = {i: k for k, i in enumerate(self.kept_rows)}
+        entries = [(row_index[i], k, self.signs[row_index[i]] * value)
+                   for k, j in enumerate(self.kept_cols) for i, value in self.cols[j].items()]
+        rows, cols, values = zip(*entries) if entries else ([], [], [])
+        A = CSCMatrix.from_coo(rows, cols, values, (len(self.kept_rows), len(self.kept_cols)), self.A.data.dtype)
+        b = np.array([sign * self.rhs[i] for sign, i in zip(self.signs, self.kept_rows)], dtype=object)
+        c = np.array([self.c[j] for j in self.kept_cols], dtype=object)
+        return [A, b, c]
+
+
+    def postsolve(self, status, objective, solution, certificate):
+        """Maps the results of the reduced LP to the original one.
+
+        Returns [objective, solution, certificate], with full-length solution and certificate.
+        """
+        m, n = self.A.shape
+        objective = objective + self.offset
+
+        if certificate is None:
+            # a limit stopped the Simplex, there is nothing to map
+            return [objective, solution, certificate]
+
+        if status == 'Unbound':
+            # the ray doesn't move the removed columns
+            ray = [Fraction(0)] * n
+            for k, j in enumerate(self.kept_cols):
+                ray[j] = certificate[k]
+            return [objective, solution, ray]
+
+        if status == 'Optimal':
+            full = [Fraction(0)] * n
+            for k, j in enumerate(self.kept_cols):
+                full[j] = solution[k]
+            for j, value in self.values.items():
+                full[j] = value
+            solution = full
+
+        # dual values of the removed rows, in the reverse order of the reductions
+        y = [Fraction(0)] * m
+        for k, i in enumerate(self.kept_rows):
+            y[i] = self.signs[k] * certificate[k]
+        costs = self.c if status == 'Optimal' else [0] * n
+        for operation in reversed(self.stack):
+            if operation[0] == 'row':
+                _, i, columns = operation
+                y[i] = self.__row_dual(i, columns, y, costs)
+        return [objective, solution, y]
+
+
+    def report(self):
+        """Returns the number of rows and columns removed by each reduction."""
+        m, n = self.A.shape
+        lines = [f'Presolve: {m - len(self.kept_rows)} of {m} rows and {n - len(self.kept_cols)} of {n} columns removed']
+        for reduction, count in self.removed.items():
+            if count:
+                lines.append(f'    {reduction}: {count}')
+        if self.status is not None:
+            lines.append('    solved: ' + self.status)
+        return '\n'.join(lines)
+
+
+    def __reduce_rows(self):
+        """Removes empty rows, fixes the column of singleton rows and the columns of forcing rows."""
+        changed = False
+        for i, row in enumerate(self.rows):
+            if row is None:
+                continue
+            b = self.rhs[i]
+            if not row:
+                # 0 x = b
+                if b != 0:
+                    return self.__infeasible({i: -1 if b > 0 else 1})
+                self.__remove_row(i, [], 'empty rows')
+            elif len(row) == 1:
+                # a x_j = b
+                (j, a), = row.items()
+                if b / a < 0:
+                    return self.__infeasible({i: 1 if a > 0 else -1})
+                self.__fix(j, b / a)
+                self.__remove_row(i, [j], 'singleton rows')
+            elif b == 0 and (all(a > 0 for a in row.values()) or all(a < 0 for a in row.values())):
+                # every variable of the row must be zero
+                columns = list(row)
+                for j in columns:
+                    self.__fix(j, Fraction(0))
+                self.__remove_row(i, columns, 'forcing rows')
+            else:
+                continue
+            changed = True
+        return changed
+
+
+    def __reduce_empty_columns(self):
+        """Fixes at zero the columns without nonzeros that don't improve the objective."""
+        changed = False
+        for j, col in enumerate(self.cols):
+            # an empty column with a positive cost is left for the Simplex to find unbound
+            if col is not None and not col and self.c[j] <= 0:
+                self.__fix(j, Fraction(0), 'empty columns')
+                changed = True
+        return changed
+
+
+    def __reduce_duplicate_rows(self):
+        """Removes the rows that are multiples of another row."""
+        changed = False
+        seen = {}
+        for i, row in enumerate(self.rows):
+            if not row:
+                continue
+            key, scale = normalize(row)
+            if key not in seen:
+                seen[key] = (i, scale)
+                continue
+            # row i = ratio * row k
+            k, other = seen[key]
+            ratio = scale / other
+            gap = self.rhs[i] - ratio * self.rhs[k]
+            if gap != 0:
+                # (row i - ratio * row k) x = gap
+                sign = -1 if gap > 0 else 1
+                return self.__infeasible({i: sign, k: -sign * ratio})
+            self.__remove_row(i, [], 'duplicate rows')
+            changed = True
+        return changed
+
+
+    def __reduce_dominated_columns(self):
+        """Fixes at zero the columns that are a positive multiple of another column with a better cost."""
+        changed = False
+        groups = {}
+        for j, col in enumerate(self.cols):
+            if not col:
+                continue
+            key, scale = normalize(col)
+            # column j = scale * key, so each unit of key costs c_j / scale
+            groups.setdefault((key, scale > 0), []).append((self.c[j] / scale, j))
+
+        for (key, positive), columns in groups.items():
+            if len(columns) < 2:
+                continue
+            # the columns of a group are positive multiples of each other, keep the best cost per unit
+            # (dividing by a negative scale reverses the order)
+            best = max(columns)[1] if positive else min(columns)[1]
+            for _, j in columns:
+                if j != best:
+                    self.__fix(j, Fraction(0), 'dominated columns')
+                    changed = True
+        return changed
+
+
+    def __solve_empty(self):
+        """Solves a LP without constraints: x = 0 unless a cost is positive."""
+        for k, j in enumerate(self.kept_cols):
+            if self.c[j] > 0:
+                self.status = 'Unbound'
+                self.certificate = [Fraction(int(l == k)) for l in range(len(self.kept_cols))]
+                return
+        self.status = 'Optimal'
+        self.certificate = []
+
+
+    def __fix(self, j, value, reduction = 'fixed columns'):
+        """Fixes column j at value and removes it."""
+        for i, a in self.cols[j].items():
+            self.rhs[i] -= a * value
+            del self.rows[i][j]
+        self.offset += self.c[j] * value
+        self.values[j] = value
+        self.cols[j] = None
+        self.stack.append(('fix', j))
+        self.removed[reduction] += 1
+
+
+    def __remove_row(self, i, columns, reduction):
+        """Removes row i. Its nonzeros must be in the given columns, already fixed."""
+        for j in self.rows[i]:
+            del self.cols[j][i]
+        self.rows[i] = None
+        self.stack.append(('row', i, columns))
+        self.removed[reduction] += 1
+
+
+    def __infeasible(self, y):
+        """Stops the presolve with the certificate y (by row), such that yA >= 0 and yb < 0."""
+        self.status = 'Infeasible'
+        self.kept_rows = [i for i, row in enumerate(self.rows) if row is not None]
+        self.certificate = [Fraction(y.get(i, 0)) for i in self.kept_rows]
+        return False
+
+
+    def __row_dual(self, i, columns, y, costs):
+        """Dual value of a removed row that keeps (yA)_j >= costs_j for its fixed columns."""
+        value = None
+        for j in columns:
+            start, end = self.A.indptr[j], self.A.indptr[j + 1]
+            a = 0
+            others = 0
+            for r, entry in zip(self.A.indices[start: end], self.A.data[start: end]):
+                if r == i:
+                    a = entry
+                else:
+                    others += y[r] * entry
+            bound = (costs[j] - others) / a
+            # y_i a >= costs_j - others: a lower bound when a > 0, an upper bound otherwise
+            if value is None or (bound > value if a > 0 else bound < value):
+                value = bound
+        return Fraction(0) if value is None else value
+
+
+def normalize(entries):
+    """Returns the entries divided by the first one, as a hashable key, and the first entry."""
+    items = sorted(entries.items())
+    scale = items[0][1]
+    return [tuple((index, value / scale) for index, value in items), scale]
@@ -0,0 +1,195 @@
+from fractions import Fraction
+import numpy as np
+
+"""
+    Pricing rules of the Simplex: choose the column that enters the base among
+    the columns with a negative reduced cost in the cost row of the Tableau.
+
+    A rule is called with choose before every pivot, then update with the pivot
+    chosen, before the Tableau changes. Rules that keep reference weights
+    update them in update. Both get the common denominator of the integer
+    backend, whose entries are the true ones times it (None for the others).
+"""
+
+
+class Pricing():
+    """Base pricing rule: takes the first column with a negative reduced cost (Bland).
+
+    Attributes:
+        iterations : int
+            pivots made with the rule.
+    """
+    name = 'bland'
+
+    def __init__(self):
+        self.iterations = 0
+
+
+    def choose(self, tableau, m, c, tol, denominator = None):
+        """Returns the pivot column, or None when no reduced cost is negative."""
+        candidates = np.flatnonzero(tableau[c, m: -1] < -tol)
+        if not len(candidates):
+            return None
+        return m + self.select(tableau[c, m: -1], candidates)
+
+
+    def select(self, costs, candidates):
+        """Chooses among the candidate columns, indexed from the first column of A."""
+        return candidates[0]
+
+
+    def update(self, tableau, m, c, pivot_row, pivot_column, basic_vars, denominator = None):
+        """Called with the chosen pivot, before the pivot operation."""
+        self.iterations += 1
+
+
+class Dantzig(Pricing):
+    """Takes the most negative reduced cost."""
+    name = 'dantzig'
+
+    def select(self, costs, candidates):
+        return candidates[np.argmin(costs[candidates])]
+
+
+class Partial(Pricing):
+    """Prices the columns in windows of `size`, taking the most negative reduced cost of
+    the first window with a candidate. The next pricing starts at the same window.
+
+    Attributes:
+        size : int
+            number of columns of a window. By default, an eighth of the columns.
+        start : int
+            first column of the current window.
+    """
+    name = 'partial'
+
+    def __init__(self, size = None):
+        super().__init__()
+        self.size = size
+        self.start = 0
+
+
+    def select(self, costs, candidates):
+        count = len(costs)
+        size = self.size or max(1, -(-count // 8))
+        self.start %= count
+
+        # window of every candidate, counting from the current one
+        windows = ((candidates - self.start) % count) // size
+        first = windows.min()
+        candidates = candidates[windows == first]
+        self.start += first * size
+        return candidates[np.argmin(costs[candidates])]
+
+
+class Devex(Pricing):
+    """Devex pricing: takes the largest d_j^2 / w_j, where the reference weights w_j
+    approximate the steepest edge norms.
+
+    Attributes:
+        weights : ndarray
+            reference weight of every column of A.
+    """
+    name = 'devex'
+
+    def __init__(self):
+        super().__init__()
+        self.weights = None
+
+
+    def select(self, costs, candidates):
+        self.resize(len(costs))
+        scores = relative(costs[candidates]) ** 2 / self.weights[candidates]
+        return candidates[np.argmax(scores)]
+
+
+    def update(self, tableau, m, c, pivot_row, pivot_column, basic_vars, denominator = None):
+        super().update(tableau, m, c, pivot_row, pivot_column, basic_vars, denominator)
+        self.resize(tableau.shape[1] - m - 1)
+        q = pivot_column - m
+        leaving = basic_vars[pivot_row - c - 1] - m
+        # the ratios of a row don't depend on its denominator
+        pivot = to_float(tableau[pivot_row, pivot_column: pivot_column + 1], denominator)[0]
+        ratios = to_float(tableau[pivot_row, m: -1], tableau[pivot_row, pivot_column])
+
+        weight = self.weights[q]
+        np.maximum(self.weights, ratios ** 2 * weight, out=self.weights)
+        if leaving < len(self.weights):
+            self.weights[leaving] = max(weight / pivot ** 2, 1.0)
+        self.weights[q] = 1.0
+
+
+    def resize(self, count):
+        """Keeps a weight per column. The auxiliar columns removed after Phase 1 are the last ones."""
+        if self.weights is None:
+            self.weights = np.ones(count)
+        elif len(self.weights) > count:
+            self.weights = self.weights[:count]
+        elif len(self.weights) < count:
+            self.weights = np.concatenate((self.weights, np.ones(count - len(self.weights))))
+
+
+class SteepestEdge(Pricing):
+    """Steepest edge pricing: takes the largest d_j^2 / (1 + ||B^-1 a_j||^2).
+
+    The Tableau holds B^-1 A, so the edge norms are computed from it exactly at
+    each pricing, for the cost of a pivot.
+
+    Attributes:
+        weights : ndarray
+            edge norm of every candidate column, at the last pricing.
+        rows : ndarray
+            constraint rows of the Tableau, at the last pricing.
+        denominator : int
+            common denominator of the rows, None outside the integer backend.
+    """
+    name = 'steepest'
+
+    def __init__(self):
+        super().__init__()
+        self.weights = None
+        self.rows = None
+        self.denominator = None
+
+
+    def choose(self, tableau, m, c, tol, denominator = None):
+        self.rows = tableau[c + 1:, m: -1]
+        self.denominator = denominator
+        return super().choose(tableau, m, c, tol, denominator)
+
+
+    def select(self, costs, candidates):
+        columns = to_float(self.rows[:, candidates], self.denominator)
+        self.weights = 1 + np.einsum('ij,ij->j', columns, columns)
+        scores = relative(costs[candidates]) ** 2 / self.weights
+        return candidates[np.argmax(scores)]
+
+
+def to_float(values, denominator = None):
+    """Returns values / denominator in float64. The integers of the integer backend
+    are beyond the float range, so object entries are divided exactly first."""
+    if denominator is None:
+        denominator = 1
+    if values.dtype == object:
+        return np.frompyfunc(Fraction, 2, 1)(values, denominator).astype(np.float64)
+    return values.astype(np.float64) / float(denominator)
+
+
+def relative(costs):
+    """Returns the costs divided by the largest one in absolute value, which leaves
+    the choice of a rule unchanged and the costs of the integer backend in range."""
+    return to_float(costs, max(abs(costs)))
+
+
+RULES = {rule.name: rule for rule in (Pricing, Dantzig, Partial, Devex, SteepestEdge)}
+
+
+def make_pricing(rule):
+    """Returns a pricing rule from its name. Rule instances are returned as they are."""
+    if rule is None:
+        return Pricing()
+    if isinstance(rule, Pricing):
+        return rule
+    if rule not in RULES:
+        raise ValueError('Unknown pricing rule: ' + str(rule))
+    return RULES[rule]()
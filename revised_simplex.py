@@ -0,0 +1,258 @@
+import time
+import numpy as np
+from simplex import float_epsilon, stall_pivots
+from sparse import CSCMatrix
+from stats import stage
+from limits import check
+
+"""
+    Revised Simplex:
+    -----------------------------------------
+    Only the basis matrix B (m x m) is kept, factorized as P B = L U.
+    Each pivot appends an eta column to the factorization (product form)
+    and the basis is factorized again every `refactor_frequency` pivots.
+    Columns of A are priced on demand from the dual vector y = c_B B^-1,
+    and A is kept in sparse form throughout. The entering column is the first
+    one that prices out (Bland). After `stall_pivots` degenerate pivots
+    in a row, ties in the ratio test go to the smallest basic variable too, which
+    can't cycle, until a pivot moves the objective again.
+"""
+
+refactor_frequency = 50
+
+
+def main(A, b, c, basic_vars, artificial_vars, artificial_costs, stats = None, limits = None):
+    """Solves a linear programming problem using the Two-Phase Revised Simplex.
+
+    The stats, when given, are filled with the pivots and time of each phase (see stats.py).
+    The limits, when given, stop it with the status 'IterationLimit' or 'TimeLimit' (see limits.py).
+    Returns [status, objective, solution, certificate, basic_vars].
+    """
+    m, n = A.shape
+    A = to_sparse(A).hstack(to_sparse(artificial_vars))
+    b = np.asarray(b, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    basic_vars = np.asarray(basic_vars, dtype=int).copy()
+    # an absolute tolerance, as in the tableau: a global bound would zero legitimate small pivots
+    tol = float_epsilon
+    if stats is not None:
+        stats.rows, stats.columns = A.shape
+
+    # Phase 1
+    # maximize the negative sum of the auxiliar variables
+    cost = np.concatenate((np.zeros(n), -np.asarray(artificial_costs, dtype=np.float64)))
+    basis = Basis(A, basic_vars)
+    with stage(stats, 'phase 1'):
+        status, x_B, y = simplex(A, b, cost, basis, A.shape[1], tol, stats, limits)
+    if status != 'Optimal':
+        return [status, 0, None, None, basic_vars]
+
+    # check if problem is Infeasible
+    if cost[basic_vars] @ x_B < -tol:
+        return ['Infeasible', 0, None, y, basic_vars]
+
+    # Phase 2
+    # pivot the auxiliar variables left at zero level out of the base
+    drive_out_artificials(A, basis, n, tol)
+
+    cost = np.concatenate((c, np.zeros(A.shape[1] - n)))
+    with stage(stats, 'phase 2'):
+        status, x_B, result = simplex(A, b, cost, basis, n, tol, stats, limits)
+
+    if status != 'Optimal':
+        return [status, 0, None, result, basic_vars]
+
+    solution = np.zeros(n)
+    original = basic_vars < n
+    solution[basic_vars[original]] = x_B[original]
+    solution[np.abs(solution) < tol] = 0
+    return ['Optimal', c @ solution, solution, result, basic_vars]
+
+
+def simplex(A, b, cost, basis, limit, tol, stats = None, limits = None):
+    """Iterates over the basis until all columns below `limit` are priced out.
+
+    Returns [status, x_B, certificate] where the certificate is the dual vector
+    when optimal, an unbounded ray when unbound and None when a limit is reached.
+    """
+    basic_vars = basis.basic_vars
+    x_B = basis.ftran(b)
+    # consecutive degenerate pivots
+    stalled = 0
+    while True:
+        start = time.perf_counter()
+        # price the columns with the current duals
+        y = basis.btran(cost[basic_vars])
+        reduced = cost[:limit] - A.rmatvec(y, limit)
+        reduced[basic_vars[basic_vars < limit]] = 0
+
+        # choose variable to enter the base (pivot column)
+        candidates = np.flatnonzero(reduced > tol)
+        if not len(candidates):
+            return ['Optimal', x_B, y]
+        pivot_column = candidates[0]
+
+        d = basis.ftran(A.column(pivot_column))
+
+        # check if the new base variable has unlimited growth potential
+        mask = d > tol
+        if not mask.any():
+            ray = np.zeros(limit)
+            ray[pivot_column] = 1
+            original = basic_vars < limit
+            ray[basic_vars[original]] = -d[original]
+            return ['Unbound', x_B, ray]
+
+        # stop when the budget of the solve ran out. Detecting an unbounded column is not a pivot
+        status = check(limits)
+        if status is not None:
+            return [status, x_B, None]
+
+        # choose variable to leave the base (pivot row)
+        ratios = np.full(len(x_B), np.inf)
+        ratios[mask] = x_B[mask] / d[mask]
+        pivot_row = np.argmin(ratios)
+        if stalled >= stall_pivots:
+            # Bland: the smallest basic variable among the rows of minimum ratio
+            ties = np.flatnonzero(ratios <= ratios[pivot_row] + tol)
+            pivot_row = ties[np.argmin(basic_vars[ties])]
+
+        theta = ratios[pivot_row]
+        degenerate = theta <= tol
+        stalled = stalled + 1 if degenerate else 0
+        if stalled == stall_pivots and stats is not None:
+            stats.stall()
+        x_B -= theta * d
+        x_B[pivot_row] = theta
+
+        leaving = basic_vars[pivot_row]
+        if basis.update(pivot_row, pivot_column, d):
+            # recompute the basic solution after a refactorization
+            x_B = basis.ftran(b)
+        if stats is not None:
+            stats.pivot(pivot_column, leaving, cost[basic_vars] @ x_B, degenerate, time.perf_counter() - start)
+
+
+def drive_out_artificials(A, basis, n, tol):
+    """Replaces the auxiliar variables left in the base at zero level."""
+    basic_vars = basis.basic_vars
+    for i in np.flatnonzero(basic_vars >= n):
+        e = np.zeros(len(basic_vars))
+        e[i] = 1
+        row = A.rmatvec(basis.btran(e), n)
+        row[basic_vars[basic_vars < n]] = 0
+        candidates = np.flatnonzero(np.abs(row) > tol)
+        # the constraint is redundant, keep the auxiliar variable at zero
+        if not len(candidates):
+            continue
+        basis.update(i, candidates[0], basis.ftran(A.column(candidates[0])))
+
+
+def to_sparse(A):
+    """Converts A to a float64 sparse matrix, without densifying it."""
+    if isinstance(A, CSCMatrix):
+        return A.astype(np.float64)
+    return CSCMatrix.from_dense(np.asarray(A, dtype=np.float64))
+
+
+class Basis():
+    """LU factorization of the basis matrix with product form updates.
+
+    Attributes:
+        A : CSCMatrix
+            coefficient matrix the basic columns are taken from.
+        basic_vars : ndarray
+            column index of each basic variable, updated in place.
+        L, U : ndarray
+            triangular factors of the permuted basis, P B = L U.
+        perm : ndarray
+            row permutation P of the factorization.
+        etas : list[tuple[int, ndarray]]
+            pivot row and column of every update since the last factorization.
+    """
+    def __init__(self, A, basic_vars):
+        self.A = A
+        self.basic_vars = basic_vars
+        self.refactor()
+
+
+    def refactor(self):
+        """Factorizes the current basis from scratch."""
+        self.L, self.U, self.perm = lu_factor(self.A.columns(self.basic_vars))
+        self.etas = []
+
+
+    def update(self, pivot_row, pivot_column, d):
+        """Replaces the basic variable of `pivot_row`. Returns True if the basis was refactorized."""
+        self.basic_vars[pivot_row] = pivot_column
+        if len(self.etas) + 1 >= refactor_frequency:
+            self.refactor()
+            return True
+        self.etas.append((pivot_row, d))
+        return False
+
+
+    def ftran(self, a):
+        """Solves B x = a."""
+        x = lu_solve(self.L, self.U, self.perm, a)
+        for r, d in self.etas:
+            x[r] /= d[r]
+            pivot = x[r]
+            x -= pivot * d
+            x[r] = pivot
+        return x
+
+
+    def btran(self, c):
+        """Solves y B = c."""
+        z = np.array(c, dtype=np.float64)
+        for r, d in reversed(self.etas):
+            z[r] = (z[r] - (z @ d - z[r] * d[r])) / d[r]
+        return lu_solve_transpose(self.L, self.U, self.perm, z)
+
+
+def lu_factor(B):
+    """Factorizes B with partial pivoting. Returns L, U and perm such that B[perm] = L U."""
+    m = B.shape[0]
+    U = np.array(B, dtype=np.float64)
+    L = np.eye(m)
+    perm = np.arange(m)
+    for k in range(m):
+        # choose the largest pivot of the column
+        p = k + np.argmax(np.abs(U[k:, k]))
+        # the same absolute tolerance as the ratio test
+        if abs(U[p, k]) <= float_epsilon:
+            raise np.linalg.LinAlgError('Singular basis')
+        if p != k:
+            U[[k, p], k:] = U[[p, k], k:]
+            L[[k, p], :k] = L[[p, k], :k]
+            perm[[k, p]] = perm[[p, k]]
+        L[k + 1:, k] = U[k + 1:, k] / U[k, k]
+        U[k + 1:, k:] -= np.outer(L[k + 1:, k], U[k, k:])
+    return L, U, perm
+
+
+def lu_solve(L, U, perm, a):
+    """Solves L U x = a[perm]."""
+    x = np.array(a, dtype=np.float64)[perm]
+    m = len(x)
+    for k in range(m):
+        x[k + 1:] -= L[k + 1:, k] * x[k]
+    for k in range(m - 1, -1, -1):
+        x[k] /= U[k, k]
+        x[:k] -= U[:k, k] * x[k]
+    return x
+
+
+def lu_solve_transpose(L, U, perm, z):
+    """Solves y (P^T L U) = z."""
+    w = np.array(z, dtype=np.float64)
+    m = len(w)
+    for k in range(m):
+        w[k] /= U[k, k]
+        w[k + 1:] -= U[k, k + 1:] * w[k]
+    for k in range(m - 1, -1, -1):
+        w[:k] -= L[k, :k] * w[k]
+    y = np.empty(m)
+    y[perm] = w
+    return y
@@ -0,0 +1,146 @@
+from fractions import Fraction
+import numpy as np
+from sparse import CSCMatrix
+
+"""
+    Scaling of the LP before the Simplex: A' = R A S, b' = R b and c' = c S,
+    with diagonal R and S that bring the nonzeros of A' close to one. The
+    Simplex solves max c' x' s.t. A' x' = b', x' >= 0, with the same objective
+    value. Its solution maps back as x = S x', its duals as y = y' R and its
+    unbounded rays as S r'.
+
+    The factors are powers of 2, so scaling is exact in float64 and in Fractions.
+"""
+
+METHODS = ['geometric', 'curtis-reid']
+
+# row and column passes of the geometric mean scaling
+geometric_passes = 4
+
+# conjugate gradient iterations of the Curtis-Reid scaling
+curtis_reid_iterations = 50
+
+# 2^e as an exact Fraction
+POWER = np.frompyfunc(lambda e: Fraction(2) ** int(e), 1, 1)
+
+
+class Scaling():
+    """Row and column factors of a LP.
+
+    Attributes:
+        method : str
+            'geometric' divides every row and column by the geometric mean of
+            its largest and smallest entry, in a few alternating passes.
+            'curtis-reid' minimizes the sum of log2(|a_ij| r_i s_j)^2 (Curtis and Reid).
+        rows, cols : ndarray
+            exponent of 2 of the factor of every row (R) and column (S) of A.
+    """
+    def __init__(self, A, method = 'geometric'):
+        if method not in METHODS:
+            raise ValueError('Unknown scaling method: ' + str(method))
+        self.method = method
+        m, n = A.shape
+        rows, cols, values = nonzeros(A)
+        logs = np.log2(np.abs(values.astype(np.float64)))
+        if method == 'geometric':
+            rho, gamma = geometric_mean(rows, cols, logs, m, n)
+        else:
+            rho, gamma = curtis_reid(rows, cols, logs, m, n)
+        self.rows = np.rint(rho).astype(int)
+        self.cols = np.rint(gamma).astype(int)
+
+
+    def scale(self, A, b, c):
+        """Returns [R A S, R b, c S], with the types of A, b and c."""
+        if isinstance(A, CSCMatrix):
+            cols = np.repeat(np.arange(A.shape[1]), np.diff(A.indptr))
+            A = CSCMatrix(multiply(A.data, self.rows[A.indices] + self.cols[cols]), A.indices, A.indptr, A.shape)
+        else:
+            A = multiply(A, self.rows[:, np.newaxis] + self.cols)
+        return [A, multiply(np.asarray(b), self.rows), multiply(np.asarray(c), self.cols)]
+
+
+    def solution(self, values):
+        """Maps the values of x' to x."""
+        return multiply(np.asarray(values), self.cols)
+
+
+    def certificate(self, status, certificate):
+        """Maps a certificate of the scaled LP to the original one: rays by column, duals by row."""
+        if certificate is None:
+            return None
+        if status == 'Unbound':
+            return multiply(np.asarray(certificate), self.cols)
+        return multiply(np.asarray(certificate), self.rows)
+
+
+def nonzeros(A):
+    """Returns the rows, columns and values of the nonzeros of a dense or sparse A."""
+    if isinstance(A, CSCMatrix):
+        cols = np.repeat(np.arange(A.shape[1]), np.diff(A.indptr))
+        return [A.indices, cols, A.data]
+    rows, cols = np.nonzero((A != 0).astype(bool))
+    return [rows, cols, A[rows, cols]]
+
+
+def multiply(values, exponents):
+    """Elementwise values * 2^exponents. Object arrays stay exact."""
+    if values.dtype == object:
+        return values * POWER(exponents)
+    return np.ldexp(values.astype(np.float64), exponents)
+
+
+def geometric_mean(rows, cols, logs, m, n):
+    """Returns the log2 of the row and column factors of the geometric mean scaling."""
+    rho, gamma = np.zeros(m), np.zeros(n)
+    for _ in range(geometric_passes):
+        high, low = extremes(rows, logs + gamma[cols], m)
+        rho = -(high + low) / 2
+        high, low = extremes(cols, logs + rho[rows], n)
+        gamma = -(high + low) / 2
+    return [rho, gamma]
+
+
+def extremes(lines, logs, count):
+    """Largest and smallest entry of every line (row or column), zero for the empty lines."""
+    high = np.full(count, -np.inf)
+    low = np.full(count, np.inf)
+    np.maximum.at(high, lines, logs)
+    np.minimum.at(low, lines, logs)
+    empty = high == -np.inf
+    high[empty] = 0
+    low[empty] = 0
+    return [high, low]
+
+
+def curtis_reid(rows, cols, logs, m, n):
+    """Returns the log2 of the row and column factors that minimize sum (log2 |a_ij| + rho_i + gamma_j)^2.
+
+    The normal equations [[D_r, Z], [Z^T, D_c]] [rho, gamma] = -[row sums, column sums]
+    of the logs, where Z is the pattern of A and D_r, D_c count the nonzeros of
+    every line, are solved with conjugate gradients.
+    """
+    row_count = np.bincount(rows, minlength=m)
+    col_count = np.bincount(cols, minlength=n)
+
+    def product(v):
+        rho, gamma = v[:m], v[m:]
+        return np.concatenate((row_count * rho + np.bincount(rows, gamma[cols], m),
+                               np.bincount(cols, rho[rows], n) + col_count * gamma))
+
+    rhs = -np.concatenate((np.bincount(rows, logs, m), np.bincount(cols, logs, n)))
+    x = np.zeros(m + n)
+    r = rhs.copy()
+    p = r.copy()
+    # the system is singular, but consistent: the residual still goes to zero
+    stop = 10**-12 * max(rhs @ rhs, 1.0)
+    for _ in range(curtis_reid_iterations):
+        rr = r @ r
+        if rr <= stop:
+            break
+        q = product(p)
+        alpha = rr / (p @ q)
+        x += alpha * p
+        r -= alpha * q
+        p = r + (r @ r) / rr * p
+    return [x[:m], x[m:]]
@@ -1,6 +1,11 @@
+import math
+import time
 import numpy as np
 from fractions import Fraction
 from tabulate import tabulate
+from pricing import Pricing, make_pricing
+from stats import stage
+from limits import check
 
 """
     Extended Tableau:
@@ -13,205 +18,778 @@ from tabulate import tabulate
     -----------------------------------------
 """
 
+# default tolerance of the helpers called without one
 epsilon = 10**-5
 
-def main(A, b, c, basic_vars, artificial_vars, artificial_costs):
-    m, n = A.shape
+# pivot tolerance of the float64 backend: entries smaller in absolute value are zero
+float_epsilon = 10**-9
+
+# the integer backend pivots Python integers with a common denominator (Bareiss),
+# the hybrid backend pivots in float64 and certifies the final basis exactly
+BACKENDS = ['exact', 'float64', 'integer', 'hybrid']
+
+# exact division of object arrays, which also works on integers
+FRACTION = np.frompyfunc(Fraction, 2, 1)
 
-    # add auxiliar variables for Simplex Phase 1
-    A = np.hstack((A, artificial_vars))
-    c_aux = np.concatenate((np.zeros(n), artificial_costs))
+# conversion of every entry of an array to a Fraction
+TO_FRACTION = np.frompyfunc(Fraction, 1, 1)
 
-    # transpose the constraint row vector
-    b = np.insert(b, 0, 0)[np.newaxis].T
+# entries of the float64 Tableau updated at once by a pivot, so its temporaries stay small
+block_size = 2**16
 
-    # initialize Extended Tableau
-    tableau = np.vstack((np.zeros(m), np.eye(m)))
-    tableau = np.hstack((tableau, np.vstack((c_aux, A))))
-    tableau = np.hstack((tableau, b))
+# dual simplex pivots allowed to repair an infeasible initial basis
+repair_iterations = 50
 
-    tableau = tableau.astype(Fraction)
-    for i in range(tableau.shape[0]):
-        for j in range(tableau.shape[1]):
-            tableau[i, j] = Fraction(tableau[i, j])
+# consecutive degenerate pivots after which the Simplex switches to Bland's rule, until the objective moves
+stall_pivots = 50
+
+def main(A, b, c, basic_vars, artificial_vars, artificial_costs, backend = 'exact', initial_basis = None, pricing = None,
+         bounds = None, stats = None, limits = None, harris = False):
+    """Solves max c x s.t. A x = b, x >= 0 with the Two-Phase Simplex.
+
+    With bounds (see bounds.py), A, b and c are already written in terms of x',
+    and the upper bounds are handled in the ratio test. The stats, when given,
+    are filled with the pivots and time of each phase (see stats.py). The limits,
+    when given, stop the Simplex with the status 'IterationLimit' or 'TimeLimit'
+    and no certificate (see limits.py). With harris, the ratio test is the Harris
+    two-pass test (see choose_pivot_row).
+    """
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: ' + str(backend))
+    if bounds is not None and (backend not in ('exact', 'float64') or initial_basis is not None):
+        raise ValueError('Native bounds need the exact or float64 backend, without a starting basis')
+    m, n = A.shape
+    # the same rule prices both phases, so its iterations add up
+    pricing = make_pricing(pricing)
+
+    if backend == 'hybrid':
+        return hybrid(A, b, c, basic_vars, artificial_vars, artificial_costs, initial_basis, pricing, stats, limits, harris)
+
+    # skip Phase 1 when a starting basis is known
+    if initial_basis is not None:
+        result = warm_start(A, b, c, initial_basis, backend, pricing, stats, limits, harris)
+        if result is not None:
+            return result
+
+    # initialize the Extended Tableau with the auxiliar variables for Simplex Phase 1,
+    # and the original objective function costs on top of it
+    tableau = allocate(A, b, c, backend, artificial_vars, artificial_costs)
 
     basic_vars += m
 
     # Phase 1
     # efetuate Gaussian Elimination of the costs
-
-    # add original objective function costs on top of the tableau
-    tableau = np.vstack((tableau[0, :], tableau))
-    tableau[0, m: m + n] = -c
-    tableau[0, m + n:] = 0
+    if backend == 'integer':
+        tableau, scale = to_integer(tableau)
+        if stats is not None:
+            stats.scale = scale
+    if stats is not None:
+        stats.rows, stats.columns = tableau.shape
     
     # pivot the tableau to turn the basic variables costs to zero
     for i in range(len(basic_vars)):
-        tableau = gaussian_elimination(tableau = tableau, pivot_row = i + 2, pivot_column = basic_vars[i], m = m, c = 1)
+        denominator = common_denominator(tableau, basic_vars[:i], c = 1)
+        tableau = gaussian_elimination(tableau = tableau, pivot_row = i + 2, pivot_column = basic_vars[i], m = m, c = 1,
+                                       denominator = denominator)
+
+    tol = tolerance(tableau)
 
     # call Simplex for the auxiliar Tableau
-    tableau, status, certificate, basic_vars = simplex(tableau, m, basic_vars, c = 1)
+    with stage(stats, 'phase 1'):
+        tableau, status, certificate, basic_vars = simplex(tableau, m, basic_vars, c = 1, tol = tol, pricing = pricing,
+                                                           bounds = bounds, stats = stats, limits = limits, harris = harris)
 
     # check if Simplex found an error in the problem
     if status != 'Optimal':
         return [status, tableau, certificate, basic_vars, m]
 
     # check if problem is Infeasible
-    if tableau[1, -1] < 0:
-        certificate = tableau[0, :m]
+    if tableau[1, -1] < -tol:
+        if backend == 'integer':
+            tableau = from_integer(tableau, basic_vars, 1, scale)
+        # the auxiliar costs give y such that yA >= 0 and yb < 0
+        certificate = tableau[1, :m]
         return ['Infeasible', tableau, certificate, basic_vars, m]
 
     # Phase 2
-    # remove the auxiliar variables from the Tableau
-    # tableau, basic_vars, m = remove_aux_variable(tableau, basic_vars, m, n)
-    # store the auxiliar variables location on the Tableau
-    w = np.s_[m + n: -1]
+    # remove the auxiliar variables from the base
+    tableau, basic_vars = remove_aux_variable(tableau, basic_vars, m, n, tol)
 
-    # remove auxiliar variables columns
-    tableau = np.delete(tableau, w, 1)
-    tableau = np.delete(tableau, 1, 0)
+    # drop the auxiliar cost row and columns without copying the Tableau: the
+    # original costs take the place of the auxiliar ones and b the place of the
+    # first auxiliar column, so the Phase 2 Tableau is a view of the same memory
+    tableau[1, :] = tableau[0, :]
+    tableau[:, m + n] = tableau[:, -1]
+    tableau = tableau[1:, : m + n + 1]
 
     # call Simplex for the original Tableau
-    tableau, status, certificate, basic_vars = simplex(tableau, m, basic_vars, c = 0)
+    with stage(stats, 'phase 2'):
+        tableau, status, certificate, basic_vars = simplex(tableau, m, basic_vars, c = 0, tol = tol, pricing = pricing,
+                                                           bounds = bounds, stats = stats, limits = limits, harris = harris)
+
+    if backend == 'float64':
+        # clear the round-off noise left by the pivots
+        clear_noise(tableau, tol)
+    if backend == 'integer':
+        tableau = from_integer(tableau, basic_vars, 0, scale)
+        if status == 'Optimal':
+            certificate = tableau[0, :m]
+
+    return [status, tableau, certificate, basic_vars, m]
+
+
+def hybrid(A, b, c, basic_vars, artificial_vars, artificial_costs, initial_basis = None, pricing = None, stats = None,
+           limits = None, harris = False):
+    """Runs the Simplex iterations in float64, then certifies the final basis in exact arithmetic.
+
+    The exact Tableau of the final basis gives the solution, the dual certificate
+    and the unbounded ray. When the basis is not exactly optimal, the exact pivots
+    go on from it. Infeasibility is certified from the Phase 1 basis instead.
+    Returns the same as main, with exact values.
+    """
+    status, tableau, certificate, float_basis, m = main(A, b, c, basic_vars.copy(), artificial_vars, artificial_costs,
+                                                        'float64', initial_basis, pricing, stats = stats, limits = limits,
+                                                        harris = harris)
+
+    if limits is not None and limits.status is not None:
+        # the budget ran out in float64, the basis can't be certified
+        return [status, to_backend(tableau, 'exact'), certificate, float_basis, m]
+    if status == 'Infeasible':
+        certificate = certify_infeasible(A, b, float_basis, artificial_vars, artificial_costs)
+        if certificate is not None:
+            return [status, to_backend(tableau, 'exact'), certificate, float_basis, m]
+    else:
+        result = warm_start(A, b, c, float_basis, 'integer', pricing, stats, limits, harris)
+        if result is not None:
+            return result
+
+    # the float basis can't be used, solve from scratch
+    return main(A, b, c, basic_vars, artificial_vars, artificial_costs, 'integer', pricing = pricing, stats = stats,
+                limits = limits, harris = harris)
+
+
+def certify_infeasible(A, b, basis, artificial_vars, artificial_costs):
+    """Recomputes the Phase 1 certificate of a basis exactly: y such that yA >= 0 and yb < 0.
+
+    Returns None when the basis doesn't prove infeasibility.
+    """
+    m, n = A.shape
+    columns = to_backend(np.hstack((A, artificial_vars)), 'exact')
+    costs = np.concatenate((np.zeros(n, dtype=int), artificial_costs))[basis - m]
+
+    # y B = c_B, the certificate is -y
+    y = solve_exact(columns[:, basis - m].T, costs)
+    if y is None:
+        return None
+    certificate = -y
+    b = to_backend(np.asarray(b)[np.newaxis], 'exact')[0]
+    if np.all(certificate.dot(columns[:, :n]) >= 0) and certificate.dot(b) < 0:
+        return certificate
+    return None
+
+
+def solve_exact(M, rhs):
+    """Solves M x = rhs in Fractions with Gauss-Jordan elimination. Returns None when M is singular."""
+    k = len(rhs)
+    system = to_backend(np.hstack((M, np.asarray(rhs)[np.newaxis].T)), 'exact')
+    for j in range(k):
+        rows = np.flatnonzero(system[j:, j])
+        if not len(rows):
+            return None
+        system[[j, j + rows[0]]] = system[[j + rows[0], j]]
+        system = gaussian_elimination(system, j, j, k, c = 0)
+    return system[:, -1]
+
+
+def warm_start(A, b, c, initial_basis, backend, pricing = None, stats = None, limits = None, harris = False):
+    """Starts Phase 2 from a known basis, given by the basic_vars returned by main.
+
+    A basis that is not primal feasible is repaired with dual simplex pivots.
+    The auxiliar variables main leaves in the base stay on their redundant rows,
+    or are pivoted out when their row isn't redundant.
+    Returns None when the basis can't be used, so the caller falls back to Phase 1.
+    """
+    m, n = A.shape
+    initial_basis = np.asarray(initial_basis, dtype=int)
+    if len(initial_basis) != m or len(set(initial_basis)) != m:
+        return None
+    if np.any(initial_basis < m):
+        return None
+    auxiliar = initial_basis[initial_basis >= m + n]
+
+    # initialize the Tableau of Phase 2
+    tableau = allocate(A, b, c, backend)
+    if backend == 'integer':
+        tableau, scale = to_integer(tableau)
+        if stats is not None:
+            stats.scale = scale
+    if stats is not None and not stats.rows:
+        stats.rows, stats.columns = tableau.shape
+    tol = tolerance(tableau)
+
+    # pivot every basic column on the free row with the largest entry
+    basic_vars = np.full(m, -1)
+    for column in initial_basis[initial_basis < m + n]:
+        entries = np.abs(tableau[1:, column])
+        entries[basic_vars != -1] = 0
+        row = np.argmax(entries)
+        if entries[row] <= tol:
+            # the basis is singular
+            return None
+        denominator = common_denominator(tableau, basic_vars, c = 0)
+        tableau = gaussian_elimination(tableau, row + 1, column, m, c = 0, denominator = denominator)
+        basic_vars[row] = column
+
+    # the rows left belong to the auxiliar variables, which have no column in Phase 2
+    for row, variable in zip(np.flatnonzero(basic_vars == -1), auxiliar):
+        entries = np.abs(tableau[row + 1, m: m + n])
+        original = (basic_vars >= m) & (basic_vars < m + n)
+        entries[basic_vars[original] - m] = 0
+        if (entries > tol).any():
+            # the row isn't redundant, pivot the auxiliar variable out of the base
+            column = np.argmax(entries)
+            denominator = common_denominator(tableau, basic_vars, c = 0)
+            tableau = gaussian_elimination(tableau, row + 1, m + column, m, c = 0, denominator = denominator)
+            basic_vars[row] = m + column
+        elif abs(tableau[row + 1, -1]) > tol:
+            # 0 x = b with b nonzero: the rows are inconsistent, Phase 1 certifies it
+            return None
+        else:
+            # the row is redundant, its auxiliar variable stays in the base at zero
+            basic_vars[row] = variable
+
+    with stage(stats, 'reoptimize'):
+        status, tableau, certificate, basic_vars, m = reoptimize(tableau, m, basic_vars, tol, max_iterations = repair_iterations,
+                                                                 pricing = pricing, stats = stats, limits = limits,
+                                                                 harris = harris)
+    if status == 'IterationLimit' and (limits is None or limits.status is None):
+        # the repair pivots ran out, not the budget of the solve
+        return None
+    if backend == 'integer':
+        tableau = from_integer(tableau, basic_vars, 0, scale)
+        if status == 'Optimal':
+            certificate = tableau[0, :m]
+    return [status, tableau, certificate, basic_vars, m]
+
+
+def add_constraint(tableau, basic_vars, m, a, b, relation = '<=', harris = False):
+    """Adds the constraint a x <= b (or >=, ==) to a Phase 2 Tableau returned by main and re-optimizes it.
+
+    The constraint gets a slack variable, which is its basic variable, so the
+    basis stays dual feasible and the dual simplex restores primal feasibility.
+    The coefficients a refer to the columns of A, and the columns added by
+    previous calls. Returns [status, tableau, certificate, basic_vars, m], as main.
+    """
+    if relation == '==':
+        status, tableau, certificate, basic_vars, m = add_row(tableau, basic_vars, m, a, b, '<=', harris)
+        if status == 'Infeasible':
+            return [status, tableau, certificate, basic_vars, m]
+        return add_constraint(tableau, basic_vars, m, a, b, '>=', harris)
+    return add_row(tableau, basic_vars, m, a, b, relation, harris)
+
+
+def add_row(tableau, basic_vars, m, a, b, relation, harris = False):
+    """Appends an inequality with its slack variable to the Tableau and re-optimizes it."""
+    if relation not in ('<=', '>='):
+        raise ValueError('Unknown relation: ' + str(relation))
+    n = tableau.shape[1] - m - 1
+    sign = 1 if relation == '<=' else -1
+
+    # the new row in terms of the original constraints: [0 1 | a 1 | b]
+    row = np.zeros(m + n + 3, dtype=tableau.dtype)
+    row[m] = 1
+    row[m + 1: m + 1 + len(a)] = sign * np.asarray(a)
+    row[-2] = 1
+    row[-1] = sign * b
+    row = to_backend(row[np.newaxis], 'exact' if tableau.dtype == object else 'float64')[0]
+
+    # new column of the identity block and new slack column
+    tableau = np.insert(tableau, m, 0, axis=1)
+    tableau = np.insert(tableau, -1, 0, axis=1)
+    if tableau.dtype == object:
+        tableau[:, m] = Fraction(0)
+        tableau[:, -2] = Fraction(0)
+
+    # auxiliar variables left in the base have no column, keep them past the last one
+    basic_vars = np.where(basic_vars >= m + n, basic_vars + 2, basic_vars + 1)
+
+    # express the new row in terms of the nonbasic variables
+    original = basic_vars < m + 1 + n
+    row = row - row[basic_vars[original]].dot(tableau[1:][original])
+    tableau = np.vstack((tableau, row))
+    basic_vars = np.append(basic_vars, tableau.shape[1] - 2)
+
+    return reoptimize(tableau, m + 1, basic_vars, tolerance(tableau), harris = harris)
+
+
+def price_columns(tableau, m, columns, costs):
+    """Returns the Tableau columns of new columns of A, for a Phase 2 Tableau returned by main.
+
+    The columns (m x k) with their costs become [y a - c; B^-1 a], where the
+    duals y and B^-1 are read from the identity block. The first row holds the
+    reduced costs: a column with a negative one prices out.
+    """
+    backend = 'exact' if tableau.dtype == object else 'float64'
+    columns = to_backend(np.asarray(columns).reshape(m, -1), backend)
+    costs = to_backend(np.asarray(costs).reshape(-1), backend)
+    return np.vstack((tableau[0, :m].dot(columns) - costs, tableau[1:, :m].dot(columns)))
+
+
+def change_rhs(tableau, basic_vars, m, b, harris = False):
+    """Replaces the right-hand side of a Phase 2 Tableau returned by main and re-optimizes it.
+
+    The new b refers to the rows of the Tableau, i.e. the constraints given to
+    main followed by the ones added with add_constraint. The basis stays dual
+    feasible, so only dual simplex pivots are needed.
+    Returns [status, tableau, certificate, basic_vars, m], as main.
+    """
+    n = tableau.shape[1] - m - 1
+    tableau = tableau.copy()
+    b = to_backend(np.asarray(b, dtype=tableau.dtype)[np.newaxis], 'exact' if tableau.dtype == object else 'float64')[0]
+    tol = tolerance(tableau)
+
+    # values of the basic variables B^-1 b, and objective value y b
+    tableau[1:, -1] = tableau[1:, :m].dot(b)
+    tableau[0, -1] = tableau[0, :m].dot(b)
+
+    # the rows of auxiliar variables left in the base are redundant: 0 x = y b
+    for i in np.flatnonzero(basic_vars >= m + n):
+        value = tableau[i + 1, -1]
+        if abs(value) > tol:
+            certificate = tableau[i + 1, :m] if value < 0 else -tableau[i + 1, :m]
+            return ['Infeasible', tableau, certificate, basic_vars, m]
+
+    return reoptimize(tableau, m, basic_vars, tol, harris = harris)
+
+
+def reoptimize(tableau, m, basic_vars, tol, max_iterations = None, pricing = None, stats = None, limits = None,
+               harris = False):
+    """Solves a Phase 2 Tableau from its current basis.
+
+    The dual simplex restores primal feasibility first. It keeps the costs
+    optimal when they already are, otherwise it only repairs the basis.
+    Returns [status, tableau, certificate, basic_vars, m], as main.
+    """
+    if np.any(tableau[1:, -1] < -tol):
+        dual_feasible = np.all(tableau[0, m: -1] > -tol)
+        tableau, status, certificate, basic_vars = dual_simplex(tableau, m, basic_vars, c = 0, tol = tol,
+                                                                ignore_costs = not dual_feasible,
+                                                                max_iterations = max_iterations, stats = stats,
+                                                                limits = limits)
+        if status != 'Optimal':
+            return [status, tableau, certificate, basic_vars, m]
+
+    tableau, status, certificate, basic_vars = simplex(tableau, m, basic_vars, c = 0, tol = tol, pricing = pricing, stats = stats,
+                                                       limits = limits, harris = harris)
+
+    if tableau.dtype != object:
+        # clear the round-off noise left by the pivots
+        clear_noise(tableau, tol)
 
     return [status, tableau, certificate, basic_vars, m]
 
 
+def allocate(A, b, c, backend, artificial_vars = None, artificial_costs = None):
+    """Returns the Extended Tableau, allocated once at its final size and filled by blocks.
 
-def simplex(tableau, m, basic_vars, c):
-    """Solves a linear programming problem using the Two-Phase Simplex."""
-    # store indexes of the different tableau parts
+    With auxiliar variables, the Tableau of Phase 1: the original and the
+    auxiliar cost rows over [I | A | w | b]. Otherwise the Tableau of Phase 2:
+    the cost row over [I | A | b]. The integer backend starts from Fractions.
+    """
+    m, n = A.shape
+    k = 0 if artificial_vars is None else artificial_vars.shape[1]
+    top = 1 if artificial_vars is None else 2
+    shape = (m + top, m + n + k + 1)
+    if backend == 'float64':
+        tableau = np.zeros(shape)
+        convert = np.asarray
+    else:
+        # Fractions are immutable, so every zero can be the same one
+        tableau = np.full(shape, Fraction(0), dtype=object)
+        convert = lambda values: TO_FRACTION(np.asarray(values))
+
+    rows = np.arange(m)
+    tableau[top + rows, rows] = convert(np.ones(m, dtype=int))
+    tableau[0, m: m + n] = convert(-np.asarray(c))
+    tableau[top:, m: m + n] = convert(A)
+    tableau[top:, -1] = convert(b)
+    if artificial_vars is not None:
+        tableau[1, m + n: -1] = convert(artificial_costs)
+        tableau[top:, m + n: -1] = convert(artificial_vars)
+    return tableau
+
+
+def row_blocks(tableau):
+    """Slices of consecutive rows of the Tableau with about block_size entries each."""
+    step = max(1, block_size // tableau.shape[1])
+    return [np.s_[i: i + step] for i in range(0, tableau.shape[0], step)]
+
+
+def clear_noise(tableau, tol):
+    """Sets the float64 entries below the tolerance to zero, in place."""
+    for rows in row_blocks(tableau):
+        block = tableau[rows]
+        block[np.abs(block) < tol] = 0
+
+
+def to_backend(tableau, backend):
+    """Converts the tableau to the numeric representation of the backend.
+
+    The integer backend starts from Fractions too, see to_integer.
+    """
+    if backend in ('exact', 'integer'):
+        return TO_FRACTION(tableau)
+    return tableau.astype(np.float64)
+
+
+def to_integer(tableau):
+    """Scales a Fraction Tableau to Python integers in place, for the integer backend.
+
+    Returns [tableau, scale], where scale is the least common multiple of the
+    denominators. Pivoting only divides the rows that were pivot rows by the
+    scale, so the cost rows keep it until from_integer.
+    """
+    scale = math.lcm(*{value.denominator for value in tableau.flat})
+    np.frompyfunc(lambda value: value.numerator * (scale // value.denominator), 1, 1)(tableau, out=tableau)
+    return [tableau, scale]
+
+
+def from_integer(tableau, basic_vars, c, scale):
+    """Converts a Tableau of the integer backend back to Fractions, in place."""
+    denominator = common_denominator(tableau, basic_vars, c)
+    costs = FRACTION(tableau[:c + 1], denominator * scale)
+    FRACTION(tableau, denominator, out=tableau)
+    tableau[:c + 1] = costs
+    return tableau
+
+
+def common_denominator(tableau, basic_vars, c):
+    """Common denominator of a Tableau of the integer backend, or None for the other backends.
+
+    The fraction-free pivots keep every basic column equal to the denominator
+    times a unit vector.
+    """
+    if tableau.dtype != object or type(tableau[0, 0]) is not int:
+        return None
+    for i, column in enumerate(basic_vars):
+        if 0 <= column < tableau.shape[1] - 1:
+            return tableau[c + 1 + i, column]
+    # no basic column left, the Tableau has no nonzero to scale
+    return 1
+
+
+def divide(a, b):
+    """Elementwise division. Object arrays get exact Fractions, even from integers."""
+    if a.dtype == object:
+        return FRACTION(a, b)
+    return a / b
+
+
+def tolerance(tableau):
+    """Returns the tolerance used to compare the entries of the tableau."""
+    if tableau.dtype == object:
+        # Fractions and Bareiss integers are exact: only a true zero is zero
+        return 0
+    # an absolute tolerance: one relative to the largest entry of the tableau would
+    # zero the legitimate small pivots of a LP with a few large coefficients
+    return float_epsilon
+
+
+def simplex(tableau, m, basic_vars, c, tol = epsilon, pricing = None, bounds = None, stats = None, limits = None,
+            harris = False):
+    """Solves a linear programming problem using the Two-Phase Simplex.
+
+    The pricing rule chooses the entering column. See pricing.py. With bounds,
+    the nonbasic variables at their upper bound are complemented. See bounds.py.
+    Every pivot is counted in the stats, when given. See stats.py.
+
+    After `stall_pivots` degenerate pivots in a row, the smallest index rule of
+    Bland chooses both the entering and the leaving variable, which can't cycle,
+    until a pivot moves the objective again.
+    """
+    pricing = make_pricing(pricing)
+    # consecutive degenerate pivots
+    stalled = 0
+    bland = Pricing()
     while True:
+        start = time.perf_counter()
         # __print_tableau(tableau)
-        # check if all costs are non-negative
-        if np.all(tableau[c, m: -1] > -epsilon):
-            # found optimal solution
-            break
+        if bounds is not None:
+            # a free variable can enter the base decreasing
+            bounds.complement_free(tableau, m, c, basic_vars, tol)
 
         # choose variable to enter the base (pivot column)
-        for i in range(m, tableau.shape[1]):
-            if tableau[c, i] < 0:
-                pivot_column = i
-                break
-        
-        # calculate ratios
-        ratios = calculate_ratios(tableau, pivot_column, c)
+        rule = bland if stalled >= stall_pivots else pricing
+        denominator = common_denominator(tableau, basic_vars, c)
+        pivot_column = rule.choose(tableau, m, c, tol, denominator)
+        if pivot_column is None:
+            # all costs are non-negative: found optimal solution
+            break
+
+        # choose variable to leave the base (pivot row)
+        kind = 'lower'
+        if bounds is None and rule is bland:
+            pivot_row = choose_pivot_row(tableau, pivot_column, c, tol, two_pass = False, basic_vars = basic_vars)
+        elif bounds is None:
+            pivot_row = choose_pivot_row(tableau, pivot_column, c, tol, two_pass = harris)
+        else:
+            pivot_row, kind = bounds.choose_pivot_row(tableau, pivot_column, c, basic_vars, m, tol, bland = rule is bland)
 
         # check if the new base variable has unlimited growth potential
-        unbound = True
-        for ratio in ratios:
-            if ratio > -epsilon:
-                unbound = False
-        if unbound:
+        if pivot_row is None and kind != 'flip':
             certificate = generate_unbound_certificate(tableau, m, pivot_column, basic_vars, c)
             return [tableau, 'Unbound', certificate, basic_vars]
-       
+
+        # stop when the budget of the solve ran out. Detecting an unbounded column is not a pivot
+        status = check(limits)
+        if status is not None:
+            return [tableau, status, None, basic_vars]
+
+        if kind == 'flip':
+            # the entering variable reaches its upper bound before any basic variable
+            bounds.complement(tableau, pivot_column, m)
+            # the objective moves with the entering variable
+            stalled = 0
+            if stats is not None:
+                stats.pivot(pivot_column - m, None, objective_value(tableau, basic_vars, c, stats), False,
+                            time.perf_counter() - start)
+            continue
+        rule.update(tableau, m, c, pivot_row, pivot_column, basic_vars, denominator)
+
+        # perform pivot operation
+        degenerate = abs(tableau[pivot_row, -1]) <= tol
+        stalled = stalled + 1 if degenerate else 0
+        if stalled == stall_pivots and stats is not None:
+            stats.stall()
+        tableau = gaussian_elimination(tableau, pivot_row, pivot_column, m, c, denominator)
+
+        # update basic variables indices
+        leaving = basic_vars[pivot_row - c - 1]
+        basic_vars[pivot_row - c - 1] = pivot_column
+        if kind == 'upper':
+            # the leaving variable stays at its upper bound
+            bounds.complement(tableau, leaving, m)
+        if stats is not None:
+            stats.pivot(pivot_column - m, leaving - m, objective_value(tableau, basic_vars, c, stats), degenerate,
+                        time.perf_counter() - start)
+
+    certificate = tableau[0, :m]
+    return [tableau, 'Optimal', certificate, basic_vars]
+
+
+def dual_simplex(tableau, m, basic_vars, c, tol = epsilon, ignore_costs = False, max_iterations = None, stats = None,
+                 limits = None):
+    """Restores primal feasibility of a Tableau whose costs are non-negative.
+
+    With ignore_costs the costs don't restrict the entering column, which only
+    repairs the feasibility of the basis.
+    """
+    iterations = 0
+    while True:
+        start = time.perf_counter()
         # choose variable to leave the base (pivot row)
-        lower = np.inf
-        for i in range(len(ratios)):
-            if ratios[i] < lower and ratios[i] >= -epsilon:
-                lower = ratios[i]
-                pivot_row = i
-        pivot_row += 1 + c
+        rhs = tableau[c + 1:, -1]
+        pivot_row = np.argmin(rhs)
+        if rhs[pivot_row] >= -tol:
+            # found primal feasible solution
+            break
+        pivot_row += c + 1
+
+        # check if the row can't be made non-negative: yA >= 0 and yb < 0
+        row = tableau[pivot_row, m: -1]
+        candidates = np.flatnonzero(row < -tol)
+        denominator = common_denominator(tableau, basic_vars, c)
+        if not len(candidates):
+            certificate = tableau[pivot_row, :m]
+            if denominator is not None:
+                certificate = FRACTION(certificate, denominator)
+            return [tableau, 'Infeasible', certificate, basic_vars]
+
+        # detecting an infeasible row is not a pivot
+        if max_iterations is not None and iterations >= max_iterations:
+            return [tableau, 'IterationLimit', None, basic_vars]
+        iterations += 1
+        status = check(limits)
+        if status is not None:
+            return [tableau, status, None, basic_vars]
+
+        # choose variable to enter the base (pivot column)
+        if ignore_costs:
+            pivot_column = candidates[np.argmin(row[candidates])]
+        else:
+            ratios = divide(tableau[c, m + candidates], -row[candidates])
+            pivot_column = candidates[np.argmin(ratios)]
+        pivot_column += m
 
         # perform pivot operation
-        tableau = gaussian_elimination(tableau, pivot_row, pivot_column, m, c)
+        degenerate = tableau[c, pivot_column] == 0
+        tableau = gaussian_elimination(tableau, pivot_row, pivot_column, m, c, denominator)
 
         # update basic variables indices
+        leaving = basic_vars[pivot_row - c - 1]
         basic_vars[pivot_row - c - 1] = pivot_column
+        if stats is not None:
+            stats.pivot(pivot_column - m, leaving - m, objective_value(tableau, basic_vars, c, stats), degenerate,
+                        time.perf_counter() - start)
 
     certificate = tableau[0, :m]
     return [tableau, 'Optimal', certificate, basic_vars]
 
 
+def objective_value(tableau, basic_vars, c, stats):
+    """Objective value of cost row c. The integer backend keeps it scaled, see to_integer."""
+    denominator = common_denominator(tableau, basic_vars, c)
+    if denominator is None:
+        return tableau[c, -1]
+    return Fraction(tableau[c, -1], denominator * stats.scale)
+
+
+def get_solution(tableau, basic_vars, m, bounds = None):
+    """Reads the objective value and the value of every variable from the Tableau.
+
+    With bounds, the values of x' are mapped back to x.
+    """
+    solution = []
+    for i in range(m, tableau.shape[1] - 1):
+        if i in basic_vars:
+            solution.append(tableau[np.where(basic_vars == i)[0][0] + 1, -1])
+        else:
+            solution.append(Fraction(0))
+    if bounds is not None:
+        return [tableau[0, -1] + bounds.constant, bounds.solution(solution)]
+    return [tableau[0, -1], solution]
+
+
 def generate_unbound_certificate(tableau, m, pivot_column, basic_vars, c):
+    denominator = common_denominator(tableau, basic_vars, c)
+    # the entries keep the type of the Tableau, even when no basic variable is in the ray
+    one, zero = (Fraction(1), Fraction(0)) if tableau.dtype == object else (1.0, 0.0)
     certificate = []
     for i in range(m, tableau.shape[1] - 1):
         if i == pivot_column:
-            certificate.append(1)
+            certificate.append(one)
         elif i in basic_vars:
-            certificate.append(-tableau[np.where(basic_vars == i)[0] + c + 1, pivot_column][0])
-        else:
-            certificate.append(0)
-    certificate = np.array(certificate)
-    return  np.array(certificate) 
-
-
-def calculate_ratios(tableau, pivot_column, c):
-    """Calculate ratios for new base variable."""
-    INF = 2**32 - 1
-    ratios = []
-    for i in range(c + 1, tableau.shape[0]):
-        if tableau[i, pivot_column] <= epsilon:
-            ratios.append(Fraction(-INF))
+            value = -tableau[np.where(basic_vars == i)[0] + c + 1, pivot_column][0]
+            certificate.append(value if denominator is None else Fraction(value, denominator))
         else:
-            ratios.append(Fraction(tableau[i, -1], tableau[i, pivot_column]))
-    ratios = np.array(ratios)
-    return ratios
+            certificate.append(zero)
+    return np.array(certificate, dtype=tableau.dtype)
 
 
-def gaussian_elimination(tableau, pivot_row, pivot_column, m, c):
-    """Efetuate Gaussian Elimination."""
-    pivot = tableau[pivot_row, pivot_column]
-    tableau[pivot_row, :] = tableau[pivot_row, :] / pivot
-    for i in range(m + 1 + c):
-        if i == pivot_row:
-            continue
-        aux = tableau[i, pivot_column]
-        tableau[i, :] = tableau[i, :] - aux * tableau[pivot_row, :]
-    return tableau
+def calculate_ratios(tableau, pivot_column, c, tol = epsilon):
+    """Calculate ratios for new base variable. Rows that don't limit it get -inf."""
+    column = tableau[c + 1:, pivot_column]
+    ratios = np.full(column.shape, -np.inf, dtype=tableau.dtype)
+    mask = (column > tol).astype(bool)
+    ratios[mask] = divide(tableau[c + 1:, -1][mask], column[mask])
+    return ratios
 
 
-def remove_aux_variable(tableau, basic_vars, m, n):
-    """Remove auxiliar variables from the base."""
-    # check if any auxiliar variable was left in the column
-    j = 0
-    new_basic_vars = []
-    for i in range(len(basic_vars)):
-        # find an auxiliar variable in the base
-        if basic_vars[i] >= m + n + j:
-            # remove auxiliar variable from the base
-            print(tableau[i + 2, m: m + n])
-            if count_non_zero(tableau[i + 2 - j, m: m + n]):
-                # find a candidate to enter the base
-                for j in range(m, m + n):
-                    # check if candidate is valid
-                    if tableau[i + 2 - j, j] != 0 and j != basic_vars[i]:
-                        # perform pivot operation on cadidate
-                        tableau[i + 2 - j, :] = tableau[i + 2 - j, :] / tableau[i + 2 - j, j]
-                        tableau[1, :] = tableau[1, :] - tableau[1, j] * tableau[i + 2 - j, :]
-                        # add candidate to the base
-                        new_basic_vars.append(j)
-                        break
-            # remove the constraint, as it is redundant
-            else:
-                tableau = np.delete(tableau, i + 2 - j, 0)
-                tableau = np.delete(tableau, i, 1)
-
-                m -= 1
-                j += 1
-        # the constraint does not refer to an auxiliar variable
-        else:
-            new_basic_vars.append(basic_vars[i])
+def choose_pivot_row(tableau, pivot_column, c, tol = epsilon, two_pass = False, basic_vars = None):
+    """Ratio test. Returns the pivot row, or None when the pivot column is unbounded.
+
+    The textbook test takes the first row of minimum ratio, or the row of the
+    smallest basic variable among them when basic_vars are given (Bland). The
+    Harris two-pass test bounds the step letting the basic variables go down to
+    -tol, then takes the largest pivot among the rows within the bound.
+    """
+    ratios = calculate_ratios(tableau, pivot_column, c, tol)
+    candidates = np.flatnonzero((ratios >= -tol).astype(bool))
+    if not len(candidates):
+        return None
+
+    if not two_pass and basic_vars is not None:
+        # exact ratios tie exactly, float ratios within the tolerance
+        slack = 0 if tableau.dtype == object else tol
+        ties = candidates[(ratios[candidates] <= np.min(ratios[candidates]) + slack).astype(bool)]
+        return ties[np.argmin(basic_vars[ties])] + 1 + c
+    if not two_pass:
+        return candidates[np.argmin(ratios[candidates])] + 1 + c
+
+    column = tableau[c + 1:, pivot_column][candidates]
+    # exact values need no slack, the test only breaks the ties
+    slack = 0 if tableau.dtype == object else tol
+    bound = np.min(divide(tableau[c + 1:, -1][candidates] + slack, column))
+    within = np.flatnonzero((ratios[candidates] <= bound).astype(bool))
+    return candidates[within[np.argmax(column[within])]] + 1 + c
+
+
+def gaussian_elimination(tableau, pivot_row, pivot_column, m, c, denominator = None):
+    """Efetuate Gaussian Elimination, in place.
+
+    The exact backend only updates the rows with a nonzero multiplier and the
+    columns with a nonzero pivot row entry. A Tableau of the integer backend,
+    given with its common denominator, gets a fraction-free pivot instead.
+    """
+    if denominator is not None:
+        return bareiss_elimination(tableau, pivot_row, pivot_column, denominator)
+
+    tableau[pivot_row, :] /= tableau[pivot_row, pivot_column]
+    column = tableau[:, pivot_column].copy()
+    column[pivot_row] = 0
+
+    if tableau.dtype != object:
+        # rank-1 update by blocks of contiguous rows, which beats gathering the rows
+        # and needs no temporary of the size of the Tableau
+        row = tableau[pivot_row, :]
+        for rows in row_blocks(tableau):
+            tableau[rows] -= np.outer(column[rows], row)
+        # keep the pivot column an exact unit vector
+        tableau[:, pivot_column] = 0
+        tableau[pivot_row, pivot_column] = 1
+        return tableau
+
+    # the Fraction arithmetic dominates, so skip the zero multipliers and pivot row entries
+    rows = np.flatnonzero(column)
+    cols = np.flatnonzero(tableau[pivot_row, :])
+    tableau[np.ix_(rows, cols)] -= np.multiply.outer(column[rows], tableau[pivot_row, cols])
+    return tableau
 
-    # store the auxiliar variables location on the Tableau
-    w = np.s_[m + n: -1]
 
-    # remove auxiliar variables columns
-    tableau = np.delete(tableau, w, 1)
-    tableau = np.delete(tableau, 1, 0)
+def bareiss_elimination(tableau, pivot_row, pivot_column, denominator):
+    """Fraction-free pivot of an integer Tableau whose entries are over the common denominator.
 
-    new_basic_vars = [i - j for i in new_basic_vars]
-    return [tableau, np.array(new_basic_vars), m]
+    Every other row becomes (pivot * row - multiplier * pivot row) / denominator,
+    which is an exact integer division (Bareiss). The pivot becomes the new
+    denominator, kept positive by negating the Tableau. Rows with a zero
+    multiplier are only rescaled, and not at all when the pivot is the denominator.
+    """
+    pivot = tableau[pivot_row, pivot_column]
+    row = tableau[pivot_row, :]
+    column = tableau[:, pivot_column].copy()
+    column[pivot_row] = 0
+    rows = np.flatnonzero(column)
+
+    tableau[rows] = (tableau[rows] * pivot - np.multiply.outer(column[rows], row)) // denominator
+    if pivot != denominator:
+        scaled = np.ones(len(column), dtype=bool)
+        scaled[rows] = False
+        scaled[pivot_row] = False
+        tableau[scaled] = tableau[scaled] * pivot // denominator
+
+    if pivot < 0:
+        np.negative(tableau, out=tableau)
+    return tableau
 
 
-def count_non_zero(array):
-    """Count number of non zeros in the array."""
-    i = 0
-    for c in array:
-        if c != Fraction(0):
-            i += 1
-    return i
+def remove_aux_variable(tableau, basic_vars, m, n, tol = epsilon):
+    """Remove auxiliar variables left at zero level from the base, before Phase 2."""
+    for i in range(len(basic_vars)):
+        # find an auxiliar variable in the base
+        if basic_vars[i] < m + n:
+            continue
+        # find a candidate to enter the base
+        row = np.abs(tableau[i + 2, m: m + n]) > tol
+        row[basic_vars[basic_vars < m + n] - m] = False
+        candidates = np.flatnonzero(row)
+        # the constraint is redundant, its auxiliar variable stays at zero
+        if not len(candidates):
+            continue
+        # perform a degenerate pivot operation on the candidate
+        denominator = common_denominator(tableau, basic_vars, c = 1)
+        tableau = gaussian_elimination(tableau, i + 2, m + candidates[0], m, c = 1, denominator = denominator)
+        basic_vars[i] = m + candidates[0]
+    return [tableau, basic_vars]
 
 
 def __print_tableau(tableau):
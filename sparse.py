@@ -0,0 +1,177 @@
+import numpy as np
+
+
+class CSCMatrix():
+    """Sparse matrix stored by columns, the access pattern of the Simplex.
+
+    The nonzeros of column j are data[indptr[j]: indptr[j + 1]], in the rows
+    given by the same range of indices.
+
+    Attributes:
+        shape : tuple[int, int]
+            number of rows and columns.
+        data : ndarray
+            nonzero values, column by column.
+        indices : ndarray
+            row index of each nonzero.
+        indptr : ndarray
+            start of each column in data and indices.
+    """
+    def __init__(self, data, indices, indptr, shape):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+
+
+    @staticmethod
+    def from_coo(rows, cols, values, shape, dtype = object):
+        """Builds the matrix from (row, col, value) triples. Repeated entries are summed."""
+        rows = np.asarray(rows, dtype=int)
+        cols = np.asarray(cols, dtype=int)
+        values = np.asarray(values, dtype=dtype)
+        # sort by column, then by row
+        order = np.lexsort((rows, cols))
+        rows, cols, values = rows[order], cols[order], values[order]
+
+        # sum repeated entries
+        if len(rows):
+            first = np.ones(len(rows), dtype=bool)
+            first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            starts = np.flatnonzero(first)
+            if len(starts) < len(rows):
+                values = np.add.reduceat(values, starts)
+                rows, cols = rows[starts], cols[starts]
+
+        # drop explicit zeros
+        nonzero = values != 0
+        rows, cols, values = rows[nonzero], cols[nonzero], values[nonzero]
+
+        indptr = np.zeros(shape[1] + 1, dtype=int)
+        np.cumsum(np.bincount(cols, minlength=shape[1]), out=indptr[1:])
+        return CSCMatrix(values, rows, indptr, shape)
+
+
+    @staticmethod
+    def from_dense(A):
+        """Builds the matrix from a dense array."""
+        A = np.asarray(A)
+        rows, cols = np.nonzero(A)
+        return CSCMatrix.from_coo(rows, cols, A[rows, cols], A.shape, A.dtype)
+
+
+    @staticmethod
+    def diagonal(rows, values, m, dtype = object):
+        """Builds a matrix with a single nonzero per column, at the given rows."""
+        return CSCMatrix(np.asarray(values, dtype=dtype), np.asarray(rows, dtype=int),
+                         np.arange(len(rows) + 1), (m, len(rows)))
+
+
+    def hstack(self, other):
+        """Appends the columns of other to the right of the matrix."""
+        return CSCMatrix(np.concatenate((self.data, other.data)),
+                         np.concatenate((self.indices, other.indices)),
+                         np.concatenate((self.indptr, other.indptr[1:] + self.indptr[-1])),
+                         (self.shape[0], self.shape[1] + other.shape[1]))
+
+
+    def take(self, cols):
+        """Returns the matrix made of the given columns."""
+        cols = np.asarray(cols, dtype=int)
+        starts = self.indptr[cols]
+        lengths = self.indptr[cols + 1] - starts
+        indptr = np.zeros(len(cols) + 1, dtype=int)
+        np.cumsum(lengths, out=indptr[1:])
+        # position of every selected nonzero in data
+        positions = np.arange(indptr[-1]) + np.repeat(starts - indptr[:-1], lengths)
+        return CSCMatrix(self.data[positions], self.indices[positions], indptr, (self.shape[0], len(cols)))
+
+
+    def __neg__(self):
+        return CSCMatrix(-self.data, self.indices, self.indptr, self.shape)
+
+
+    def astype(self, dtype):
+        return CSCMatrix(self.data.astype(dtype), self.indices, self.indptr, self.shape)
+
+
+    def nnz(self):
+        return len(self.data)
+
+
+    def column(self, j):
+        """Returns column j as a dense vector."""
+        start, end = self.indptr[j], self.indptr[j + 1]
+        col = np.zeros(self.shape[0], dtype=self.data.dtype)
+        col[self.indices[start: end]] = self.data[start: end]
+        return col
+
+
+    def columns(self, cols):
+        """Returns the given columns as a dense matrix."""
+        B = np.zeros((self.shape[0], len(cols)), dtype=self.data.dtype)
+        for k, j in enumerate(cols):
+            start, end = self.indptr[j], self.indptr[j + 1]
+            B[self.indices[start: end], k] = self.data[start: end]
+        return B
+
+
+    def rmatvec(self, y, limit = None):
+        """Computes y A over the first `limit` columns."""
+        if limit is None:
+            limit = self.shape[1]
+        end = self.indptr[limit]
+        cols = np.repeat(np.arange(limit), np.diff(self.indptr[:limit + 1]))
+        return np.bincount(cols, weights=y[self.indices[:end]] * self.data[:end], minlength=limit)
+
+
+    def toarray(self):
+        """Returns the matrix as a dense array."""
+        A = np.zeros(self.shape, dtype=self.data.dtype)
+        cols = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+        A[self.indices, cols] = self.data
+        return A
+
+
+class RowBuffer():
+    """Growable CSR buffers the rows of a matrix are appended to, one at a time.
+
+    The buffers are preallocated and doubled when full, so appending a row
+    costs its number of nonzeros.
+
+    Attributes:
+        data, indices : ndarray
+            value and column of each nonzero. Only the first `nnz` entries are used.
+        indptr : ndarray
+            start of each row. Only the first `m + 1` entries are used.
+        nnz, m : int
+            number of nonzeros and rows appended.
+    """
+    def __init__(self, capacity = 1024, dtype = object):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.indices = np.empty(capacity, dtype=int)
+        self.indptr = np.zeros(capacity + 1, dtype=int)
+        self.nnz = 0
+        self.m = 0
+
+
+    def append(self, cols, values):
+        """Appends a row with the given nonzeros."""
+        k = len(cols)
+        while self.nnz + k > len(self.data):
+            self.data = np.concatenate((self.data, np.empty(len(self.data), dtype=self.data.dtype)))
+            self.indices = np.concatenate((self.indices, np.empty(len(self.indices), dtype=int)))
+        if self.m + 1 == len(self.indptr):
+            self.indptr = np.concatenate((self.indptr, np.zeros(len(self.indptr) - 1, dtype=int)))
+
+        self.data[self.nnz: self.nnz + k] = values
+        self.indices[self.nnz: self.nnz + k] = cols
+        self.nnz += k
+        self.m += 1
+        self.indptr[self.m] = self.nnz
+
+
+    def to_csc(self, n):
+        """Returns the rows appended so far as a sparse matrix with n columns."""
+        rows = np.repeat(np.arange(self.m), np.diff(self.indptr[:self.m + 1]))
+        return CSCMatrix.from_coo(rows, self.indices[:self.nnz], self.data[:self.nnz], (self.m, n), self.data.dtype)
@@ -0,0 +1,102 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+"""
+    Instrumentation of a solve. A Stats object is passed down to the Simplex,
+    which fills it while it runs: the time of each stage, the pivots of each
+    phase and the size of the Tableau. An optional callback sees every pivot.
+"""
+
+# stages that are phases of the Simplex, whose counters exist even without pivots
+PHASES = ['phase 1', 'phase 2', 'reoptimize']
+
+
+class Stats():
+    """Time, pivots and sizes of a solve.
+
+    Attributes:
+        times : dict[str, float]
+            seconds spent in each stage: 'parse', 'setup', 'presolve', 'scale',
+            'phase 1', 'phase 2', 'reoptimize' and 'total'.
+        phases : dict[str, dict]
+            'iterations', 'degenerate' pivots, 'stalls' (switches to the
+            anti-cycling rule) and 'pivot time' (seconds) of each phase of the Simplex
+            that started, from PHASES, and of any other stage with pivots.
+        phase : str
+            phase the pivots are counted in.
+        rows, columns : int
+            size of the Phase 1 Tableau, or of A with the auxiliar columns in the revised method.
+        status : str
+            status of the solve.
+        callback : callable
+            called after every pivot as callback(phase, entering, leaving, objective),
+            with the column indices of A and the objective value of the phase.
+        scale : int
+            scale of the cost rows of the integer backend. See simplex.to_integer.
+    """
+    def __init__(self, callback = None):
+        self.times = {}
+        self.phases = {}
+        self.phase = None
+        self.rows = 0
+        self.columns = 0
+        self.status = None
+        self.callback = callback
+        self.scale = 1
+
+
+    @contextmanager
+    def stage(self, name):
+        """Adds the time of the block to the stage. The pivots in it are counted in the same phase."""
+        phase = self.phase
+        self.phase = name
+        if name in PHASES:
+            # a phase without pivots is still reported
+            self.current()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.times[name] = self.times.get(name, 0) + time.perf_counter() - start
+            self.phase = phase
+
+
+    def pivot(self, entering, leaving, objective, degenerate, seconds):
+        """Counts a pivot of the current phase. leaving is None when the entering variable only changes bound."""
+        phase = self.current()
+        phase['iterations'] += 1
+        phase['degenerate'] += int(degenerate)
+        phase['pivot time'] += seconds
+        if self.callback is not None:
+            self.callback(self.phase, int(entering), None if leaving is None else int(leaving), objective)
+
+
+    def stall(self):
+        """Counts a switch of the current phase to the anti-cycling rule."""
+        self.current()['stalls'] += 1
+
+
+    def current(self):
+        """Returns the counters of the current phase."""
+        return self.phases.setdefault(self.phase, {'iterations': 0, 'degenerate': 0, 'stalls': 0, 'pivot time': 0.0})
+
+
+    def to_dict(self):
+        """Returns the stats as plain values, for JSON."""
+        phases = {}
+        for name, phase in self.phases.items():
+            phases[name] = dict(phase)
+            phases[name]['mean pivot time'] = phase['pivot time'] / max(phase['iterations'], 1)
+        return {
+            'status': self.status,
+            'rows': self.rows,
+            'columns': self.columns,
+            'iterations': sum(phase['iterations'] for phase in self.phases.values()),
+            'times': dict(self.times),
+            'phases': phases,
+        }
+
+
+def stage(stats, name):
+    """stats.stage(name), or nothing when there are no stats."""
+    return nullcontext() if stats is None else stats.stage(name)
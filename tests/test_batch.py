@@ -0,0 +1,61 @@
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import batch
+
+"""
+    Solves batches of right-hand sides and objectives with batch.solve_batch and
+    checks every instance against its own solve, with the exact backend.
+"""
+
+
+def random_lp(rng, m, n):
+    """Returns [A, b, c] of a LP A x <= b in standard form, with a slack per row and small integer entries."""
+    A = np.array([[Fraction(rng.randint(-3, 6)) for _ in range(n)] + [Fraction(int(i == j)) for j in range(m)]
+                  for i in range(m)], dtype=object)
+    b = np.array([Fraction(rng.randint(0, 12)) for _ in range(m)], dtype=object)
+    c = np.array([Fraction(rng.randint(-4, 8)) for _ in range(n)] + [Fraction(0)] * m, dtype=object)
+    return [A, b, c]
+
+
+def assert_individual(A, statuses, objectives, certificates, instances):
+    """Every instance of the batch has the status and objective of its own solve, and a valid certificate."""
+    for status, objective, certificate, (b, c) in zip(statuses, objectives, certificates, instances):
+        expected_status, tableau, _, _, _ = batch.solve(A, b, c, 'exact')
+        assert status == expected_status
+        if status == 'Optimal':
+            assert objective == tableau[0, -1]
+            # the duals are feasible and their bound is tight
+            assert np.all(certificate.dot(A) >= c)
+            assert certificate.dot(b) == objective
+        elif status == 'Infeasible':
+            assert np.all(certificate.dot(A) >= 0) and certificate.dot(b) < 0
+        else:
+            assert np.all(A.dot(certificate) == 0) and np.all(certificate >= 0) and c.dot(certificate) > 0
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_rhs_batch(seed):
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng, rng.randint(1, 4), rng.randint(2, 5))
+    rhs = np.array([[Fraction(rng.randint(-6, 12)) for _ in b] for _ in range(6)], dtype=object)
+    statuses, objectives, certificates = batch.solve_batch(A, b, c, rhs = rhs)
+    assert_individual(A, statuses, objectives, certificates, [(row, c) for row in rhs])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_cost_batch(seed):
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng, rng.randint(1, 4), rng.randint(2, 5))
+    costs = np.array([[Fraction(rng.randint(-4, 8)) for _ in c] for _ in range(6)], dtype=object)
+    statuses, objectives, certificates = batch.solve_batch(A, b, c, costs = costs)
+    assert_individual(A, statuses, objectives, certificates, [(b, row) for row in costs])
+
+
+def test_batch_needs_one_kind():
+    A, b, c = random_lp(random.Random(0), 2, 3)
+    with pytest.raises(ValueError):
+        batch.solve_batch(A, b, c)
@@ -0,0 +1,73 @@
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import batch
+from column_generation import ColumnGeneration
+
+"""
+    Generates the columns of random LPs from a hidden pool, and checks the master
+    problem against solving the LP with every column from scratch, with the
+    exact backend.
+"""
+
+
+def random_lp(rng):
+    """Returns [A, b, c] of a LP A x <= b in standard form, whose slacks come first so they can start the master."""
+    m, n = rng.randint(1, 4), rng.randint(3, 10)
+    A = np.array([[Fraction(int(i == j)) for j in range(m)] + [Fraction(rng.randint(-2, 5)) for _ in range(n)]
+                  for i in range(m)], dtype=object)
+    b = np.array([Fraction(rng.randint(0, 12)) for _ in range(m)], dtype=object)
+    c = np.array([Fraction(0)] * m + [Fraction(rng.randint(-3, 7)) for _ in range(n)], dtype=object)
+    return [A, b, c]
+
+
+def pool_oracle(A, c, known, single):
+    """Oracle that returns the pool columns that price out: all of them, or the single best one."""
+    def oracle(y):
+        pool = [j for j in range(A.shape[1]) if j not in known and c[j] - y.dot(A[:, j]) > 0]
+        if single and pool:
+            pool = [max(pool, key=lambda j: c[j] - y.dot(A[:, j]))]
+        known.update(pool)
+        return [A[:, pool], c[pool]]
+    return oracle
+
+
+@pytest.mark.parametrize('single', [False, True])
+@pytest.mark.parametrize('seed', range(40))
+def test_from_scratch(seed, single):
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng)
+    m = A.shape[0]
+    master = ColumnGeneration(A[:, :m + 1], b, c[:m + 1])
+    status, objective, solution, certificate, _ = master.solve(pool_oracle(A, c, set(range(m + 1)), single))
+
+    expected_status, tableau, _, _, _ = batch.solve(A, b, c, 'exact')
+    assert status == expected_status
+    if status == 'Optimal':
+        assert objective == tableau[0, -1]
+        # the duals price out every column, also the ones never added
+        assert np.all(certificate.dot(A) >= c) and certificate.dot(b) == objective
+        assert len(solution) == master.columns
+    if single:
+        assert master.columns == m + 1 + master.rounds
+
+
+def test_max_rounds():
+    A, b, c = random_lp(random.Random(3))
+    m = A.shape[0]
+    master = ColumnGeneration(A[:, :m], b, c[:m])
+    master.solve(pool_oracle(A, c, set(range(m)), True), max_rounds = 1)
+    assert master.rounds <= 1 and master.columns <= m + 1
+
+
+def test_no_pricing_columns():
+    """Columns that don't price out leave the master unchanged."""
+    A, b, c = random_lp(random.Random(0))
+    m = A.shape[0]
+    master = ColumnGeneration(A, b, c)
+    objective = master.result()[1]
+    assert master.add_columns(A[:, :1], [c[0] - 1]) == 0
+    assert master.columns == A.shape[1] and master.result()[1] == objective
@@ -0,0 +1,89 @@
+import pytest
+
+import main
+import simplex
+from limits import Limits
+from stats import Stats
+from test_solvers import BEALE, CORPUS, random_lp
+
+"""
+    Stops the Simplex with the iteration and time limits, and checks the switch
+    to Bland's rule that keeps Dantzig's rule from cycling on Beale's LP.
+"""
+
+# options of main.solve that honor the limits
+CONFIGS = {
+    'exact': {},
+    'integer': {'backend': 'integer'},
+    'hybrid': {'backend': 'hybrid'},
+    'revised': {'backend': 'float64', 'method': 'revised'},
+    'bounds': {'native_bounds': True},
+    'dantzig': {'pricing_rule': 'dantzig'},
+}
+
+INPUTS = {name: text for name, (text, _, _) in CORPUS.items()}
+INPUTS.update({f'random {seed}': random_lp(seed) for seed in range(10)})
+
+
+def solve(tmp_path, text, limits, **options):
+    """Returns [result of main.solve, stats, output lines] of the LP of text."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    stats = Stats()
+    result = main.solve(str(input_filename), stats = stats, limits = limits, **options)
+    main.handle_status(*result[:4], str(tmp_path / 'out.txt'))
+    return [result, stats, (tmp_path / 'out.txt').read_text().splitlines()]
+
+
+def pivots(stats):
+    return sum(phase['iterations'] for phase in stats.phases.values())
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+@pytest.mark.parametrize('name', INPUTS)
+def test_iteration_limit(tmp_path, name, config):
+    """Every budget below the pivots of the solve stops it after exactly that many pivots, without results."""
+    expected, stats, _ = solve(tmp_path, INPUTS[name], None, **CONFIGS[config])
+    total = pivots(stats)
+    for max_iterations in range(total):
+        limits = Limits(max_iterations)
+        (status, _, solution, certificate, _), stats, lines = solve(tmp_path, INPUTS[name], limits,
+                                                                    **CONFIGS[config])
+        assert status == 'IterationLimit' and limits.status == 'IterationLimit'
+        assert solution is None and certificate is None
+        assert pivots(stats) == limits.iterations == max_iterations
+        assert lines == ['Status: limite de iteracoes', 'Certificado:']
+
+    # a budget that is enough changes nothing
+    result, _, _ = solve(tmp_path, INPUTS[name], Limits(total), **CONFIGS[config])
+    assert result[:2] == expected[:2]
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_time_limit(tmp_path, config):
+    limits = Limits(time_limit = 0)
+    (status, _, solution, certificate, _), stats, lines = solve(tmp_path, CORPUS['minimization'][0], limits,
+                                                                **CONFIGS[config])
+    assert status == 'TimeLimit' and limits.status == 'TimeLimit'
+    assert solution is None and certificate is None and pivots(stats) == 0
+    assert lines == ['Status: limite de tempo', 'Certificado:']
+
+
+def test_integer_limit(tmp_path):
+    """A limit that stops the root LP of branch and bound leaves no incumbent."""
+    text = 'MAX 5*x + 4*y\n6*x + 4*y <= 24\nx + 2*y <= 6\nx >= 0\ny >= 0\nINT x, y\n'
+    (status, _, solution, certificate, _), _, _ = solve(tmp_path, text, Limits(1))
+    assert status == 'IterationLimit' and solution is None and certificate is None
+
+
+@pytest.mark.parametrize('backend', ['exact', 'float64', 'integer'])
+def test_bland_switch(tmp_path, monkeypatch, backend):
+    """Dantzig's rule cycles on Beale's LP, unless degenerate pivots switch it to Bland's rule."""
+    (status, objective, _, _, _), stats, _ = solve(tmp_path, BEALE, None, backend = backend, pricing_rule = 'dantzig')
+    assert status == 'Optimal' and float(objective) == pytest.approx(1.25)
+    assert stats.phases['phase 2']['stalls'] == 1
+    assert stats.phases['phase 2']['degenerate'] >= simplex.stall_pivots
+
+    monkeypatch.setattr(simplex, 'stall_pivots', 10**9)
+    (status, _, _, _, _), stats, _ = solve(tmp_path, BEALE, Limits(1000), backend = backend, pricing_rule = 'dantzig')
+    assert status == 'IterationLimit' and stats.phases['phase 2']['stalls'] == 0
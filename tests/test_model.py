@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import main
+import model
+from Parser import Parser
+from test_solvers import CORPUS, random_lp
+
+"""
+    Compiles LPs with model.save and checks that model.load gives back the same
+    Parser, and that the compiled LP solves exactly as the text one.
+"""
+
+# LPs of the corpus and random ones, with integer variables too
+INPUTS = {name: text for name, (text, _, _) in CORPUS.items()}
+INPUTS.update({f'random {seed}': random_lp(seed) for seed in range(10)})
+INPUTS['integer'] = 'MAX 5*x + 4*y\n6*x + 4*y <= 24\nx + 2*y <= 6\nx >= 0\ny >= 0\nINT x, y\n'
+
+
+def compile_lp(tmp_path, text, native_bounds):
+    """Returns [input, compiled] file names of the LP of text."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    compiled = tmp_path / ('lp' + model.EXTENSION)
+    parser = Parser(native_bounds)
+    parser.parse_input(str(input_filename))
+    model.save(parser, str(compiled))
+    return [str(input_filename), str(compiled)]
+
+
+@pytest.mark.parametrize('native_bounds', [False, True])
+@pytest.mark.parametrize('name', INPUTS)
+def test_round_trip(tmp_path, name, native_bounds):
+    input_filename, compiled = compile_lp(tmp_path, INPUTS[name], native_bounds)
+    parsed, loaded = main.read(input_filename, native_bounds), main.read(compiled, native_bounds)
+    assert np.array_equal(loaded.matrix().toarray(), parsed.matrix().toarray())
+    assert list(loaded.b) == list(parsed.b) and list(loaded.objective) == list(parsed.objective)
+    assert list(loaded.slack_rows) == list(parsed.slack_rows) and loaded.slack_signs == list(parsed.slack_signs)
+    assert loaded.var_names == parsed.var_names and loaded.var_count == parsed.var_count
+    assert loaded.is_max == parsed.is_max and loaded.optimal_value == parsed.optimal_value
+    assert loaded.integer_columns() == parsed.integer_columns()
+    if native_bounds:
+        assert loaded.lower == parsed.lower and loaded.upper == parsed.upper
+
+    # the float load is the same LP in floats
+    floats = model.load(compiled, exact = False)
+    assert np.array_equal(floats.matrix().toarray().astype(np.float64), parsed.matrix().toarray().astype(np.float64))
+
+
+@pytest.mark.parametrize('native_bounds', [False, True])
+@pytest.mark.parametrize('name', INPUTS)
+def test_compiled_solve(tmp_path, name, native_bounds):
+    """The exact solve of the compiled LP is the same as the one of the text LP."""
+    input_filename, compiled = compile_lp(tmp_path, INPUTS[name], native_bounds)
+    options = {'native_bounds': native_bounds}
+    if native_bounds and 'INT' in INPUTS[name]:
+        pytest.skip('integer variables need the bounds as rows')
+    expected = main.solve(input_filename, **options)
+    result = main.solve(compiled, **options)
+    assert result[:2] == expected[:2]
+    for values, expected_values in zip(result[2:], expected[2:]):
+        assert (values is None) == (expected_values is None)
+        assert values is None or list(values) == list(expected_values)
+
+
+def test_bounds_mismatch(tmp_path):
+    _, compiled = compile_lp(tmp_path, INPUTS['optimal'], False)
+    with pytest.raises(ValueError):
+        main.read(compiled, True)
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import parallel
+from test_solvers import CORPUS
+
+"""
+    Runs the parallel.py command line on a directory and a manifest of LPs, and
+    checks every result against main.main, with the exact backend.
+"""
+
+SCRIPT = os.path.join(os.path.dirname(main.__file__), 'parallel.py')
+
+
+def write_inputs(directory):
+    """Writes the LPs of the corpus to directory. Returns their file names."""
+    directory.mkdir()
+    names = []
+    for index, (text, _, _) in enumerate(CORPUS.values()):
+        names.append(directory / f'lp{index}.txt')
+        names[-1].write_text(text)
+    return names
+
+
+def run(*args):
+    result = subprocess.run([sys.executable, SCRIPT] + [str(arg) for arg in args], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+# [command line options, the same options of main.main]
+OPTIONS = [
+    [[], {}],
+    [['--harris'], {'harris': True}],
+    [['--backend', 'float64', '--scale', 'none'], {'backend': 'float64'}],
+]
+
+
+@pytest.mark.parametrize('arguments, options', OPTIONS)
+def test_directory(tmp_path, arguments, options):
+    names = write_inputs(tmp_path / 'inputs')
+    output = run(tmp_path / 'inputs', tmp_path / 'outputs', '--workers', 2, *arguments)
+    assert f'{len(names)} instances on 2 workers' in output
+
+    for name in names:
+        expected = tmp_path / 'expected.txt'
+        main.main(str(name), str(expected), **options)
+        assert (tmp_path / 'outputs' / (name.stem + '.out')).read_text() == expected.read_text(), name
+
+
+def test_manifest(tmp_path):
+    """A manifest lists the inputs relative to it, and a missing instance doesn't stop the others."""
+    names = write_inputs(tmp_path / 'inputs')
+    manifest = tmp_path / 'manifest'
+    manifest.write_text('# corpus\n' + ''.join(f'inputs/{name.name}\n' for name in names[:3]) + 'inputs/missing.txt\n')
+    assert parallel.list_inputs(str(manifest)) == [str(tmp_path / 'inputs' / name.name) for name in names[:3]] + \
+        [str(tmp_path / 'inputs' / 'missing.txt')]
+
+    output = run(manifest, tmp_path / 'outputs', '--workers', 2)
+    assert '4 instances on 2 workers' in output and '1 Error' in output
+    assert sorted(os.listdir(tmp_path / 'outputs')) == sorted(name.stem + '.out' for name in names[:3])
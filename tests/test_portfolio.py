@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import portfolio
+from test_solvers import CORPUS
+
+"""
+    Runs the portfolio.py command line on the LPs of the corpus and checks its
+    results against main.main, with the exact backend as the reference.
+"""
+
+SCRIPT = os.path.join(os.path.dirname(main.__file__), 'portfolio.py')
+
+
+def run(tmp_path, text, *configs, check = False):
+    """Returns [process, output text] of portfolio.py on the LP of text."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    arguments = [sys.executable, SCRIPT, str(input_filename), str(tmp_path / 'out.txt')]
+    if configs:
+        arguments += ['--configs', *configs]
+    if check:
+        arguments.append('--check')
+    process = subprocess.run(arguments, capture_output=True, text=True)
+    output = (tmp_path / 'out.txt').read_text() if process.returncode == 0 else None
+    return [process, output]
+
+
+def expected_output(tmp_path, text):
+    """Output of main.main on the LP of text, with the exact backend."""
+    input_filename = tmp_path / 'expected.txt'
+    input_filename.write_text(text)
+    main.main(str(input_filename), str(tmp_path / 'expected.out'))
+    return (tmp_path / 'expected.out').read_text()
+
+
+@pytest.mark.parametrize('name', CORPUS)
+def test_exact_config(tmp_path, name):
+    text = CORPUS[name][0]
+    process, output = run(tmp_path, text, 'exact:bland')
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.startswith('exact:bland finished first: ' + CORPUS[name][1])
+    assert output == expected_output(tmp_path, text)
+
+
+@pytest.mark.parametrize('name', ['optimal', 'infeasible', 'unbound', 'degenerate'])
+def test_checked_race(tmp_path, name):
+    """The default portfolio, checked by a second configuration, writes the status and objective of the exact one."""
+    text = CORPUS[name][0]
+    process, output = run(tmp_path, text, check = True)
+    assert process.returncode == 0, process.stderr
+    assert output.splitlines()[:2] == expected_output(tmp_path, text).splitlines()[:2]
+
+
+def test_failed_configs(tmp_path):
+    """A configuration that fails leaves the race to the others, and the run fails when all of them do."""
+    process, output = run(tmp_path, CORPUS['optimal'][0], 'exact:bland:revised', 'float64:dantzig:tableau:harris')
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.startswith('float64:dantzig:tableau:harris finished first: Optimal')
+
+    process, _ = run(tmp_path, CORPUS['optimal'][0], 'exact:bland:revised')
+    assert process.returncode != 0 and 'Every configuration failed' in process.stderr
+
+
+def test_parse_config():
+    assert portfolio.parse_config('float64:steepest') == {'backend': 'float64', 'pricing_rule': 'steepest'}
+    assert portfolio.parse_config('float64:bland:revised') == {'backend': 'float64', 'pricing_rule': 'bland',
+                                                                'method': 'revised'}
+    assert portfolio.parse_config('exact:dantzig:harris') == {'backend': 'exact', 'pricing_rule': 'dantzig',
+                                                              'harris': True}
+    with pytest.raises(ValueError):
+        portfolio.parse_config('float64')
@@ -0,0 +1,100 @@
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import batch
+from main import add_artificial_vars
+import simplex
+
+"""
+    Changes a solved Tableau with simplex.add_constraint, simplex.change_rhs and
+    simplex.reoptimize, and checks the result against solving the changed LP
+    from scratch, with the exact backend.
+"""
+
+
+def random_lp(rng):
+    """Returns [A, b, c] of a LP A x <= b in standard form, with a slack per row and small integer entries."""
+    m, n = rng.randint(1, 4), rng.randint(2, 5)
+    A = np.array([[Fraction(rng.randint(-2, 5)) for _ in range(n)] + [Fraction(int(i == j)) for j in range(m)]
+                  for i in range(m)], dtype=object)
+    b = np.array([Fraction(rng.randint(0, 12)) for _ in range(m)], dtype=object)
+    c = np.array([Fraction(rng.randint(-3, 7)) for _ in range(n)] + [Fraction(0)] * m, dtype=object)
+    return [A, b, c]
+
+
+def solve_lp(A, b, c):
+    """Returns [status, tableau, certificate, basic_vars, m] of simplex.main, from scratch."""
+    artificial_vars, artificial_costs, basic_vars = add_artificial_vars(A)
+    return simplex.main(A, b, c, basic_vars, artificial_vars, artificial_costs)
+
+
+def extend(A, b, c, a, value, relation):
+    """Appends the rows of add_constraint to the LP: a x + s = value for <=, -a x + s = -value for >=, both for ==."""
+    for sign in {'<=': [1], '>=': [-1], '==': [1, -1]}[relation]:
+        row = np.concatenate((sign * a, [Fraction(0)] * (A.shape[1] - len(a)), [Fraction(1)]))
+        A = np.vstack((np.hstack((A, np.full((A.shape[0], 1), Fraction(0), dtype=object))), row))
+        b = np.append(b, sign * value)
+        c = np.append(c, Fraction(0))
+    return [A, b, c]
+
+
+def assert_from_scratch(result, A, b, c):
+    """The re-optimized result has the status and objective of the LP solved from scratch, and a valid certificate."""
+    status, tableau, certificate, _, m = result
+    expected_status, expected, _, _, _ = batch.solve(A, b, c, 'exact')
+    assert status == expected_status
+    if status == 'Optimal':
+        assert tableau[0, -1] == expected[0, -1]
+        assert np.all(certificate.dot(A) >= c) and certificate.dot(b) == tableau[0, -1]
+    elif status == 'Infeasible':
+        # an infeasible <= half of an equality stops add_constraint before the >= row
+        A, b = A[:m, :A.shape[1] - A.shape[0] + m], b[:m]
+        assert np.all(certificate.dot(A) >= 0) and certificate.dot(b) < 0
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_add_constraint(seed):
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng)
+    result = solve_lp(A, b, c)
+    n = A.shape[1] - A.shape[0]
+    for _ in range(3):
+        if result[0] != 'Optimal':
+            break
+        a = np.array([Fraction(rng.randint(-3, 4)) for _ in range(n)], dtype=object)
+        value, relation = Fraction(rng.randint(-2, 9)), rng.choice(['<=', '>=', '=='])
+        result = simplex.add_constraint(result[1], result[3], result[4], a, value, relation)
+        A, b, c = extend(A, b, c, a, value, relation)
+        assert_from_scratch(result, A, b, c)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_change_rhs(seed):
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng)
+    status, tableau, _, basic_vars, m = solve_lp(A, b, c)
+    if status != 'Optimal':
+        return
+    b = np.array([Fraction(rng.randint(-4, 14)) for _ in b], dtype=object)
+    assert_from_scratch(simplex.change_rhs(tableau, basic_vars, m, b), A, b, c)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_reoptimize_costs(seed):
+    """A new objective priced on the optimal basis of the old one is re-optimized by primal pivots."""
+    rng = random.Random(seed)
+    A, b, c = random_lp(rng)
+    status, tableau, _, basic_vars, m = solve_lp(A, b, c)
+    if status != 'Optimal':
+        return
+    c = np.array([Fraction(rng.randint(-3, 7)) for _ in c], dtype=object)
+    n = A.shape[1]
+    tableau = tableau.copy()
+    tableau[0, :] = Fraction(0)
+    tableau[0, m: -1] = -c
+    tableau[0, :] += batch.basic_costs_of(c[np.newaxis], basic_vars, m, n)[0].dot(tableau[1:, :])
+    result = simplex.reoptimize(tableau, m, basic_vars.copy(), simplex.tolerance(tableau))
+    assert_from_scratch(result, A, b, c)
@@ -0,0 +1,228 @@
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import main
+import revised_simplex
+from bounds import Bounds
+import simplex
+from stats import Stats
+
+"""
+    Solves a small corpus of LPs with known answers, and random LPs, with every
+    backend and method, and checks that they all agree.
+"""
+
+# options of main.solve. The exact tableau is the reference of the random LPs
+CONFIGS = {
+    'exact': {},
+    'float64': {'backend': 'float64'},
+    'integer': {'backend': 'integer'},
+    'hybrid': {'backend': 'hybrid'},
+    'revised': {'backend': 'float64', 'method': 'revised'},
+    'devex': {'backend': 'float64', 'pricing_rule': 'devex'},
+    'harris': {'backend': 'float64', 'harris': True},
+    'exact harris': {'harris': True},
+    'integer devex': {'backend': 'integer', 'pricing_rule': 'devex'},
+    'integer steepest': {'backend': 'integer', 'pricing_rule': 'steepest'},
+    'presolve': {'presolve': True},
+    'bounds': {'native_bounds': True},
+    'crash': {'crash': True},
+    'geometric': {'backend': 'float64', 'scale': 'geometric'},
+    'curtis-reid': {'scale': 'curtis-reid'},
+    'auto': {'backend': 'float64', 'scale': 'auto'},
+}
+
+# the LP of Beale, on which the textbook ratio test cycles
+BEALE = ('MAX 0.75*a - 20*b + 0.5*c - 6*d\n0.25*a - 8*b - c + 9*d <= 0\n0.5*a - 12*b - 0.5*c + 3*d <= 0\nc <= 1\n'
+         'a >= 0\nb >= 0\nc >= 0\nd >= 0\n')
+
+# [input, status, objective]
+CORPUS = {
+    'optimal': ['MAX 3*x + 2*y\nx + y <= 4\nx + 3*y <= 6\nx >= 0\ny >= 0\n', 'Optimal', 12],
+    'minimization': ['MIN 2*x + 3*y + 1\nx + y >= 2\nx - y <= 1\nx >= 0\ny >= 0\n', 'Optimal', Fraction(11, 2)],
+    'equality': ['MAX x + y\nx + 2*y == 4\nx <= 3\nx >= 0\ny >= 0\n', 'Optimal', Fraction(7, 2)],
+    'free variable': ['MIN x\nx >= -5\nx + y <= 3\ny >= 0\n', 'Optimal', -5],
+    'infeasible': ['MAX x\nx + y <= 1\nx + y >= 2\nx >= 0\ny >= 0\n', 'Infeasible', None],
+    'unbound': ['MAX x - y\nx - y >= 1\nx >= 0\ny >= 0\n', 'Unbound', None],
+    'no rows': ['MIN x\nx >= 0\n', 'Optimal', 0],
+    'no rows unbound': ['MAX x\nx >= 0\n', 'Unbound', None],
+    'only bounds': ['MIN x\n3*x >= 2\n', 'Optimal', Fraction(2, 3)],
+    'redundant equality': ['MAX x + y\nx + y == 2\n2*x + 2*y == 4\nx <= 1\nx >= 0\ny >= 0\n', 'Optimal', 2],
+    'badly scaled': ['MAX x\n0.0001*x + 1000000*y <= 1\nx >= 0\ny >= 0\n', 'Optimal', 10000],
+    'tiny coefficient': ['MAX x\n0.000001*x <= 1\nx >= 0\n', 'Optimal', 1000000],
+    'degenerate': [BEALE, 'Optimal', Fraction(5, 4)],
+    'constant bound': ['MIN - 0.5*x1\n10*x1 + 3 >= 3\nx0 >= 0\nx1 >= 0\n', 'Unbound', None],
+}
+
+
+def solve(tmp_path, text, **options):
+    """Returns [status, objective] of main.solve on the LP of text, whose results must be writable."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    status, objective, solution, certificate, _ = main.solve(str(input_filename), **options)
+    main.handle_status(status, objective, solution, certificate, str(tmp_path / 'out.txt'))
+    return [status, objective]
+
+
+def assert_same(status, objective, expected_status, expected_objective, config = ''):
+    assert status == expected_status, config
+    if status == 'Optimal':
+        assert float(objective) == pytest.approx(float(expected_objective), rel=1e-9, abs=1e-9), config
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+@pytest.mark.parametrize('name', CORPUS)
+def test_corpus(tmp_path, name, config):
+    text, expected_status, expected_objective = CORPUS[name]
+    assert_same(*solve(tmp_path, text, **CONFIGS[config]), expected_status, expected_objective)
+
+
+def random_lp(seed):
+    """Writes a random LP with <=, >= and == rows, and a few free and bounded variables."""
+    rng = random.Random(seed)
+    m, n = rng.randint(1, 5), rng.randint(2, 5)
+    names = [f'x{j}' for j in range(n)]
+    terms = lambda row: ' + '.join(f'{value}*{name}' for value, name in zip(row, names) if value).replace('+ -', '- ')
+    lines = [rng.choice(['MAX ', 'MIN ']) + terms([rng.randint(-5, 9) or 1 for _ in names])]
+    for _ in range(m):
+        row = [rng.randint(-3, 6) for _ in names]
+        row[0] = row[0] or 1
+        lines.append(f"{terms(row)} {rng.choice(['<=', '<=', '>=', '=='])} {rng.randint(0, 20)}")
+    for name in names:
+        kind = rng.random()
+        if kind < 0.2:
+            lines.append(f'{name} <= {rng.randint(1, 10)}')
+        else:
+            lines.append(f'{name} >= 0')
+            if kind < 0.4:
+                lines.append(f'{name} <= {rng.randint(1, 10)}')
+    return '\n'.join(lines) + '\n'
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_agree(tmp_path, seed):
+    text = random_lp(seed)
+    reference = solve(tmp_path, text)
+    for config, options in CONFIGS.items():
+        status, objective = solve(tmp_path, text, **options)
+        assert_same(status, objective, *reference, config)
+
+
+def large_lp(m, n, seed = 0):
+    """Writes a dense LP with coefficients of 3 decimals up to 1e3, whose integer Tableau outgrows float64."""
+    rng = random.Random(seed)
+    names = [f'x{j}' for j in range(n)]
+    terms = lambda: ' + '.join(f'{rng.randint(1, 999999) / 1000}*{name}' for name in names)
+    lines = ['MAX ' + terms()]
+    lines += [f'{terms()} <= {rng.randint(1, 999999) / 1000}' for _ in range(m)]
+    lines += [f'{name} >= 0' for name in names]
+    return '\n'.join(lines) + '\n'
+
+
+# an overflow of the weights only warns, and leaves NaN scores behind
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+@pytest.mark.parametrize('config', ['integer', 'integer devex', 'integer steepest'])
+def test_large_coefficients(tmp_path, config):
+    text = large_lp(60, 80)
+    assert_same(*solve(tmp_path, text, **CONFIGS[config]), *solve(tmp_path, text), config)
+
+
+@pytest.mark.parametrize('backend', ['exact', 'float64', 'integer'])
+def test_warm_start_auxiliar(tmp_path, backend):
+    """A basis with an auxiliar variable on a redundant row is reused, not solved from scratch."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(CORPUS['redundant equality'][0])
+    parser = main.read(str(input_filename))
+    A = parser.matrix().toarray()
+    b = np.array(parser.b)
+    c = np.array(list(parser.objective) + [0] * len(parser.slack_rows))
+    _, _, _, _, basic_vars = main.solve(str(input_filename))
+    assert basic_vars.max() >= A.shape[0] + A.shape[1]
+    result = simplex.warm_start(A, b, c, basic_vars, backend)
+    assert result is not None
+    assert result[0] == 'Optimal'
+    assert float(result[1][0, -1]) == pytest.approx(2)
+
+
+def test_node_limit_incumbent(tmp_path):
+    """Branch and bound stopped by the node limit still writes its incumbent."""
+    input_filename = tmp_path / 'lp.txt'
+    output_filename = tmp_path / 'out.txt'
+    bounds = ''.join(f'{name} >= 0\n{name} <= 1\n' for name in 'xyzw')
+    input_filename.write_text('MAX 8*x + 11*y + 6*z + 4*w\n5*x + 7*y + 4*z + 3*w <= 14\n' + bounds + 'INT x, y, z, w\n')
+    main.main(str(input_filename), str(output_filename), selection = 'depth-first', max_nodes = 6)
+    lines = output_filename.read_text().splitlines()
+    assert lines[:2] == ['Status: limite de nos', 'Objetivo: 21.0']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_float_incumbent_integral(tmp_path, workers):
+    """The integer variables of a float64 incumbent are written as exact integers."""
+    input_filename = tmp_path / 'lp.txt'
+    bounds = ''.join(f'{name} >= 0\n{name} <= 1\n' for name in 'xyzw')
+    input_filename.write_text('MAX 8*x + 11*y + 6*z + 4*w\n5*x + 7*y + 4*z + 3*w <= 14\n' + bounds + 'INT x, y, z, w\n')
+    status, objective, solution, _, _ = main.solve(str(input_filename), 'float64', workers = workers)
+    assert status == 'Optimal' and objective == 21
+    assert all(value == round(value) for value in solution[:4])
+
+
+def test_revised_anti_cycling(tmp_path, monkeypatch):
+    """The revised method switches its ratio test to Bland on a stall, and counts the switch."""
+    monkeypatch.setattr(revised_simplex, 'stall_pivots', 1)
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(BEALE)
+    stats = Stats()
+    status, objective, _, _, _ = main.solve(str(input_filename), 'float64', 'revised', stats = stats)
+    assert_same(status, objective, 'Optimal', Fraction(5, 4))
+    assert sum(phase['stalls'] for phase in stats.phases.values()) > 0
+
+
+@pytest.mark.parametrize('options', [{'backend': 'exact'}, {'backend': 'float64', 'pricing_rule': 'steepest'},
+                                     {'backend': 'float64', 'initial_basis': np.arange(2)},
+                                     {'backend': 'float64', 'harris': True}])
+def test_revised_options(tmp_path, options):
+    """The revised method refuses the options it can't honor."""
+    with pytest.raises(ValueError):
+        solve(tmp_path, CORPUS['optimal'][0], method = 'revised', **options)
+
+
+def bounds_certificate_holds(tmp_path, text):
+    """Checks the infeasibility certificate [y, z] of --bounds against the system in x' of bounds.py."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    status, _, _, certificate, _ = main.solve(str(input_filename), native_bounds = True)
+    assert status == 'Infeasible'
+    parser = main.read(str(input_filename), True)
+    A = parser.matrix().toarray()
+    m, n = A.shape
+    slacks = len(parser.slack_rows)
+    bounds = Bounds(parser.lower + [Fraction(0)] * slacks, parser.upper + [None] * slacks)
+    y, z = np.asarray(certificate[:m]), np.asarray(certificate[m:])
+    reduced = y.dot(A * bounds.sign) + z
+    bounded = (bounds.upper != np.inf).astype(bool)
+    assert len(z) == n and all(z >= 0) and all(z[~bounded] == 0)
+    assert all(reduced[~bounds.free] >= 0) and all(reduced[bounds.free] == 0)
+    assert y.dot(np.array(parser.b) - A.dot(bounds.offset)) + z[bounded].dot(bounds.upper[bounded]) < 0
+
+
+@pytest.mark.parametrize('text', [
+    'MAX x + y\nx + y >= 5\nx <= 2\ny <= 2\nx >= 0\ny >= 0\n',
+    'MAX x\nx - y == 3\nx <= 1\ny >= 0\nx >= -4\n',
+    'MAX x\nx + y <= 4\nx >= 3\nx <= 1\ny >= 0\n',
+])
+def test_bounds_certificate(tmp_path, text):
+    bounds_certificate_holds(tmp_path, text)
+
+
+def test_bounds_anti_cycling(tmp_path, monkeypatch):
+    """The bounded ratio test follows Bland once the Simplex stalls."""
+    monkeypatch.setattr(simplex, 'stall_pivots', 1)
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(BEALE)
+    stats = Stats()
+    status, objective, _, _, _ = main.solve(str(input_filename), native_bounds = True, stats = stats)
+    assert_same(status, objective, 'Optimal', Fraction(5, 4))
+    assert sum(phase['stalls'] for phase in stats.phases.values()) > 0
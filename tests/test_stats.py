@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import main
+from stats import Stats
+from test_solvers import CORPUS, random_lp
+
+"""
+    Solves the corpus and random LPs with a Stats whose callback records every
+    pivot, and checks the pivots against the counters and the final basis.
+"""
+
+# options of main.solve whose pivots refer to the columns of A
+CONFIGS = {
+    'exact': {},
+    'integer': {'backend': 'integer'},
+    'revised': {'backend': 'float64', 'method': 'revised'},
+}
+
+INPUTS = {name: text for name, (text, _, _) in CORPUS.items()}
+INPUTS.update({f'random {seed}': random_lp(seed) for seed in range(20)})
+
+
+def solve(tmp_path, text, **options):
+    """Returns [result of main.solve, stats, pivots] of the LP of text."""
+    input_filename = tmp_path / 'lp.txt'
+    input_filename.write_text(text)
+    pivots = []
+    stats = Stats(lambda *pivot: pivots.append(pivot))
+    result = main.solve(str(input_filename), stats = stats, **options)
+    return [result, stats, pivots]
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+@pytest.mark.parametrize('name', INPUTS)
+def test_pivot_callback(tmp_path, name, config):
+    (status, _, _, _, basic_vars), stats, pivots = solve(tmp_path, INPUTS[name], **CONFIGS[config])
+    for phase, counters in stats.phases.items():
+        assert counters['iterations'] == sum(pivot[0] == phase for pivot in pivots)
+
+    # replay the pivots from the starting basis of the Simplex
+    A = main.read(str(tmp_path / 'lp.txt')).matrix().toarray()
+    basis = set(main.add_artificial_vars(A)[2].tolist())
+    last = {}
+    for phase, entering, leaving, objective in pivots:
+        assert isinstance(entering, int) and isinstance(leaving, int)
+        assert entering not in basis and leaving in basis
+        basis = basis - {leaving} | {entering}
+        # the Simplex never makes the objective of its phase worse
+        assert phase not in last or objective >= last[phase] - 1e-9
+        last[phase] = objective
+
+    if status == 'Optimal':
+        offset = 0 if config == 'revised' else A.shape[0]
+        assert basis == set((basic_vars - offset).tolist())
+        if 'phase 1' in last:
+            assert last['phase 1'] == pytest.approx(0)
+
+
+@pytest.mark.parametrize('name, phase', [('optimal', 'phase 1'), ('minimization', 'phase 2')])
+def test_phase_without_pivots(tmp_path, name, phase):
+    """A phase that starts but makes no pivot is still in the JSON, with zero iterations."""
+    _, stats, pivots = solve(tmp_path, CORPUS[name][0])
+    assert not any(pivot[0] == phase for pivot in pivots)
+    phases = json.loads(json.dumps(stats.to_dict()))['phases']
+    assert set(phases) == {'phase 1', 'phase 2'}
+    assert phases[phase]['iterations'] == 0 and phases[phase]['mean pivot time'] == 0